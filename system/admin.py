@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from system.models import ConsultancyClient, Module, Profile, ConsultancyUser
+from system.models import ConsultancyClient, Module, PassportOcrCacheEntry, Profile, ConsultancyUser, ZipCodeCache
 
 
 @admin.register(Module)
@@ -50,3 +50,27 @@ class ConsultancyClientAdmin(admin.ModelAdmin):
     search_fields = ("first_name", "last_name", "email", "phone")
     list_filter = ("assigned_advisor", "created_at")
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(PassportOcrCacheEntry)
+class PassportOcrCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("digest", "pipeline_version", "hit_count", "created_at", "last_used_at")
+    list_filter = ("pipeline_version",)
+    search_fields = ("digest",)
+    ordering = ("-last_used_at",)
+    readonly_fields = ("digest", "pipeline_version", "fields", "warnings", "pipeline", "hit_count", "created_at", "last_used_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ZipCodeCache)
+class ZipCodeCacheAdmin(admin.ModelAdmin):
+    list_display = ("cep", "source", "fetched_at")
+    list_filter = ("source",)
+    search_fields = ("cep",)
+    ordering = ("-fetched_at",)
+    readonly_fields = ("cep", "address", "source", "error", "fetched_at")
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,77 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from system.services.address_backfill import backfill_client_addresses
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa logradouro, bairro, cidade e UF dos clientes que tem CEP mas endereco incompleto, "
+        "resolvendo cada CEP uma unica vez (cache, base local e fontes online) com limite de taxa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Consultas online em paralelo (padrao: 4).")
+        parser.add_argument(
+            "--rate", type=float, default=5.0, help="Maximo de consultas online por segundo (padrao: 5; 0 sem limite)."
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Clientes por bulk_update (padrao: 500).")
+        parser.add_argument("--limit", type=int, help="Processa no maximo N clientes incompletos nesta rodada.")
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Substitui campos ja preenchidos (padrao: so preenche os vazios).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Resolve os CEPs e conta, sem gravar.")
+        parser.add_argument(
+            "--report",
+            help="Arquivo JSON com o progresso, regravado a cada lote (inclui os CEPs que falharam).",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] <= 0 or options["batch_size"] <= 0:
+            raise CommandError("--workers e --batch-size devem ser maiores que zero.")
+        if options["rate"] < 0:
+            raise CommandError("--rate nao pode ser negativo.")
+
+        started = time.perf_counter()
+
+        def progress(report):
+            done = report["resolved_locally"] + report["resolved_online"] + report["failed"]
+            self.stdout.write(
+                f"  CEPs: {done}/{report['ceps']} | falhas: {report['failed']} | "
+                f"clientes atualizados: {report['clients_updated']} | {time.perf_counter() - started:.1f}s"
+            )
+            if options["report"]:
+                self._write_report(options["report"], report, started)
+
+        report = backfill_client_addresses(
+            workers=options["workers"],
+            rate=options["rate"],
+            batch_size=options["batch_size"],
+            limit=options["limit"],
+            overwrite=options["overwrite"],
+            dry_run=options["dry_run"],
+            progress=progress,
+        )
+        if options["report"]:
+            self._write_report(options["report"], report, started)
+
+        self.stdout.write(
+            f"Clientes incompletos: {report['clients']} | CEPs distintos: {report['ceps']} | "
+            f"CEP invalido: {report['invalid_zip_codes']}"
+        )
+        self.stdout.write(
+            f"Resolvidos: {report['resolved_locally']} (cache/base local) + {report['resolved_online']} (online) | "
+            f"falhas: {report['failed']}"
+        )
+        verb = "seriam atualizados" if options["dry_run"] else "atualizados"
+        style = self.style.WARNING if report["failed"] else self.style.SUCCESS
+        self.stdout.write(style(f"Clientes {verb}: {report['clients_updated']}."))
+
+    def _write_report(self, path, report, started):
+        payload = {**report, "elapsed_seconds": round(time.perf_counter() - started, 1)}
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
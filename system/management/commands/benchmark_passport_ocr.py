@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from system.services.passport_benchmark import run_passport_ocr_benchmark
+from system.services.passport_ocr import PassportExtractionError
+from system.services.passport_synthetic import SYNTHETIC_PASSPORT_VARIANTS, generate_synthetic_passports
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark local do OCR de passaporte: gera paginas sinteticas com MRZ valida (ruido, rotacao, "
+        "desfoque, JPEG e PDF), roda o pipeline e reporta p50/p95 por estagio, memoria e acerto por campo em JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=21, help="Quantidade de passaportes sinteticos (padrao: 21).")
+        parser.add_argument("--seed", type=int, default=42, help="Semente do gerador aleatorio (padrao: 42).")
+        parser.add_argument(
+            "--variants",
+            nargs="+",
+            choices=SYNTHETIC_PASSPORT_VARIANTS,
+            default=list(SYNTHETIC_PASSPORT_VARIANTS),
+            help="Variantes a gerar, alternadas entre as amostras (padrao: todas).",
+        )
+        parser.add_argument("--output", help="Grava o relatorio JSON no arquivo (padrao: imprime na saida).")
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Mede tambem o pico de alocacoes Python (tracemalloc); deixa as latencias mais altas.",
+        )
+        parser.add_argument("--no-warmup", action="store_true", help="Inclui o carregamento dos modelos na 1a amostra.")
+
+    def handle(self, *args, **options):
+        if options["samples"] <= 0:
+            raise CommandError("--samples deve ser maior que zero.")
+
+        samples = generate_synthetic_passports(options["samples"], seed=options["seed"], variants=options["variants"])
+        try:
+            report = run_passport_ocr_benchmark(
+                samples,
+                warmup=not options["no_warmup"],
+                trace_memory=options["trace_memory"],
+            )
+        except PassportExtractionError as exc:
+            raise CommandError(str(exc)) from exc
+        report["seed"] = options["seed"]
+
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if not options["output"]:
+            self.stdout.write(payload)
+            return
+        with open(options["output"], "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+        total = report["latency_seconds"]["total"]
+        self.stdout.write(f"Amostras: {report['samples']} | falhas: {len(report['failures'])}")
+        self.stdout.write(f"Latencia total: p50={total['p50']}s p95={total['p95']}s")
+        self.stdout.write(f"Chamadas de OCR: media={report['ocr_calls']['mean']} max={report['ocr_calls']['max']}")
+        for field_name, accuracy in report["field_accuracy"].items():
+            self.stdout.write(f"  {field_name}: {accuracy}")
+        self.stdout.write(self.style.SUCCESS(f"Relatorio gravado em {options['output']}."))
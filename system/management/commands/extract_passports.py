@@ -0,0 +1,97 @@
+import os
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from system.services.passport_batch import (
+    PASSPORT_RESULT_FORMATS,
+    apply_passport_fields,
+    extract_passport_batch,
+    iter_passport_documents,
+    match_passport_results,
+    write_passport_results,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Extrai dados de passaporte (OCR) de um diretorio ou ZIP de digitalizacoes, grava JSONL/CSV "
+        "e, opcionalmente, preenche os campos de passaporte dos clientes encontrados por CPF ou nome."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Diretorio ou arquivo ZIP com os passaportes (PNG, JPG ou PDF).")
+        parser.add_argument("--output", required=True, help="Arquivo de resultados (.jsonl ou .csv).")
+        parser.add_argument(
+            "--format",
+            choices=PASSPORT_RESULT_FORMATS,
+            default="",
+            help="Formato da saida (padrao: pela extensao de --output).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help="Processos de OCR em paralelo (padrao: min(4, CPUs)).",
+        )
+        parser.add_argument(
+            "--match",
+            action="store_true",
+            help="Associa cada passaporte a um cliente: CPF no nome do arquivo ou nome completo + nascimento.",
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Preenche passport_* dos clientes associados (implica --match).",
+        )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Com --apply, substitui valores ja preenchidos (padrao: so preenche campos vazios).",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options["path"])
+        if not source.exists():
+            raise CommandError(f"Caminho nao encontrado: {source}")
+        output_format = options["format"] or Path(options["output"]).suffix.lstrip(".").lower()
+        if output_format not in PASSPORT_RESULT_FORMATS:
+            raise CommandError("Use --output com extensao .jsonl ou .csv, ou informe --format.")
+        if options["workers"] <= 0:
+            raise CommandError("--workers deve ser maior que zero.")
+
+        started = time.perf_counter()
+        results = extract_passport_batch(iter_passport_documents(source), workers=options["workers"])
+        elapsed = time.perf_counter() - started
+        if not results:
+            raise CommandError(f"Nenhum arquivo PNG, JPG ou PDF encontrado em {source}.")
+
+        updated = 0
+        if options["match"] or options["apply"]:
+            matched = match_passport_results(results)
+            if options["apply"]:
+                with transaction.atomic():
+                    updated = apply_passport_fields(results, matched, overwrite=options["overwrite"])
+        write_passport_results(results, options["output"], output_format)
+
+        failures = [result for result in results if result["status"] == "error"]
+        for result in results:
+            line = f"{result['file']}: {result['status']} {result['latency_ms']:.0f}ms"
+            if result.get("client_id"):
+                line += f" cliente={result['client_id']} ({result['match']})"
+            if result["error"]:
+                line += f" - {result['error']}"
+            self.stdout.write(line)
+
+        cached = sum(1 for result in results if result["status"] == "cached")
+        self.stdout.write(
+            f"Arquivos: {len(results)} | falhas: {len(failures)} | cache: {cached} | "
+            f"tempo: {elapsed:.1f}s | vazao: {len(results) / max(elapsed, 1e-9):.2f} arquivos/s"
+        )
+        if options["match"] or options["apply"]:
+            matched_count = sum(1 for result in results if result.get("client_id"))
+            self.stdout.write(f"Clientes associados: {matched_count} | atualizados: {updated}")
+        style = self.style.WARNING if failures else self.style.SUCCESS
+        self.stdout.write(style(f"Resultados gravados em {options['output']}."))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from system.services.legacy_synthetic import SYNTHETIC_FORMATS, generate_legacy_dataset, open_dataset_writer
+
+
+class Command(BaseCommand):
+    help = "Gera um dataset legado sintetico (JSONL ou SQLite) para testar e medir o seed_legacy offline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Diretorio JSONL ou arquivo SQLite de destino.")
+        parser.add_argument("--clients", type=int, default=10000, help="Quantidade de clientes legados (padrao: 10000).")
+        parser.add_argument("--format", choices=SYNTHETIC_FORMATS, default="jsonl", help="Formato de saida (padrao: jsonl).")
+        parser.add_argument("--seed", type=int, default=42, help="Semente do gerador aleatorio (padrao: 42).")
+        parser.add_argument(
+            "--family-every",
+            type=int,
+            default=5,
+            help="A cada N clientes, um e dependente do anterior e viaja no mesmo grupo (padrao: 5; 0 desativa).",
+        )
+
+    def handle(self, *args, **options):
+        if options["clients"] <= 0:
+            raise CommandError("--clients deve ser maior que zero.")
+
+        started = time.perf_counter()
+        writer = open_dataset_writer(options["format"], options["output"])
+        counts = generate_legacy_dataset(
+            writer,
+            clients=options["clients"],
+            seed=options["seed"],
+            family_every=options["family_every"],
+        )
+        elapsed = time.perf_counter() - started
+
+        for table, total in sorted(counts.items()):
+            self.stdout.write(f"{table}: {total}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dataset {options['format']} gerado em {options['output']} ({elapsed:.1f}s)."
+            )
+        )
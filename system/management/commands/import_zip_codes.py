@@ -0,0 +1,68 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from system.services.cep_dataset import import_zip_code_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa uma base de CEPs (CSV de CEPs individuais ou de faixas, com logradouro, bairro, cidade e UF) "
+        "para a tabela local consultada antes das fontes online."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Arquivo CSV com cabecalho: cep (ou cep_inicial e cep_final), logradouro, bairro, cidade, uf.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Linhas por lote de bulk_create (padrao: 5000)."
+        )
+        parser.add_argument("--encoding", default="utf-8-sig", help="Codificacao do arquivo (padrao: utf-8-sig).")
+        parser.add_argument(
+            "--delimiter", default="", help="Separador de colunas (padrao: detectado entre , ; | e tab)."
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Substitui a base local; a exclusao e a importacao rodam em uma unica transacao.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"Arquivo nao encontrado: {path}")
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        started = time.perf_counter()
+
+        def progress(counts):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {counts['read']} linhas lidas ({counts['read'] / max(elapsed, 1e-9):.0f} linhas/s)")
+
+        try:
+            counts = import_zip_code_dataset(
+                path,
+                batch_size=options["batch_size"],
+                replace=options["replace"],
+                encoding=options["encoding"],
+                delimiter=options["delimiter"],
+                progress=progress if options["verbosity"] > 1 else None,
+            )
+        except (UnicodeDecodeError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Linhas: {counts['read']} | importadas: {counts['imported']} | ignoradas: {counts['skipped']} | "
+            f"tempo: {elapsed:.1f}s"
+        )
+        if counts["invalid_lines"]:
+            lines = ", ".join(str(line) for line in counts["invalid_lines"])
+            self.stdout.write(self.style.WARNING(f"Linhas invalidas (primeiras): {lines}"))
+        if counts["negative_cache_cleared"]:
+            self.stdout.write(f"Cache negativo de CEP limpo: {counts['negative_cache_cleared']} entrada(s).")
+        self.stdout.write(self.style.SUCCESS(f"Base local de CEP importada de {path}."))
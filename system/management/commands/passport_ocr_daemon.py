@@ -0,0 +1,65 @@
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from system.services.passport_ocr import (
+    PassportExtractionError,
+    extract_passport_data_from_bytes,
+    preload_passport_ocr,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Sobe o daemon local de OCR de passaporte: carrega os motores uma vez e atende "
+        "os workers do Django por um socket Unix (PASSPORT_OCR_DAEMON_SOCKET)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            default="",
+            help="Caminho do socket Unix (padrao: PASSPORT_OCR_DAEMON_SOCKET).",
+        )
+
+    def handle(self, *args, **options):
+        socket_path = options["socket"] or settings.PASSPORT_OCR_DAEMON_SOCKET
+        if not socket_path:
+            raise CommandError("Informe --socket ou configure PASSPORT_OCR_DAEMON_SOCKET.")
+        if not hasattr(socket, "AF_UNIX"):
+            raise CommandError("Sockets Unix nao sao suportados nesta plataforma.")
+
+        from system.services.passport_ocr_daemon import PassportOcrDaemonServer
+
+        started = time.perf_counter()
+        try:
+            preload_passport_ocr()
+        except PassportExtractionError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f"Motores de OCR carregados em {time.perf_counter() - started:.1f}s.")
+
+        try:
+            server = PassportOcrDaemonServer(
+                socket_path,
+                extract_passport_data_from_bytes,
+                extraction_error=PassportExtractionError,
+            )
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        # SIGTERM (systemd/supervisor) encerra como Ctrl+C, removendo o socket.
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        self.stdout.write(self.style.SUCCESS(f"Daemon de OCR ouvindo em {socket_path}."))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("Encerrando daemon de OCR.")
+        finally:
+            server.server_close()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
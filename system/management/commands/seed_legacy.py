@@ -1,13 +1,15 @@
 import re
 import unicodedata
 from collections import Counter, defaultdict
-from datetime import datetime
+from datetime import datetime, time
 from decimal import Decimal, InvalidOperation
+from operator import itemgetter
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from system.models import (
     ConsultancyClient,
@@ -17,6 +19,8 @@ from system.models import (
     FinancialStatus,
     FormAnswer,
     FormQuestion,
+    LegacyImportCheckpoint,
+    LegacySyncState,
     Partner,
     Process,
     ProcessStage,
@@ -27,7 +31,29 @@ from system.models import (
     VisaForm,
     VisaType,
 )
-from system.services.legacy_markers import extract_legacy_meta, upsert_legacy_meta
+from system.services.legacy_links import (
+    LEGACY_CLIENT_TABLE,
+    LEGACY_FINANCE_TABLE,
+    LEGACY_PROCESS_TABLE,
+    build_legacy_link,
+    legacy_link_index,
+    save_legacy_links,
+)
+from system.services.legacy_sources import (
+    LEGACY_DELTA_TABLES,
+    LEGACY_IN_BATCH_SIZE,
+    LEGACY_PAYLOAD_TABLES,
+    LEGACY_PROCESS_CHILD_TABLES,
+    LEGACY_QUERIES,
+    LEGACY_REFERENCE_TABLES,
+    LEGACY_SOURCE_KINDS,
+    LegacySourceError,
+    open_legacy_source,
+)
+from system.services.profiling import PhaseProfiler
+
+
+LEGACY_IMPORT_BATCH_SIZE = 500
 
 
 def normalize_text(value: str | None) -> str:
@@ -85,6 +111,21 @@ def parse_date(value):
     return None
 
 
+def parse_datetime_value(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if hasattr(value, "year") and hasattr(value, "month") and hasattr(value, "day"):
+        return datetime.combine(value, time.min)
+    raw = str(value).strip()
+    parsed = parse_datetime(raw)
+    if parsed:
+        return parsed
+    parsed_date = parse_date(raw)
+    return datetime.combine(parsed_date, time.min) if parsed_date else None
+
+
 def parse_decimal(value) -> Decimal:
     if value in (None, ""):
         return Decimal("0")
@@ -132,16 +173,121 @@ def parse_bool(value):
     return None
 
 
+def legacy_row_id(row) -> int:
+    return int(row["id"])
+
+
 class Command(BaseCommand):
     help = "Importa dados do banco legado para clientes, viagens, processos, formularios e financeiro."
+    batch_size = LEGACY_IMPORT_BATCH_SIZE
+    source_kind = "mysql"
+    source_path = None
+    profiler = PhaseProfiler(enabled=False)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            choices=LEGACY_SOURCE_KINDS,
+            default="mysql",
+            help="Origem dos dados legados: mysql (LEGACY_DB_*), sqlite (arquivo convertido do dump) ou jsonl (um arquivo por tabela).",
+        )
+        parser.add_argument(
+            "--source-path",
+            help="Arquivo SQLite ou diretorio JSONL usado por --source sqlite/jsonl.",
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            "--since",
+            help=(
+                "Importa apenas linhas alteradas ou novas desde a data/hora informada (YYYY-MM-DD[ HH:MM:SS]). "
+                "Exclusoes no legado (deleted_at) nao sao propagadas: as linhas excluidas sao so listadas."
+            ),
+        )
+        mode.add_argument(
+            "--incremental",
+            action="store_true",
+            help=(
+                "Importa apenas linhas alteradas ou novas desde a ultima marca d'agua registrada (LegacySyncState). "
+                "Exclusoes no legado (deleted_at) nao sao propagadas: as linhas excluidas sao so listadas."
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Retoma a importacao a partir do ultimo lote concluido (LegacyImportCheckpoint).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=LEGACY_IMPORT_BATCH_SIZE,
+            help=f"Linhas legadas gravadas por transacao (padrao: {LEGACY_IMPORT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Executa transformacao e validacao completas e reverte todas as gravacoes ao final.",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Mede tempo, linhas, consultas SQL e memoria de cada fase e imprime uma tabela ao final.",
+        )
+        parser.add_argument(
+            "--profile-json",
+            help="Grava o relatorio de --profile no arquivo JSON informado (implica --profile).",
+        )
 
     def handle(self, *args, **options):
-        legacy = self._load_legacy_data()
-        blocking = self._detect_blocking_anomalies(legacy)
-        if blocking:
-            raise CommandError(
-                "Anomalias bloqueantes detectadas no legado:\n- " + "\n- ".join(blocking)
+        self.source_kind = options.get("source") or "mysql"
+        self.source_path = options.get("source_path")
+        self.profiler = PhaseProfiler(enabled=bool(options.get("profile") or options.get("profile_json")))
+        dry_run = bool(options.get("dry_run"))
+        try:
+            if dry_run:
+                with transaction.atomic():
+                    self._run_import(options)
+                    transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING("Dry-run: todas as gravacoes foram revertidas."))
+            else:
+                self._run_import(options)
+        finally:
+            if self.profiler.enabled:
+                self._write_profile_report(options, dry_run)
+
+    def _write_profile_report(self, options, dry_run):
+        self.stdout.write("\n================= PERFIL POR FASE =================")
+        for line in self.profiler.render_table():
+            self.stdout.write(line)
+        if options.get("profile_json"):
+            self.profiler.write_json(
+                options["profile_json"],
+                generated_at=timezone.now().isoformat(),
+                dry_run=dry_run,
+                incremental=bool(options.get("incremental") or options.get("since")),
+                batch_size=self.batch_size,
             )
+            self.stdout.write(f"Perfil gravado em {options['profile_json']}")
+
+    def _run_import(self, options):
+        watermarks = self._resolve_delta_watermarks(options)
+        if watermarks is None:
+            with self.profiler.phase("load_legacy") as record:
+                legacy = self._load_legacy_data()
+                record["rows_in"] = sum(len(rows) for rows in legacy.values())
+            changed = legacy
+            blocking = self._detect_blocking_anomalies(legacy)
+            if blocking:
+                raise CommandError(
+                    "Anomalias bloqueantes detectadas no legado:\n- " + "\n- ".join(blocking)
+                )
+        else:
+            with self.profiler.phase("load_legacy") as record:
+                legacy, changed, deleted = self._load_legacy_delta(watermarks)
+                record["rows_in"] = sum(len(rows) for rows in legacy.values())
+            self._warn_deleted_rows(deleted)
+            if not any(changed[table] for table in LEGACY_DELTA_TABLES):
+                self.stdout.write("Nenhuma alteracao no legado desde a marca d'agua informada.")
+                return
 
         actor = self._get_actor_user()
         default_advisor = ConsultancyUser.objects.filter(is_active=True).order_by("id").first()
@@ -151,17 +297,60 @@ class Command(BaseCommand):
                 "Rode seed_consultancy_users antes de seed_legacy."
             )
 
+        self.batch_size = max(1, options.get("batch_size") or LEGACY_IMPORT_BATCH_SIZE)
+        if not options.get("resume"):
+            LegacyImportCheckpoint.objects.all().delete()
+
         with transaction.atomic():
-            country_map = self._import_countries(legacy, actor)
-            visa_type_map = self._import_visa_types(legacy, country_map, actor)
-            partner_map = self._import_partners(legacy, actor)
-            client_map, client_issues = self._import_clients(
+            with self.profiler.phase("countries", rows_in=len(legacy["pais"])) as record:
+                country_map = self._import_countries(legacy, actor)
+                record["rows_written"] = len(country_map)
+            with self.profiler.phase("visa_types", rows_in=len(legacy["pais_tipo_visto"])) as record:
+                visa_type_map = self._import_visa_types(legacy, country_map, actor)
+                record["rows_written"] = len(visa_type_map)
+            with self.profiler.phase("partners", rows_in=len(legacy["parceiros"])) as record:
+                partner_map = self._import_partners(legacy, actor)
+                record["rows_written"] = len(partner_map)
+
+        client_index = self._existing_clients_by_legacy_id()
+        cpf_by_legacy_id = self._resolve_client_cpfs(legacy.get("clientes_cpf") or legacy["clientes"])
+        client_map = {}
+        client_issues = {}
+
+        def import_clients_batch(rows):
+            batch_map, batch_issues = self._import_clients(
                 legacy,
                 default_advisor,
                 actor,
+                rows=rows,
+                client_index=client_index,
+                cpf_by_legacy_id=cpf_by_legacy_id,
             )
-            self._import_dependents(legacy, client_map)
-            trip_map = self._import_trips(
+            client_map.update(batch_map)
+            client_issues.update(batch_issues)
+            return len(batch_map)
+
+        self._run_checkpointed_phase("clients", legacy["clientes"], import_clients_batch, key=legacy_row_id)
+        for row in legacy["clientes"]:
+            legacy_id = int(row["id"])
+            if legacy_id not in client_map and legacy_id in client_index:
+                client_map[legacy_id] = client_index[legacy_id]
+                client_issues[legacy_id] = cpf_by_legacy_id.get(legacy_id, ("", []))[1]
+
+        self._run_checkpointed_phase(
+            "dependents",
+            legacy["familiares_clientes"],
+            lambda rows: self._import_dependents(legacy, client_map, rows=rows),
+            key=legacy_row_id,
+        )
+
+        groups = self._build_process_groups(legacy)
+        group_rows = self._trip_group_rows(legacy, groups)
+        trip_index = self._index_by_link(Trip, LEGACY_PROCESS_TABLE)
+        trip_map = {}
+
+        def import_trips_batch(items):
+            batch_map = self._import_trips(
                 legacy,
                 client_map,
                 visa_type_map,
@@ -169,37 +358,86 @@ class Command(BaseCommand):
                 partner_map,
                 default_advisor,
                 actor,
+                group_rows=dict(items),
+                trip_index=trip_index,
             )
-            partner_links = self._collect_legacy_partner_links(legacy)
-            partners_linked_count = self._link_clients_partners(
-                client_map,
-                partner_map,
-                partner_links,
-            )
-            process_map = self._import_processes(
+            trip_map.update(batch_map)
+            return len(batch_map)
+
+        self._run_checkpointed_phase("trips", list(group_rows.items()), import_trips_batch, key=itemgetter(0))
+        self._restore_from_index(trip_map, group_rows, trip_index)
+
+        partner_links = self._collect_legacy_partner_links(legacy)
+        partners_linked_count = self._run_checkpointed_phase(
+            "partner_links",
+            list(partner_links.items()),
+            lambda items: self._link_clients_partners(client_map, partner_map, dict(items)),
+            key=itemgetter(0),
+        )
+
+        process_index = self._index_by_link(Process, LEGACY_PROCESS_TABLE)
+        process_map = {}
+
+        def import_processes_batch(rows):
+            batch_map = self._import_processes(
                 legacy,
                 client_map,
                 trip_map,
                 visa_type_map,
                 default_advisor,
                 actor,
+                rows=rows,
+                groups=groups,
+                process_index=process_index,
             )
-            stages_count = self._import_process_stages(
+            process_map.update(batch_map)
+            return len(batch_map)
+
+        self._run_checkpointed_phase("processes", legacy["processos"], import_processes_batch, key=legacy_row_id)
+        self._restore_from_index(process_map, (legacy_row_id(row) for row in legacy["processos"]), process_index)
+
+        cronograma_maps = self._legacy_cronograma_maps(legacy)
+        stages_count = self._run_checkpointed_phase(
+            "process_stages",
+            legacy["processos"],
+            lambda rows: self._import_process_stages(
                 legacy,
                 process_map,
                 visa_type_map,
-            )
-            financial_count = self._import_financial(
+                rows=rows,
+                cronograma_maps=cronograma_maps,
+            ),
+            key=legacy_row_id,
+        )
+
+        record_index = self._index_by_link(FinancialRecord, LEGACY_FINANCE_TABLE)
+        financial_count = self._run_checkpointed_phase(
+            "financial",
+            legacy["entradas"],
+            lambda rows: self._import_financial(
                 legacy,
                 process_map,
                 default_advisor,
                 actor,
-            )
-            answers_count = self._import_form_answers(
+                rows=rows,
+                record_index=record_index,
+            ),
+            key=legacy_row_id,
+        )
+
+        payload_maps = self._legacy_process_payload_maps(legacy)
+        answers_count = self._run_checkpointed_phase(
+            "form_answers",
+            legacy["processos"],
+            lambda rows: self._import_form_answers(
                 legacy,
                 process_map,
                 visa_type_map,
-            )
+                rows=rows,
+                payload_maps=payload_maps,
+            ),
+            key=legacy_row_id,
+        )
 
         self._print_validation_report(
             legacy=legacy,
@@ -213,81 +451,178 @@ class Command(BaseCommand):
             answers_count=answers_count,
         )
 
-    def _get_legacy_connection(self):
-        try:
-            import pymysql
-        except ImportError as exc:
-            raise CommandError("pymysql nao instalado no .venv.") from exc
-
-        env = {
-            "host": settings.LEGACY_DB_HOST or None,
-            "port": int(settings.LEGACY_DB_PORT or "3306"),
-            "database": settings.LEGACY_DB_NAME or None,
-            "user": settings.LEGACY_DB_USER or None,
-            "password": settings.LEGACY_DB_PASSWORD or None,
-        }
-        missing = [key for key, value in env.items() if not value and key != "port"]
-        if missing:
-            raise CommandError(f"Variaveis LEGACY_DB_* ausentes: {', '.join(missing)}")
+        # Só depois da validação: uma rodada com divergências não pode avançar a marca d'água,
+        # senão o próximo --incremental pularia justamente as linhas divergentes.
+        with transaction.atomic():
+            self._save_sync_watermarks(self._compute_watermarks(changed))
 
+    def _open_legacy_source(self):
         try:
-            return pymysql.connect(
-                host=env["host"],
-                port=env["port"],
-                user=env["user"],
-                password=env["password"],
-                database=env["database"],
-                charset="utf8mb4",
-                cursorclass=pymysql.cursors.DictCursor,
-            )
-        except Exception as exc:
-            raise CommandError(f"Falha na conexao ao legado: {exc}") from exc
+            return open_legacy_source(self.source_kind, self.source_path)
+        except LegacySourceError as exc:
+            raise CommandError(str(exc)) from exc
 
     def _load_legacy_data(self):
-        conn = self._get_legacy_connection()
-        cursor = conn.cursor()
-
-        queries = {
-            "clientes": """
-                SELECT
-                    c.*, u.email AS user_email, u.name AS user_name, u.password AS user_password,
-                    ur.email AS responsavel_email, ur.name AS responsavel_name
-                FROM clientes c
-                LEFT JOIN users u ON u.id = c.usuario_id
-                LEFT JOIN users ur ON ur.id = c.usuario_responsavel_id
-                WHERE c.deleted_at IS NULL
-            """,
-            "familiares_clientes": "SELECT * FROM familiares_clientes",
-            "processos": "SELECT * FROM processos WHERE deleted_at IS NULL",
-            "processo_clientes": "SELECT * FROM processo_clientes",
-            "cronograma_processos": "SELECT * FROM cronograma_processos WHERE deleted_at IS NULL",
-            "situacao_processos": "SELECT * FROM situacao_processos",
-            "passaportes": "SELECT * FROM passaportes WHERE deleted_at IS NULL",
-            "informacoes_adicionais_viagems": "SELECT * FROM informacoes_adicionais_viagems WHERE deleted_at IS NULL",
-            "informacoes_educacionais": "SELECT * FROM informacoes_educacionais WHERE deleted_at IS NULL",
-            "dados_escolas": "SELECT * FROM dados_escolas WHERE deleted_at IS NULL",
-            "dados_financeiros": "SELECT * FROM dados_financeiros WHERE deleted_at IS NULL",
-            "dados_viagem_anteriores": "SELECT * FROM dados_viagem_anteriores WHERE deleted_at IS NULL",
-            "dados_vistos_anteriores": "SELECT * FROM dados_vistos_anteriores WHERE deleted_at IS NULL",
-            "saude_historico_imigracionals": "SELECT * FROM saude_historico_imigracionals WHERE deleted_at IS NULL",
-            "pais": "SELECT * FROM pais WHERE deleted_at IS NULL",
-            "tipo_vistos": "SELECT * FROM tipo_vistos WHERE deleted_at IS NULL",
-            "pais_tipo_visto": "SELECT * FROM pais_tipo_visto",
-            "parceiros": """
-                SELECT p.*, u.email AS user_email, u.name AS user_name
-                FROM parceiros p
-                LEFT JOIN users u ON u.id = p.usuario_id
-                WHERE p.deleted_at IS NULL
-            """,
-            "entradas": "SELECT * FROM entradas WHERE deleted_at IS NULL",
+        with self._open_legacy_source() as source:
+            return {key: source.fetch_rows(key) for key in LEGACY_QUERIES}
+
+    def _resolve_delta_watermarks(self, options):
+        if options.get("since"):
+            since = parse_datetime_value(options["since"])
+            if not since:
+                raise CommandError(f"Valor invalido para --since: {options['since']}")
+            if timezone.is_aware(since):
+                since = timezone.make_naive(since)
+            return {table: (since, None) for table in LEGACY_DELTA_TABLES}
+        if not options.get("incremental"):
+            return None
+
+        states = {
+            state.table_name: state
+            for state in LegacySyncState.objects.filter(table_name__in=LEGACY_DELTA_TABLES)
+        }
+        missing = [table for table in LEGACY_DELTA_TABLES if table not in states]
+        if missing:
+            raise CommandError(
+                "Marca d'agua ausente para: " + ", ".join(missing) + ". "
+                "Rode seed_legacy completo antes de usar --incremental."
+            )
+        return {
+            table: (
+                timezone.make_naive(state.last_updated_at) if state.last_updated_at else None,
+                state.last_id,
+            )
+            for table, state in states.items()
         }
 
-        data = {}
-        for key, sql in queries.items():
-            cursor.execute(sql)
-            data[key] = cursor.fetchall()
-        conn.close()
-        return data
+    def _load_legacy_delta(self, watermarks):
+        with self._open_legacy_source() as source:
+            data = {key: source.fetch_rows(key) for key in LEGACY_REFERENCE_TABLES}
+            changed = {
+                table: source.fetch_rows(table, watermark=watermarks[table])
+                for table in LEGACY_DELTA_TABLES
+            }
+            deleted = {
+                table: [int(row["id"]) for row in source.iter_rows(table, watermark=watermarks[table], deleted=True)]
+                for table in LEGACY_DELTA_TABLES
+            }
+
+            client_ids = {int(row["id"]) for row in changed["clientes"]}
+            process_ids = {int(row["id"]) for row in changed["processos"]}
+            for table in LEGACY_PROCESS_CHILD_TABLES:
+                process_ids.update(int(row["processo_id"]) for row in changed[table] if row.get("processo_id"))
+            client_processes = source.fetch_rows("processos", column="cliente_id", ids=client_ids)
+            process_ids.update(int(row["id"]) for row in client_processes)
+            process_ids = self._expand_process_group_ids(data["processo_clientes"], process_ids)
+
+            data["processos"] = source.fetch_rows("processos", column="id", ids=process_ids)
+            client_ids.update(int(row["cliente_id"]) for row in data["processos"] if row.get("cliente_id"))
+            client_ids = self._expand_family_client_ids(data["familiares_clientes"], client_ids)
+            data["clientes"] = source.fetch_rows("clientes", column="id", ids=client_ids)
+            for table in LEGACY_PROCESS_CHILD_TABLES:
+                data[table] = source.fetch_rows(table, column="processo_id", ids=process_ids)
+            data["clientes_cpf"] = sorted(source.iter_client_cpfs(), key=lambda item: int(item["id"]))
+        return data, changed, deleted
+
+    def _warn_deleted_rows(self, deleted):
+        for table, ids in deleted.items():
+            if ids:
+                sample = ", ".join(str(legacy_id) for legacy_id in sorted(ids)[:10])
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Aviso: {len(ids)} linha(s) de {table} excluida(s) no legado continuam no Visary "
+                        f"(exclusoes nao sao propagadas). IDs: {sample}{' ...' if len(ids) > 10 else ''}"
+                    )
+                )
+
+    def _expand_process_group_ids(self, processo_clientes, process_ids):
+        principal_by_child = {}
+        children_by_principal = defaultdict(set)
+        for row in processo_clientes:
+            child_id = int(row["id_processo_cliente"])
+            principal_id = int(row["id_processo_principal"])
+            principal_by_child[child_id] = principal_id
+            children_by_principal[principal_id].add(child_id)
+        expanded = set()
+        for process_id in process_ids:
+            principal_id = principal_by_child.get(process_id, process_id)
+            expanded.add(process_id)
+            expanded.add(principal_id)
+            expanded.update(children_by_principal.get(principal_id, ()))
+        return expanded
+
+    def _expand_family_client_ids(self, familiares_clientes, client_ids):
+        expanded = set(client_ids)
+        for row in familiares_clientes:
+            principal_id = int(row["id_cliente_principal"])
+            dependent_id = int(row["id_cliente_familiar"])
+            if principal_id in client_ids or dependent_id in client_ids:
+                expanded.update((principal_id, dependent_id))
+        return expanded
+
+    def _compute_watermarks(self, rows_by_table):
+        marks = {}
+        for table in LEGACY_DELTA_TABLES:
+            rows = rows_by_table.get(table) or []
+            updated_values = [
+                value
+                for value in (parse_datetime_value(row.get("updated_at")) for row in rows)
+                if value
+            ]
+            ids = [int(row["id"]) for row in rows if row.get("id") is not None]
+            marks[table] = (
+                max(updated_values) if updated_values else None,
+                max(ids) if ids else 0,
+            )
+        return marks
+
+    def _save_sync_watermarks(self, marks):
+        for table, (updated_at, last_id) in marks.items():
+            state, _ = LegacySyncState.objects.get_or_create(table_name=table)
+            if updated_at is not None:
+                if timezone.is_naive(updated_at):
+                    updated_at = timezone.make_aware(updated_at)
+                if state.last_updated_at is None or updated_at > state.last_updated_at:
+                    state.last_updated_at = updated_at
+            state.last_id = max(state.last_id, last_id)
+            state.save()
+
+    def _run_checkpointed_phase(self, phase, rows, handler, key=None):
+        checkpoint, _ = LegacyImportCheckpoint.objects.get_or_create(phase=phase)
+        if checkpoint.is_complete:
+            return checkpoint.rows_written
+
+        if key is None:
+            batches = [list(rows)]
+        else:
+            pending = sorted(
+                (row for row in rows if checkpoint.last_key is None or key(row) > checkpoint.last_key),
+                key=key,
+            )
+            batches = [
+                pending[start : start + self.batch_size]
+                for start in range(0, len(pending), self.batch_size)
+            ]
+
+        with self.profiler.phase(phase, rows_in=sum(len(batch) for batch in batches)) as record:
+            for batch in batches:
+                with transaction.atomic():
+                    written = handler(batch)
+                    if key is not None and batch:
+                        checkpoint.last_key = key(batch[-1])
+                    checkpoint.batches_completed += 1
+                    checkpoint.rows_written += written
+                    checkpoint.save()
+                record["rows_written"] += written
+
+        checkpoint.is_complete = True
+        checkpoint.save(update_fields=["is_complete", "updated_at"])
+        return checkpoint.rows_written
+
+    def _restore_from_index(self, target_map, legacy_ids, index):
+        for legacy_id in legacy_ids:
+            if legacy_id not in target_map and legacy_id in index:
+                target_map[legacy_id] = index[legacy_id]
 
     def _detect_blocking_anomalies(self, legacy):
         anomalies = []
@@ -417,12 +752,8 @@ class Command(BaseCommand):
             return 0
         return max(0, min(100, percentage))
 
-    def _find_by_exact_marker(self, model_class, marker):
-        for instance in model_class.objects.filter(notes__contains=marker.split("=")[0]):
-            for line in str(instance.notes or "").splitlines():
-                if line.strip() == marker:
-                    return instance
-        return None
+    def _index_by_link(self, model_class, legacy_table):
+        return legacy_link_index(model_class.objects.all(), legacy_table)
 
     def _import_partners(self, legacy, actor):
         partner_map = {}
@@ -500,27 +831,16 @@ class Command(BaseCommand):
 
         return default_advisor
 
-    def _import_clients(self, legacy, default_advisor, actor):
-        clientes = legacy["clientes"]
-        by_email, by_name = self._build_advisor_lookup()
+    def _resolve_client_cpfs(self, cpf_rows):
         cpf_counter = Counter()
-        for row in clientes:
+        for row in cpf_rows:
             cpf = normalize_cpf(row.get("cpf"))
             if cpf:
                 cpf_counter[cpf] += 1
 
+        resolved = {}
         cpf_seen = set()
-        existing = ConsultancyClient.objects.select_related("assigned_advisor").all()
-        by_legacy_id = {}
-        for client in existing:
-            meta = extract_legacy_meta(client.notes)
-            if meta.get("legacy_cliente_id"):
-                by_legacy_id[int(meta["legacy_cliente_id"])] = client
-
-        client_map = {}
-        issue_map = {}
-
-        for row in clientes:
+        for row in cpf_rows:
             legacy_id = int(row["id"])
             raw_cpf = normalize_cpf(row.get("cpf"))
             issues = []
@@ -537,7 +857,29 @@ class Command(BaseCommand):
                     issues.append(f"CPF duplicado no legado ({format_cpf(raw_cpf)}). Este registro manteve o CPF original.")
 
             cpf_seen.add(raw_cpf)
-            cpf_formatted = format_cpf(use_cpf)
+            resolved[legacy_id] = (format_cpf(use_cpf), issues)
+        return resolved
+
+    def _existing_clients_by_legacy_id(self):
+        return legacy_link_index(
+            ConsultancyClient.objects.select_related("assigned_advisor"),
+            LEGACY_CLIENT_TABLE,
+        )
+
+    def _import_clients(self, legacy, default_advisor, actor, rows=None, client_index=None, cpf_by_legacy_id=None):
+        clientes = legacy["clientes"] if rows is None else rows
+        by_email, by_name = self._build_advisor_lookup()
+        if cpf_by_legacy_id is None:
+            cpf_by_legacy_id = self._resolve_client_cpfs(legacy.get("clientes_cpf") or legacy["clientes"])
+        by_legacy_id = self._existing_clients_by_legacy_id() if client_index is None else client_index
+
+        client_map = {}
+        issue_map = {}
+        links = []
+
+        for row in clientes:
+            legacy_id = int(row["id"])
+            cpf_formatted, issues = cpf_by_legacy_id.get(legacy_id) or self._resolve_client_cpfs([row])[legacy_id]
 
             first_name = str(row.get("nome") or "").strip()
             last_name = str(row.get("sobrenome") or "").strip()
@@ -585,23 +927,18 @@ class Command(BaseCommand):
             if row.get("user_password"):
                 client.password = str(row["user_password"])
 
-            meta = {
-                "source": "legacy",
-                "legacy_cliente_id": legacy_id,
-                "imported": True,
-                "status": "problem" if issues else "ok",
-                "issues": issues,
-            }
-            client.notes = upsert_legacy_meta(client.notes, meta)
             client.save()
+            links.append(build_legacy_link(client, LEGACY_CLIENT_TABLE, legacy_id, issues))
 
             client_map[legacy_id] = client
             issue_map[legacy_id] = issues
 
+        save_legacy_links(links)
         return client_map, issue_map
 
-    def _import_dependents(self, legacy, client_map):
-        for row in legacy["familiares_clientes"]:
+    def _import_dependents(self, legacy, client_map, rows=None):
+        updated = 0
+        for row in legacy["familiares_clientes"] if rows is None else rows:
             principal = client_map.get(int(row["id_cliente_principal"]))
             dependent = client_map.get(int(row["id_cliente_familiar"]))
             if not principal or not dependent or principal.pk == dependent.pk:
@@ -609,6 +946,8 @@ class Command(BaseCommand):
             if dependent.primary_client_id != principal.pk:
                 dependent.primary_client = principal
                 dependent.save(update_fields=["primary_client", "updated_at"])
+                updated += 1
+        return updated
 
     def _build_process_groups(self, legacy):
         process_ids = {int(process_row["id"]) for process_row in legacy["processos"]}
@@ -624,8 +963,7 @@ class Command(BaseCommand):
             normalized[process_id] = principal_id if principal_id in process_ids else process_id
         return normalized
 
-    def _import_trips(self, legacy, client_map, visa_type_map, country_map, partner_map, default_advisor, actor):
-        groups = self._build_process_groups(legacy)
+    def _trip_group_rows(self, legacy, groups):
         processes_by_id = {int(row["id"]): row for row in legacy["processos"]}
         group_rows = {}
         for process_id, principal_id in groups.items():
@@ -633,8 +971,27 @@ class Command(BaseCommand):
                 continue
             if principal_id not in group_rows:
                 group_rows[principal_id] = processes_by_id[process_id]
+        return group_rows
+
+    def _import_trips(
+        self,
+        legacy,
+        client_map,
+        visa_type_map,
+        country_map,
+        partner_map,
+        default_advisor,
+        actor,
+        group_rows=None,
+        trip_index=None,
+    ):
+        if group_rows is None:
+            group_rows = self._trip_group_rows(legacy, self._build_process_groups(legacy))
+        if trip_index is None:
+            trip_index = self._index_by_link(Trip, LEGACY_PROCESS_TABLE)
 
         trip_map = {}
+        links = []
         for group_id, process_row in group_rows.items():
             country = country_map.get(int(process_row["pais_id"]))
             vt = visa_type_map.get(int(process_row["tipo_visto_id"]))
@@ -646,8 +1003,7 @@ class Command(BaseCommand):
             )
             if not country or not vt:
                 continue
-            marker = f"LEGACY_TRAVEL_GROUP_ID={group_id}"
-            trip = self._find_by_exact_marker(Trip, marker)
+            trip = trip_index.get(group_id)
             if not trip:
                 trip = Trip.objects.create(
                     assigned_advisor=trip_advisor,
@@ -657,7 +1013,6 @@ class Command(BaseCommand):
                     planned_return_date=parse_date(process_row.get("data_prevista_retorno")) or datetime(2030, 1, 2).date(),
                     advisory_fee=Decimal("0"),
                     created_by=actor,
-                    notes=marker,
                 )
             else:
                 trip.assigned_advisor = trip_advisor
@@ -666,18 +1021,33 @@ class Command(BaseCommand):
                 trip.planned_departure_date = parse_date(process_row.get("data_prevista_viagem")) or trip.planned_departure_date
                 trip.planned_return_date = parse_date(process_row.get("data_prevista_retorno")) or trip.planned_return_date
                 trip.created_by = actor
-                if marker not in (trip.notes or ""):
-                    trip.notes = f"{marker}\n{trip.notes or ''}".strip()
                 trip.save()
 
+            links.append(build_legacy_link(trip, LEGACY_PROCESS_TABLE, group_id))
             trip_map[group_id] = trip
 
+        save_legacy_links(links)
         return trip_map
 
-    def _import_processes(self, legacy, client_map, trip_map, visa_type_map, default_advisor, actor):
-        groups = self._build_process_groups(legacy)
+    def _import_processes(
+        self,
+        legacy,
+        client_map,
+        trip_map,
+        visa_type_map,
+        default_advisor,
+        actor,
+        rows=None,
+        groups=None,
+        process_index=None,
+    ):
+        if groups is None:
+            groups = self._build_process_groups(legacy)
+        if process_index is None:
+            process_index = self._index_by_link(Process, LEGACY_PROCESS_TABLE)
         process_map = {}
-        for row in legacy["processos"]:
+        links = []
+        for row in legacy["processos"] if rows is None else rows:
             process_id = int(row["id"])
             group_id = groups[process_id]
             trip = trip_map.get(group_id)
@@ -690,8 +1060,7 @@ class Command(BaseCommand):
                 else default_advisor
             )
 
-            marker = f"LEGACY_PROCESS_ID={process_id}"
-            process = self._find_by_exact_marker(Process, marker)
+            process = process_index.get(process_id)
             if not process:
                 process, _ = Process.objects.get_or_create(
                     trip=trip,
@@ -699,11 +1068,8 @@ class Command(BaseCommand):
                     defaults={
                         "assigned_advisor": process_advisor,
                         "created_by": actor,
-                        "notes": marker,
                     },
                 )
-            if marker not in (process.notes or ""):
-                process.notes = f"{marker}\n{process.notes or ''}".strip()
             process.assigned_advisor = process_advisor
             process.created_by = actor
             process.save()
@@ -714,7 +1080,9 @@ class Command(BaseCommand):
                 client=client,
                 defaults={"visa_type": vt},
             )
+            links.append(build_legacy_link(process, LEGACY_PROCESS_TABLE, process_id))
             process_map[process_id] = process
+        save_legacy_links(links)
         return process_map
 
     def _collect_legacy_partner_links(self, legacy):
@@ -814,10 +1182,10 @@ class Command(BaseCommand):
         by_name = {normalize_text(s.name): s for s in statuses}
         return statuses, by_name
 
-    def _import_process_stages(self, legacy, process_map, visa_type_map):
+    def _import_process_stages(self, legacy, process_map, visa_type_map, rows=None, cronograma_maps=None):
         updated = 0
-        situacao_by_id, cronograma_by_process = self._legacy_cronograma_maps(legacy)
-        for row in legacy["processos"]:
+        situacao_by_id, cronograma_by_process = cronograma_maps or self._legacy_cronograma_maps(legacy)
+        for row in legacy["processos"] if rows is None else rows:
             process_id = int(row["id"])
             process = process_map.get(process_id)
             if not process:
@@ -878,9 +1246,12 @@ class Command(BaseCommand):
                 updated += 1
         return updated
 
-    def _import_financial(self, legacy, process_map, default_advisor, actor):
+    def _import_financial(self, legacy, process_map, default_advisor, actor, rows=None, record_index=None):
+        if record_index is None:
+            record_index = self._index_by_link(FinancialRecord, LEGACY_FINANCE_TABLE)
         created_or_updated = 0
-        for row in legacy["entradas"]:
+        links = []
+        for row in legacy["entradas"] if rows is None else rows:
             process_id = row.get("processo_id")
             if not process_id:
                 continue
@@ -888,8 +1259,7 @@ class Command(BaseCommand):
             if not process:
                 continue
 
-            marker = f"LEGACY_FINANCE_ENTRY_ID={int(row['id'])}"
-            record = self._find_by_exact_marker(FinancialRecord, marker)
+            record = record_index.get(int(row["id"]))
             status = FinancialStatus.PAID if parse_bool(row.get("pago")) else FinancialStatus.PENDING
             if not record:
                 record, _ = FinancialRecord.objects.update_or_create(
@@ -900,7 +1270,6 @@ class Command(BaseCommand):
                         "amount": parse_decimal(row.get("valor")),
                         "payment_date": parse_date(row.get("data")) if status == FinancialStatus.PAID else None,
                         "status": status,
-                        "notes": marker,
                         "created_by": actor,
                     },
                 )
@@ -910,25 +1279,15 @@ class Command(BaseCommand):
                 record.payment_date = parse_date(row.get("data")) if status == FinancialStatus.PAID else None
                 record.status = status
                 record.created_by = actor
-                if marker not in (record.notes or ""):
-                    record.notes = f"{marker}\n{record.notes or ''}".strip()
                 record.save()
+            links.append(build_legacy_link(record, LEGACY_FINANCE_TABLE, row["id"]))
             created_or_updated += 1
+        save_legacy_links(links)
         return created_or_updated
 
     def _legacy_process_payload_maps(self, legacy):
-        tables = [
-            "passaportes",
-            "informacoes_adicionais_viagems",
-            "informacoes_educacionais",
-            "dados_escolas",
-            "dados_financeiros",
-            "dados_viagem_anteriores",
-            "dados_vistos_anteriores",
-            "saude_historico_imigracionals",
-        ]
-        payload = {table: {} for table in tables}
-        for table in tables:
+        payload = {table: {} for table in LEGACY_PAYLOAD_TABLES}
+        for table in LEGACY_PAYLOAD_TABLES:
             for row in legacy[table]:
                 process_id = int(row["processo_id"])
                 payload[table].setdefault(process_id, row)
@@ -998,15 +1357,16 @@ class Command(BaseCommand):
                     return raw_value
         return None
 
-    def _import_form_answers(self, legacy, process_map, visa_type_map):
-        payload_maps = self._legacy_process_payload_maps(legacy)
+    def _import_form_answers(self, legacy, process_map, visa_type_map, rows=None, payload_maps=None):
+        if payload_maps is None:
+            payload_maps = self._legacy_process_payload_maps(legacy)
         legacy_clients_by_id = {
             int(item["id"]): item
             for item in legacy["clientes"]
             if item.get("id") is not None
         }
         total = 0
-        for legacy_process in legacy["processos"]:
+        for legacy_process in legacy["processos"] if rows is None else rows:
             process_id = int(legacy_process["id"])
             process = process_map.get(process_id)
             if not process:
@@ -1089,11 +1449,12 @@ class Command(BaseCommand):
                 total += 1
         return total
 
-    def _match_option(self, question, value):
+    def _match_option(self, question, value, options=None):
         needle = normalize_text(value)
         if not needle:
             return None
-        options = SelectOption.objects.filter(question=question, is_active=True).order_by("order")
+        if options is None:
+            options = SelectOption.objects.filter(question=question, is_active=True).order_by("order")
         exact = None
         partial = None
         for option in options:
@@ -1105,6 +1466,20 @@ class Command(BaseCommand):
                 partial = option
         return exact or partial
 
+    def _fetch_in_chunks(self, queryset, field, ids):
+        ordered_ids = sorted(set(ids))
+        for start in range(0, len(ordered_ids), LEGACY_IN_BATCH_SIZE):
+            yield from queryset.filter(**{f"{field}__in": ordered_ids[start : start + LEGACY_IN_BATCH_SIZE]})
+
+    def _status_name_maps_by_visa_type(self):
+        statuses_by_visa_type = defaultdict(list)
+        for status in ProcessStatus.objects.filter(is_active=True).order_by("order", "id"):
+            statuses_by_visa_type[status.visa_type_id].append(status)
+        return {
+            visa_type_id: (statuses, {normalize_text(s.name): s for s in statuses})
+            for visa_type_id, statuses in statuses_by_visa_type.items()
+        }
+
     def _strict_sql_orm_validation(self, legacy, client_map, process_map):
         legacy_process_map = {
             int(row["id"]): row
@@ -1119,6 +1494,25 @@ class Command(BaseCommand):
         }
         situacao_by_id, cronograma_by_process = self._legacy_cronograma_maps(legacy)
 
+        process_pks = [process.pk for process in process_map.values()]
+        visa_type_by_trip = dict(
+            self._fetch_in_chunks(
+                Trip.objects.values_list("pk", "visa_type_id"),
+                "pk",
+                (process.trip_id for process in process_map.values()),
+            )
+        )
+        status_maps = self._status_name_maps_by_visa_type()
+        global_status_map = status_maps.get(None, ([], {}))
+        stage_completed = {
+            (process_id, status_id): completed
+            for process_id, status_id, completed in self._fetch_in_chunks(
+                ProcessStage.objects.values_list("process_id", "status_id", "completed"),
+                "process_id",
+                process_pks,
+            )
+        }
+
         stage_mismatches = []
         for process_id, process in process_map.items():
             legacy_row = legacy_process_map.get(process_id)
@@ -1130,8 +1524,8 @@ class Command(BaseCommand):
             if not vt_legacy_id:
                 continue
 
-            trip_vt = process.trip.visa_type
-            statuses, status_by_name = self._build_status_name_map(trip_vt)
+            trip_vt_id = visa_type_by_trip.get(process.trip_id)
+            statuses, status_by_name = status_maps.get(trip_vt_id) or global_status_map
             if not statuses:
                 continue
 
@@ -1154,15 +1548,15 @@ class Command(BaseCommand):
                     expected_done = stage_state_by_status.get(status.pk, {}).get("completed", False)
                 else:
                     expected_done = index < done_count
-                stage = ProcessStage.objects.filter(process=process, status=status).first()
-                if not stage:
+                completed = stage_completed.get((process.pk, status.pk))
+                if completed is None:
                     stage_mismatches.append(
                         f"Processo {process_id}: etapa '{status.name}' ausente no ORM"
                     )
                     continue
-                if stage.completed != expected_done:
+                if completed != expected_done:
                     stage_mismatches.append(
-                        f"Processo {process_id}: etapa '{status.name}' esperado={expected_done} orm={stage.completed}"
+                        f"Processo {process_id}: etapa '{status.name}' esperado={expected_done} orm={completed}"
                     )
 
         partner_mismatches = []
@@ -1172,15 +1566,24 @@ class Command(BaseCommand):
             if row.get("id") is not None
         }
         expected_links = self._collect_legacy_partner_links(legacy)
+        partner_by_client = {
+            client_pk: (partner_id, email)
+            for client_pk, partner_id, email in self._fetch_in_chunks(
+                ConsultancyClient.objects.values_list("pk", "referring_partner_id", "referring_partner__email"),
+                "pk",
+                (client_map[legacy_id].pk for legacy_id in expected_links if legacy_id in client_map),
+            )
+        }
         for legacy_client_id, legacy_partner_id in expected_links.items():
             client = client_map.get(legacy_client_id)
-            if not client or not client.referring_partner_id:
+            partner_id, partner_email = partner_by_client.get(client.pk, (None, None)) if client else (None, None)
+            if not partner_id:
                 partner_mismatches.append(
                     f"Cliente legado {legacy_client_id}: parceiro ausente no ORM"
                 )
                 continue
             expected_email = legacy_partner_by_id.get(legacy_partner_id)
-            current_email = str(client.referring_partner.email or "").strip().lower()
+            current_email = str(partner_email or "").strip().lower()
             if expected_email and expected_email != current_email:
                 partner_mismatches.append(
                     f"Cliente legado {legacy_client_id}: parceiro esperado={expected_email} orm={current_email}"
@@ -1195,22 +1598,49 @@ class Command(BaseCommand):
             "data validade",
             "cidade emissao",
         )
+        form_by_visa_type = {
+            form.visa_type_id: form
+            for form in VisaForm.objects.filter(is_active=True)
+        }
+        critical_questions_by_form = defaultdict(list)
+        for question in FormQuestion.objects.filter(form__in=form_by_visa_type.values(), is_active=True).order_by("order"):
+            q_key = normalize_text(question.question)
+            if any(alias in q_key for alias in critical_form_aliases):
+                critical_questions_by_form[question.form_id].append(question)
+        options_by_question = defaultdict(list)
+        for option in SelectOption.objects.filter(
+            question__form__in=form_by_visa_type.values(),
+            question__field_type="select",
+            is_active=True,
+        ).order_by("order"):
+            options_by_question[option.question_id].append(option)
+
+        process_pairs = {(process.trip_id, process.client_id) for process in process_map.values()}
+        answer_counts = Counter()
+        answers_by_key = {}
+        for answer in self._fetch_in_chunks(
+            FormAnswer.objects.select_related("question", "answer_select"),
+            "client_id",
+            (client_id for _, client_id in process_pairs),
+        ):
+            pair = (answer.trip_id, answer.client_id)
+            if pair not in process_pairs:
+                continue
+            answer_counts[pair] += 1
+            answers_by_key[(answer.trip_id, answer.client_id, answer.question_id)] = answer
+
         for process_id, process in process_map.items():
             legacy_row = legacy_process_map.get(process_id)
             if not legacy_row:
                 continue
             expected_concluded_form = parse_bool(legacy_row.get("conclusao_formulario")) is True
-            orm_qs = FormAnswer.objects.filter(
-                trip=process.trip,
-                client=process.client,
-            )
-            orm_response_count = orm_qs.count()
+            orm_response_count = answer_counts[(process.trip_id, process.client_id)]
             if expected_concluded_form and orm_response_count == 0:
                 form_mismatches.append(
                     f"Processo {process_id}: legado conclusao_formulario=1 mas ORM sem respostas"
                 )
 
-            form = VisaForm.objects.filter(visa_type=process.trip.visa_type, is_active=True).first()
+            form = form_by_visa_type.get(visa_type_by_trip.get(process.trip_id))
             legacy_client = legacy_client_map.get(int(legacy_row.get("cliente_id") or 0))
             if not form or not legacy_client:
                 continue
@@ -1222,14 +1652,11 @@ class Command(BaseCommand):
             for table_name, table_map in payload_maps.items():
                 context[table_name] = table_map.get(process_id, {})
 
-            for question in FormQuestion.objects.filter(form=form, is_active=True).order_by("order"):
-                q_key = normalize_text(question.question)
-                if not any(alias in q_key for alias in critical_form_aliases):
-                    continue
+            for question in critical_questions_by_form.get(form.pk, []):
                 expected_value = self._extract_answer_value(question.question, context)
                 if expected_value in (None, ""):
                     continue
-                answer = orm_qs.filter(question=question).first()
+                answer = answers_by_key.get((process.trip_id, process.client_id, question.pk))
                 if not answer:
                     form_mismatches.append(
                         f"Processo {process_id}: pergunta '{question.question}' sem resposta no ORM"
@@ -1255,7 +1682,11 @@ class Command(BaseCommand):
                             f"Processo {process_id}: pergunta '{question.question}' booleano esperado={expected_bool} orm={answer.answer_boolean}"
                         )
                 elif question.field_type == "select":
-                    expected_option = self._match_option(question, expected_value)
+                    expected_option = self._match_option(
+                        question,
+                        expected_value,
+                        options=options_by_question.get(question.pk, []),
+                    )
                     if expected_option and answer.answer_select_id != expected_option.pk:
                         form_mismatches.append(
                             f"Processo {process_id}: pergunta '{question.question}' selecao esperada={expected_option.text} orm={answer.get_answer_display()}"
@@ -1311,11 +1742,12 @@ class Command(BaseCommand):
         for advisor_name, count in advisor_counter.items():
             self.stdout.write(f"Clientes vinculados ao assessor {advisor_name}: {count}")
 
-        strict_report = self._strict_sql_orm_validation(
-            legacy=legacy,
-            client_map=client_map,
-            process_map=process_map,
-        )
+        with self.profiler.phase("validation", rows_in=len(client_map) + len(process_map)):
+            strict_report = self._strict_sql_orm_validation(
+                legacy=legacy,
+                client_map=client_map,
+                process_map=process_map,
+            )
         stage_issues = strict_report["stage_mismatches"]
         partner_issues = strict_report["partner_mismatches"]
         form_issues = strict_report["form_mismatches"]
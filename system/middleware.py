@@ -1,3 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from system.services.permissions import RequestPermissions
+
+
 class VisaryRequestMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -7,4 +12,9 @@ class VisaryRequestMiddleware:
         request.visary_partner_id = request.session.get("partner_id")
         request.visary_is_client_area = bool(request.visary_client_id)
         request.visary_is_partner_area = bool(request.visary_partner_id)
+        # Preguiçosos: nada é consultado até o primeiro acesso, que já acontece depois do
+        # AuthenticationMiddleware. Nas views, prefira request.permissions.consultant, que é a
+        # instância real (ou None) e pode ser atribuída a chaves estrangeiras.
+        request.permissions = RequestPermissions(request)
+        request.consultant = SimpleLazyObject(lambda: request.permissions.consultant)
         return self.get_response(request)
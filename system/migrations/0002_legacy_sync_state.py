@@ -0,0 +1,28 @@
+# Generated by Django 4.1.13 on 2026-10-19 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LegacySyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=100, unique=True, verbose_name='Tabela legada')),
+                ('last_updated_at', models.DateTimeField(blank=True, null=True, verbose_name='Último updated_at')),
+                ('last_id', models.PositiveBigIntegerField(default=0, verbose_name='Último id')),
+                ('synced_at', models.DateTimeField(auto_now=True, verbose_name='Sincronizado em')),
+            ],
+            options={
+                'verbose_name': 'Estado de Sincronização Legada',
+                'verbose_name_plural': 'Estados de Sincronização Legada',
+                'ordering': ['table_name'],
+            },
+        ),
+    ]
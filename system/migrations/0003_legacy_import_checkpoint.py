@@ -0,0 +1,30 @@
+# Generated by Django 4.1.13 on 2026-10-19 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0002_legacy_sync_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LegacyImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phase', models.CharField(max_length=60, unique=True, verbose_name='Fase')),
+                ('last_key', models.BigIntegerField(blank=True, null=True, verbose_name='Última chave concluída')),
+                ('batches_completed', models.PositiveIntegerField(default=0, verbose_name='Lotes concluídos')),
+                ('rows_written', models.PositiveIntegerField(default=0, verbose_name='Linhas gravadas')),
+                ('is_complete', models.BooleanField(default=False, verbose_name='Concluída')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Importação Legada',
+                'verbose_name_plural': 'Checkpoints de Importação Legada',
+                'ordering': ['id'],
+            },
+        ),
+    ]
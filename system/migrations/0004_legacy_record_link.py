@@ -0,0 +1,32 @@
+# Generated by Django 4.1.13 on 2026-10-19 03:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0003_legacy_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LegacyRecordLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID do registro')),
+                ('legacy_table', models.CharField(max_length=100, verbose_name='Tabela legada')),
+                ('legacy_id', models.BigIntegerField(verbose_name='ID legado')),
+                ('status', models.CharField(choices=[('ok', 'OK'), ('problem', 'Com problemas')], default='ok', max_length=20, verbose_name='Status')),
+                ('issues', models.JSONField(blank=True, default=list, verbose_name='Pendências')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Vínculo Legado',
+                'verbose_name_plural': 'Vínculos Legados',
+                'ordering': ['model', 'legacy_table', 'legacy_id'],
+                'unique_together': {('model', 'object_id'), ('model', 'legacy_table', 'legacy_id')},
+            },
+        ),
+    ]
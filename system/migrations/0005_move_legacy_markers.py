@@ -0,0 +1,143 @@
+import json
+
+from django.db import migrations
+
+# Cópia congelada do formato de system.services.legacy_markers: a migração não pode depender do serviço.
+LEGACY_MARKER_PREFIX = "[LEGACY_META]"
+
+
+def build_legacy_meta_text(payload):
+    return f"{LEGACY_MARKER_PREFIX}{json.dumps(payload, ensure_ascii=False)}"
+
+
+def extract_legacy_meta(text):
+    for line in str(text or "").splitlines():
+        if line.startswith(LEGACY_MARKER_PREFIX):
+            try:
+                payload = json.loads(line[len(LEGACY_MARKER_PREFIX) :])
+            except json.JSONDecodeError:
+                return {}
+            return payload if isinstance(payload, dict) else {}
+    return {}
+
+
+def strip_legacy_meta(text):
+    lines = [line for line in str(text or "").splitlines() if not line.startswith(LEGACY_MARKER_PREFIX)]
+    return "\n".join(lines).strip()
+
+# (model, tabela legada, prefixo do marcador nas observações)
+LEGACY_NOTE_MARKERS = (
+    ("Trip", "processos", "LEGACY_TRAVEL_GROUP_ID"),
+    ("Process", "processos", "LEGACY_PROCESS_ID"),
+    ("FinancialRecord", "entradas", "LEGACY_FINANCE_ENTRY_ID"),
+)
+
+
+def _split_marker(notes, prefix):
+    legacy_id = None
+    kept = []
+    for line in str(notes or "").splitlines():
+        key, separator, value = line.strip().partition("=")
+        if separator and key == prefix and value.isdigit():
+            if legacy_id is None:
+                legacy_id = int(value)
+            continue
+        kept.append(line)
+    return legacy_id, "\n".join(kept).strip()
+
+
+def move_markers_to_links(apps, schema_editor):
+    LegacyRecordLink = apps.get_model("system", "LegacyRecordLink")
+
+    def store(model_class, legacy_table, parsed):
+        label = model_class._meta.label_lower
+        seen_legacy_ids = set()
+        links = []
+        updated = []
+        for instance, legacy_id, notes, status, issues in parsed:
+            instance.notes = notes
+            updated.append(instance)
+            if legacy_id in seen_legacy_ids:
+                continue
+            seen_legacy_ids.add(legacy_id)
+            links.append(
+                LegacyRecordLink(
+                    model=label,
+                    object_id=instance.pk,
+                    legacy_table=legacy_table,
+                    legacy_id=legacy_id,
+                    status=status,
+                    issues=issues,
+                )
+            )
+        LegacyRecordLink.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+        model_class.objects.bulk_update(updated, ["notes"], batch_size=500)
+
+    ConsultancyClient = apps.get_model("system", "ConsultancyClient")
+    parsed = []
+    for client in ConsultancyClient.objects.filter(notes__contains=LEGACY_MARKER_PREFIX).only("pk", "notes").iterator():
+        meta = extract_legacy_meta(client.notes)
+        notes = strip_legacy_meta(client.notes)
+        if not meta.get("legacy_cliente_id"):
+            continue
+        issues = meta.get("issues") or []
+        status = meta.get("status") or ("problem" if issues else "ok")
+        parsed.append((client, int(meta["legacy_cliente_id"]), notes, status, issues))
+    store(ConsultancyClient, "clientes", parsed)
+
+    for model_name, legacy_table, prefix in LEGACY_NOTE_MARKERS:
+        model_class = apps.get_model("system", model_name)
+        parsed = []
+        for instance in model_class.objects.filter(notes__contains=f"{prefix}=").only("pk", "notes").iterator():
+            legacy_id, notes = _split_marker(instance.notes, prefix)
+            if legacy_id is not None:
+                parsed.append((instance, legacy_id, notes, "ok", []))
+        store(model_class, legacy_table, parsed)
+
+
+def restore_markers_from_links(apps, schema_editor):
+    LegacyRecordLink = apps.get_model("system", "LegacyRecordLink")
+
+    def restore(model_class, legacy_table, render):
+        links = {
+            object_id: (legacy_id, status, issues)
+            for object_id, legacy_id, status, issues in LegacyRecordLink.objects.filter(
+                model=model_class._meta.label_lower,
+                legacy_table=legacy_table,
+            ).values_list("object_id", "legacy_id", "status", "issues")
+        }
+        instances = model_class.objects.in_bulk(list(links))
+        for object_id, instance in instances.items():
+            instance.notes = f"{render(*links[object_id])}\n{instance.notes or ''}".strip()
+        model_class.objects.bulk_update(list(instances.values()), ["notes"], batch_size=500)
+
+    restore(
+        apps.get_model("system", "ConsultancyClient"),
+        "clientes",
+        lambda legacy_id, status, issues: build_legacy_meta_text(
+            {
+                "source": "legacy",
+                "legacy_cliente_id": legacy_id,
+                "imported": True,
+                "status": status,
+                "issues": issues,
+            }
+        ),
+    )
+    for model_name, legacy_table, prefix in LEGACY_NOTE_MARKERS:
+        restore(
+            apps.get_model("system", model_name),
+            legacy_table,
+            lambda legacy_id, status, issues, prefix=prefix: f"{prefix}={legacy_id}",
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("system", "0004_legacy_record_link"),
+    ]
+
+    operations = [
+        migrations.RunPython(move_markers_to_links, restore_markers_from_links),
+    ]
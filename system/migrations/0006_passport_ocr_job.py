@@ -0,0 +1,41 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('system', '0005_move_legacy_markers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PassportOcrJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Identificador')),
+                ('filename', models.CharField(max_length=255, verbose_name='Arquivo')),
+                ('document', models.BinaryField(blank=True, null=True, verbose_name='Documento')),
+                ('target', models.CharField(default='client', max_length=30, verbose_name='Destino')),
+                ('persist_in_session', models.BooleanField(default=False, verbose_name='Salvar na sessão')),
+                ('status', models.CharField(choices=[('pending', 'Na fila'), ('running', 'Processando'), ('done', 'Concluído'), ('failed', 'Falhou')], db_index=True, default='pending', max_length=20, verbose_name='Status')),
+                ('fields', models.JSONField(blank=True, default=dict, verbose_name='Campos extraídos')),
+                ('warnings', models.JSONField(blank=True, default=list, verbose_name='Avisos')),
+                ('error', models.TextField(blank=True, verbose_name='Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizado em')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='passport_ocr_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+            ],
+            options={
+                'verbose_name': 'Extração de Passaporte',
+                'verbose_name_plural': 'Extrações de Passaporte',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0006_passport_ocr_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PassportOcrCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, verbose_name='SHA-256 do arquivo')),
+                ('pipeline_version', models.CharField(max_length=20, verbose_name='Versão do pipeline')),
+                ('fields', models.JSONField(blank=True, default=dict, verbose_name='Campos extraídos')),
+                ('warnings', models.JSONField(blank=True, default=list, verbose_name='Avisos')),
+                ('pipeline', models.JSONField(blank=True, default=dict, verbose_name='Pipeline')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='Acertos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Criado em')),
+                ('last_used_at', models.DateTimeField(db_index=True, verbose_name='Último uso')),
+            ],
+            options={
+                'verbose_name': 'Cache de OCR de Passaporte',
+                'verbose_name_plural': 'Cache de OCR de Passaporte',
+                'ordering': ['-last_used_at'],
+                'unique_together': {('digest', 'pipeline_version')},
+            },
+        ),
+    ]
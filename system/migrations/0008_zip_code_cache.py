@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0007_passport_ocr_cache_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZipCodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cep', models.CharField(max_length=8, unique=True, verbose_name='CEP')),
+                ('address', models.JSONField(blank=True, default=dict, verbose_name='Endereço')),
+                ('source', models.CharField(blank=True, max_length=50, verbose_name='Fonte')),
+                ('error', models.CharField(blank=True, max_length=500, verbose_name='Erro')),
+                ('fetched_at', models.DateTimeField(db_index=True, verbose_name='Consultado em')),
+            ],
+            options={
+                'verbose_name': 'Cache de CEP',
+                'verbose_name_plural': 'Cache de CEP',
+                'ordering': ['-fetched_at'],
+            },
+        ),
+    ]
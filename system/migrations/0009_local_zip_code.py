@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0008_zip_code_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocalZipCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cep_start', models.PositiveIntegerField(verbose_name='CEP inicial')),
+                ('cep_end', models.PositiveIntegerField(verbose_name='CEP final')),
+                ('street', models.CharField(blank=True, max_length=200, verbose_name='Logradouro')),
+                ('district', models.CharField(blank=True, max_length=100, verbose_name='Bairro')),
+                ('city', models.CharField(max_length=100, verbose_name='Cidade')),
+                ('uf', models.CharField(max_length=2, verbose_name='UF')),
+            ],
+            options={
+                'verbose_name': 'CEP da Base Local',
+                'verbose_name_plural': 'CEPs da Base Local',
+                'ordering': ['cep_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='localzipcode',
+            constraint=models.UniqueConstraint(fields=('cep_start', 'cep_end'), name='unique_local_zip_code_range'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.13 on 2026-10-19 05:01
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0009_local_zip_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passportocrjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas'),
+        ),
+        migrations.AddField(
+            model_name='passportocrjob',
+            name='queued_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Na fila desde'),
+        ),
+    ]
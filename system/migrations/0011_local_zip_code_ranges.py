@@ -0,0 +1,28 @@
+# Generated by Django 4.1.13 on 2026-10-19 05:04
+
+from django.db import migrations, models
+
+
+def mark_ranges(apps, schema_editor):
+    LocalZipCode = apps.get_model("system", "LocalZipCode")
+    LocalZipCode.objects.filter(cep_start__lt=models.F("cep_end")).update(is_range=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0010_passport_ocr_job_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='localzipcode',
+            name='is_range',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Faixa'),
+        ),
+        migrations.RunPython(mark_ranges, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='localzipcode',
+            index=models.Index(condition=models.Q(('is_range', True)), fields=['cep_start', 'cep_end'], name='local_zip_code_ranges'),
+        ),
+    ]
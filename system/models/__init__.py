@@ -1,7 +1,10 @@
+from .address_models import LocalZipCode, ZipCodeCache
 from .client_models import ConsultancyClient, Reminder
 from .financial_models import FinancialRecord, FinancialStatus
 from .form_models import FormAnswer, FormQuestion, SelectOption, VisaForm, VisaFormStage
+from .legacy_models import LegacyImportCheckpoint, LegacyRecordLink, LegacyRecordStatus, LegacySyncState
 from .partners_models import Partner
+from .passport_models import PassportOcrCacheEntry, PassportOcrJob, PassportOcrJobStatus
 from .permission_models import ConsultancyUser, Module, Profile
 from .process_models import Process, ProcessStage, ProcessStatus, TripProcessStatus
 from .registration_step_models import ClientRegistrationStep, ClientStepField
@@ -17,8 +20,16 @@ __all__ = (
     "FinancialStatus",
     "FormAnswer",
     "FormQuestion",
+    "LegacyImportCheckpoint",
+    "LegacyRecordLink",
+    "LegacyRecordStatus",
+    "LegacySyncState",
+    "LocalZipCode",
     "Module",
     "Partner",
+    "PassportOcrCacheEntry",
+    "PassportOcrJob",
+    "PassportOcrJobStatus",
     "Process",
     "ProcessStage",
     "ProcessStatus",
@@ -31,4 +42,5 @@ __all__ = (
     "VisaForm",
     "VisaFormStage",
     "VisaType",
+    "ZipCodeCache",
 )
@@ -0,0 +1,56 @@
+from django.db import models
+
+
+class ZipCodeCache(models.Model):
+    # Resultado normalizado da busca de CEP; endereço vazio indica CEP não encontrado (cache negativo).
+    cep = models.CharField("CEP", max_length=8, unique=True)
+    address = models.JSONField("Endereço", default=dict, blank=True)
+    source = models.CharField("Fonte", max_length=50, blank=True)
+    error = models.CharField("Erro", max_length=500, blank=True)
+    fetched_at = models.DateTimeField("Consultado em", db_index=True)
+
+    class Meta:
+        ordering = ["-fetched_at"]
+        verbose_name = "Cache de CEP"
+        verbose_name_plural = "Cache de CEP"
+
+    def __str__(self) -> str:
+        return f"{self.cep} ({self.source or 'não encontrado'})"
+
+    @property
+    def found(self) -> bool:
+        return bool(self.address)
+
+
+class LocalZipCode(models.Model):
+    # Base de CEPs importada (import_zip_codes); um CEP individual tem início igual ao fim.
+    # As faixas têm um índice parcial próprio, para a busca por faixa não percorrer os CEPs individuais.
+    cep_start = models.PositiveIntegerField("CEP inicial")
+    cep_end = models.PositiveIntegerField("CEP final")
+    is_range = models.BooleanField("Faixa", default=False, editable=False)
+    street = models.CharField("Logradouro", max_length=200, blank=True)
+    district = models.CharField("Bairro", max_length=100, blank=True)
+    city = models.CharField("Cidade", max_length=100)
+    uf = models.CharField("UF", max_length=2)
+
+    class Meta:
+        ordering = ["cep_start"]
+        constraints = [models.UniqueConstraint(fields=["cep_start", "cep_end"], name="unique_local_zip_code_range")]
+        indexes = [
+            models.Index(
+                fields=["cep_start", "cep_end"],
+                condition=models.Q(is_range=True),
+                name="local_zip_code_ranges",
+            )
+        ]
+        verbose_name = "CEP da Base Local"
+        verbose_name_plural = "CEPs da Base Local"
+
+    def __str__(self) -> str:
+        if self.cep_start == self.cep_end:
+            return f"{self.cep_start:08d} - {self.city}/{self.uf}"
+        return f"{self.cep_start:08d}-{self.cep_end:08d} - {self.city}/{self.uf}"
+
+    def save(self, *args, **kwargs):
+        self.is_range = self.cep_start != self.cep_end
+        super().save(*args, **kwargs)
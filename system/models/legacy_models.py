@@ -0,0 +1,63 @@
+from django.db import models
+
+
+class LegacySyncState(models.Model):
+    table_name = models.CharField("Tabela legada", max_length=100, unique=True)
+    last_updated_at = models.DateTimeField("Último updated_at", null=True, blank=True)
+    last_id = models.PositiveBigIntegerField("Último id", default=0)
+    synced_at = models.DateTimeField("Sincronizado em", auto_now=True)
+
+    class Meta:
+        ordering = ["table_name"]
+        verbose_name = "Estado de Sincronização Legada"
+        verbose_name_plural = "Estados de Sincronização Legada"
+
+    def __str__(self) -> str:
+        return f"{self.table_name} ({self.last_updated_at}, {self.last_id})"
+
+
+class LegacyImportCheckpoint(models.Model):
+    phase = models.CharField("Fase", max_length=60, unique=True)
+    last_key = models.BigIntegerField("Última chave concluída", null=True, blank=True)
+    batches_completed = models.PositiveIntegerField("Lotes concluídos", default=0)
+    rows_written = models.PositiveIntegerField("Linhas gravadas", default=0)
+    is_complete = models.BooleanField("Concluída", default=False)
+    updated_at = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "Checkpoint de Importação Legada"
+        verbose_name_plural = "Checkpoints de Importação Legada"
+
+    def __str__(self) -> str:
+        return f"{self.phase} ({self.batches_completed} lotes)"
+
+
+class LegacyRecordStatus(models.TextChoices):
+    OK = "ok", "OK"
+    PROBLEM = "problem", "Com problemas"
+
+
+class LegacyRecordLink(models.Model):
+    model = models.CharField("Modelo", max_length=100)
+    object_id = models.PositiveBigIntegerField("ID do registro")
+    legacy_table = models.CharField("Tabela legada", max_length=100)
+    legacy_id = models.BigIntegerField("ID legado")
+    status = models.CharField(
+        "Status",
+        max_length=20,
+        choices=LegacyRecordStatus.choices,
+        default=LegacyRecordStatus.OK,
+    )
+    issues = models.JSONField("Pendências", default=list, blank=True)
+    updated_at = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        ordering = ["model", "legacy_table", "legacy_id"]
+        verbose_name = "Vínculo Legado"
+        verbose_name_plural = "Vínculos Legados"
+        unique_together = [("model", "object_id"), ("model", "legacy_table", "legacy_id")]
+
+    def __str__(self) -> str:
+        return f"{self.model}#{self.object_id} <- {self.legacy_table}#{self.legacy_id}"
+
@@ -0,0 +1,74 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class PassportOcrJobStatus(models.TextChoices):
+    PENDING = "pending", "Na fila"
+    RUNNING = "running", "Processando"
+    DONE = "done", "Concluído"
+    FAILED = "failed", "Falhou"
+
+
+class PassportOcrJob(models.Model):
+    job_id = models.UUIDField("Identificador", default=uuid.uuid4, unique=True, editable=False)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="passport_ocr_jobs",
+        verbose_name="Criado por",
+    )
+    filename = models.CharField("Arquivo", max_length=255)
+    document = models.BinaryField("Documento", null=True, blank=True)
+    target = models.CharField("Destino", max_length=30, default="client")
+    persist_in_session = models.BooleanField("Salvar na sessão", default=False)
+    status = models.CharField(
+        "Status",
+        max_length=20,
+        choices=PassportOcrJobStatus.choices,
+        default=PassportOcrJobStatus.PENDING,
+        db_index=True,
+    )
+    fields = models.JSONField("Campos extraídos", default=dict, blank=True)
+    warnings = models.JSONField("Avisos", default=list, blank=True)
+    error = models.TextField("Erro", blank=True)
+    attempts = models.PositiveSmallIntegerField("Tentativas", default=0)
+    created_at = models.DateTimeField("Criado em", auto_now_add=True)
+    queued_at = models.DateTimeField("Na fila desde", default=timezone.now)
+    started_at = models.DateTimeField("Iniciado em", null=True, blank=True)
+    finished_at = models.DateTimeField("Finalizado em", null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Extração de Passaporte"
+        verbose_name_plural = "Extrações de Passaporte"
+
+    def __str__(self) -> str:
+        return f"{self.filename} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in {PassportOcrJobStatus.DONE, PassportOcrJobStatus.FAILED}
+
+
+class PassportOcrCacheEntry(models.Model):
+    # Apenas o resultado derivado do OCR; o arquivo do passaporte nunca é guardado.
+    digest = models.CharField("SHA-256 do arquivo", max_length=64)
+    pipeline_version = models.CharField("Versão do pipeline", max_length=20)
+    fields = models.JSONField("Campos extraídos", default=dict, blank=True)
+    warnings = models.JSONField("Avisos", default=list, blank=True)
+    pipeline = models.JSONField("Pipeline", default=dict, blank=True)
+    hit_count = models.PositiveIntegerField("Acertos", default=0)
+    created_at = models.DateTimeField("Criado em", auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField("Último uso", db_index=True)
+
+    class Meta:
+        ordering = ["-last_used_at"]
+        unique_together = [("digest", "pipeline_version")]
+        verbose_name = "Cache de OCR de Passaporte"
+        verbose_name_plural = "Cache de OCR de Passaporte"
+
+    def __str__(self) -> str:
+        return f"{self.digest[:12]} (v{self.pipeline_version})"
@@ -0,0 +1,151 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from system.models import ConsultancyClient
+from system.services import cep_cache
+from system.services.cep import fetch_address_by_zip
+from system.services.cep_dataset import lookup_local_zip_code
+
+# Campo do cliente <- chave do endereço normalizado de services/cep.
+CLIENT_ADDRESS_FIELDS = {"street": "street", "district": "district", "city": "city", "state": "uf"}
+
+
+class RateLimiter:
+    # Token bucket simples e thread-safe: no máximo `rate` liberações por segundo, sem rajadas.
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def incomplete_address_clients():
+    return ConsultancyClient.objects.exclude(zip_code="").filter(
+        Q(street="") | Q(district="") | Q(city="") | Q(state="")
+    )
+
+
+def backfill_client_addresses(
+    *,
+    workers: int = 4,
+    rate: float = 5.0,
+    batch_size: int = 500,
+    limit: int | None = None,
+    overwrite: bool = False,
+    dry_run: bool = False,
+    progress=None,
+) -> dict:
+    # Retomável por construção: só entram clientes ainda incompletos, e cada lote é gravado
+    # assim que resolvido. CEPs sem resposta ficam no cache negativo e voltam rápido numa nova rodada.
+    clients_by_cep = {}
+    invalid = 0
+    queryset = incomplete_address_clients().order_by("pk").values_list("pk", "zip_code")
+    for pk, zip_code in queryset[:limit] if limit else queryset:
+        digits = re.sub(r"\D", "", zip_code)
+        if len(digits) != 8:
+            invalid += 1
+            continue
+        clients_by_cep.setdefault(digits, []).append(pk)
+
+    report = {
+        "clients": sum(len(pks) for pks in clients_by_cep.values()) + invalid,
+        "invalid_zip_codes": invalid,
+        "ceps": len(clients_by_cep),
+        "resolved_locally": 0,
+        "resolved_online": 0,
+        "failed": 0,
+        "clients_updated": 0,
+        "failures": {},
+    }
+    pending_updates = {}
+
+    def resolved(cep, address, online):
+        report["resolved_online" if online else "resolved_locally"] += 1
+        for pk in clients_by_cep[cep]:
+            pending_updates[pk] = address
+        if len(pending_updates) >= batch_size:
+            flush()
+
+    def failed(cep, error):
+        report["failed"] += 1
+        report["failures"][cep] = error
+
+    def flush():
+        if pending_updates:
+            report["clients_updated"] += _apply_addresses(
+                dict(pending_updates), overwrite=overwrite, dry_run=dry_run, batch_size=batch_size
+            )
+            pending_updates.clear()
+        if progress:
+            progress(report)
+
+    # Cache e base local são consultas de banco baratas: ficam na thread principal, sem limite de taxa.
+    remote = []
+    for cep in clients_by_cep:
+        cached = cep_cache.get_cached_address(cep)
+        if cached is None:
+            cached = lookup_local_zip_code(cep)
+        if isinstance(cached, dict):
+            resolved(cep, cached, online=False)
+        elif cached is not None:
+            failed(cep, cached)
+        else:
+            remote.append(cep)
+
+    limiter = RateLimiter(rate)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="address-backfill") as executor:
+        futures = {executor.submit(_resolve_online, cep, limiter): cep for cep in remote}
+        for future in as_completed(futures):
+            cep = futures[future]
+            try:
+                resolved(cep, future.result(), online=True)
+            except ValueError as exc:
+                failed(cep, str(exc))
+    flush()
+    return report
+
+
+def _resolve_online(cep, limiter):
+    limiter.acquire()
+    try:
+        return fetch_address_by_zip(cep)
+    finally:
+        # Threads do pool abrem a própria conexão com o banco (cache de CEP); não deixar aberta.
+        connection.close()
+
+
+def _apply_addresses(addresses_by_pk, *, overwrite, dry_run, batch_size) -> int:
+    fields = list(CLIENT_ADDRESS_FIELDS)
+    changed = []
+    for client in ConsultancyClient.objects.filter(pk__in=list(addresses_by_pk)).only("pk", *fields):
+        address = addresses_by_pk[client.pk]
+        dirty = False
+        for field_name, key in CLIENT_ADDRESS_FIELDS.items():
+            value = (address.get(key) or "")[: ConsultancyClient._meta.get_field(field_name).max_length]
+            if value and (overwrite or not getattr(client, field_name)) and getattr(client, field_name) != value:
+                setattr(client, field_name, value)
+                dirty = True
+        if dirty:
+            changed.append(client)
+    if changed and not dry_run:
+        # bulk_update não aplica o auto_now: o updated_at vai explícito na lista de campos.
+        now = timezone.now()
+        for client in changed:
+            client.updated_at = now
+        ConsultancyClient.objects.bulk_update(changed, [*fields, "updated_at"], batch_size=batch_size)
+    return len(changed)
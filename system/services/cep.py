@@ -1,8 +1,25 @@
 import re
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from time import monotonic
+
+from django.conf import settings
+
+from system.services import cep_cache, cep_health
+from system.services.cep_dataset import LOCAL_SOURCE_NAME, lookup_local_zip_code
+from system.services.http_client import get_http_session, http_timeout
 
 logger = logging.getLogger(__name__)
 
+_LOOKUP_EXECUTOR = None
+_LOOKUP_EXECUTOR_LOCK = threading.Lock()
+# Prazo da consulta em andamento na thread do pool; limita o timeout das chamadas HTTP.
+_CALL_DEADLINE = threading.local()
+VIACEP_URL = "https://viacep.com.br/ws/{cep}/json/"
+BRASILAPI_URL = "https://brasilapi.com.br/api/cep/v1/{cep}"
+
 try:
     import brazilcep
     from brazilcep import exceptions as cep_exceptions
@@ -23,6 +40,26 @@ except ImportError:
     correios_exceptions = None
 
 
+class ZipCodeNotFound(ValueError):
+    # A fonte respondeu, mas o CEP não existe nela; só esse caso entra no cache negativo.
+    pass
+
+
+class _LookupExpired(ValueError):
+    # A tarefa saiu da fila depois do fim da busca; não diz nada sobre a saúde da fonte.
+    pass
+
+
+def _request_timeout():
+    # O prazo da fonte, limitado ao que resta da busca: uma consulta que perdeu a corrida não
+    # segura a thread do pool além do fim da busca.
+    timeout = settings.CEP_PROVIDER_TIMEOUT_SECONDS
+    deadline = getattr(_CALL_DEADLINE, "value", None)
+    if deadline is not None:
+        timeout = max(0.1, min(timeout, deadline - monotonic()))
+    return http_timeout(timeout)
+
+
 def _normalize_zip(cep):
     digits = re.sub(r"\D", "", cep)
     if len(digits) != 8:
@@ -62,13 +99,13 @@ def _fetch_viacep(cep):
     if requests is None:
         raise ValueError("Biblioteca requests não está instalada.")
     normalized = _normalize_zip(cep)
-    url = f"https://viacep.com.br/ws/{normalized}/json/"
+    url = VIACEP_URL.format(cep=normalized)
     try:
-        response = requests.get(url, timeout=10)
+        response = get_http_session("viacep").get(url, timeout=_request_timeout())
         response.raise_for_status()
         data = response.json()
         if "erro" in data:
-            raise ValueError("CEP não encontrado na ViaCEP.")
+            raise ZipCodeNotFound("CEP não encontrado na ViaCEP.")
         return _normalize_response(data, normalized)
     except requests.exceptions.Timeout:
         logger.warning("Timeout ao consultar ViaCEP para CEP %s", normalized)
@@ -82,9 +119,9 @@ def _fetch_brasilapi(cep):
     if requests is None:
         raise ValueError("Biblioteca requests não está instalada.")
     normalized = _normalize_zip(cep)
-    url = f"https://brasilapi.com.br/api/cep/v1/{normalized}"
+    url = BRASILAPI_URL.format(cep=normalized)
     try:
-        response = requests.get(url, timeout=10)
+        response = get_http_session("brasilapi").get(url, timeout=_request_timeout())
         response.raise_for_status()
         return _normalize_response(response.json(), normalized)
     except requests.exceptions.Timeout:
@@ -92,7 +129,7 @@ def _fetch_brasilapi(cep):
         raise ValueError("Timeout ao consultar BrasilAPI.") from None
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
-            raise ValueError("CEP não encontrado na BrasilAPI.") from e
+            raise ZipCodeNotFound("CEP não encontrado na BrasilAPI.") from e
         logger.warning("Erro HTTP ao consultar BrasilAPI: %s", e)
         raise ValueError("Erro ao consultar BrasilAPI.") from e
     except requests.exceptions.RequestException as e:
@@ -108,7 +145,7 @@ def _fetch_pycep(cep):
         return _normalize_response(address, cep)
     except Exception as e:
         if correios_exceptions and isinstance(e, (correios_exceptions.InvalidCEP, correios_exceptions.CEPNotFound)):
-            raise ValueError("CEP não encontrado.") from e
+            raise ZipCodeNotFound("CEP não encontrado.") from e
         logger.warning("Erro ao consultar pycep-correios: %s", e)
         raise ValueError("Erro ao consultar pycep-correios.") from e
 
@@ -122,18 +159,29 @@ def _fetch_brazilcep(cep):
     except cep_exceptions.InvalidCEP as e:
         raise ValueError("CEP inválido.") from e
     except cep_exceptions.CEPNotFound as e:
-        raise ValueError("CEP não encontrado.") from e
+        raise ZipCodeNotFound("CEP não encontrado.") from e
     except cep_exceptions.BrazilCEPException as e:
         logger.warning("Erro ao consultar brazilcep: %s", e)
         raise ValueError("Erro ao consultar brazilcep.") from e
 
 
+def _fetch_local(cep):
+    result = lookup_local_zip_code(_normalize_zip(cep))
+    if result is None:
+        raise ZipCodeNotFound("CEP não encontrado na base local.")
+    return result
+
+
 SOURCES = [
+    (LOCAL_SOURCE_NAME, _fetch_local),
     ("ViaCEP", _fetch_viacep),
     ("BrasilAPI", _fetch_brasilapi),
     ("pycep-correios", _fetch_pycep),
     ("brazilcep", _fetch_brazilcep),
 ]
+# Fontes locais rodam na própria thread (usam a conexão do banco da requisição), sempre antes
+# das remotas e fora do controle de saúde; o "não encontrado" delas não gera cache negativo.
+LOCAL_SOURCES = {LOCAL_SOURCE_NAME}
 
 
 def fetch_address_by_zip(cep):
@@ -144,34 +192,177 @@ def fetch_address_by_zip(cep):
     except ValueError as e:
         raise ValueError(f"CEP inválido: {e}") from e
 
+    cached = cep_cache.get_cached_address(normalized)
+    if isinstance(cached, dict):
+        return cached
+    if cached is not None:
+        raise ValueError(cached)
+
     last_error = None
-    sources_tried = []
     errors_by_source = {}
+    not_found = False
+    unreachable = False
+
+    def record_failure(source_name, error):
+        nonlocal last_error, not_found, unreachable
+        last_error = error
+        if source_name not in LOCAL_SOURCES:
+            if isinstance(error, ZipCodeNotFound):
+                not_found = True
+            else:
+                unreachable = True
+        errors_by_source[source_name] = str(error)
 
-    for source_name, fetch_fn in SOURCES:
-        logger.warning("[CEP] Tentando buscar CEP %s via %s...", normalized, source_name)
+    local_sources = [source for source in SOURCES if source[0] in LOCAL_SOURCES]
+    for source_name, fetch_fn in local_sources:
         try:
             result = fetch_fn(normalized)
-            if result and result.get("city"):
-                logger.warning("[CEP] Sucesso! CEP %s encontrado via %s", normalized, source_name)
-                return result
-            last_error = ValueError("Resultado vazio ou sem cidade")
-            sources_tried.append(source_name)
-            errors_by_source[source_name] = "Resultado vazio ou sem cidade"
         except ValueError as e:
-            last_error = e
-            sources_tried.append(source_name)
-            errors_by_source[source_name] = str(e)
-            logger.warning("[CEP] Falha via %s: %s", source_name, e)
+            record_failure(source_name, e)
+            continue
         except Exception as e:
-            last_error = ValueError(f"Erro inesperado: {e}")
-            sources_tried.append(source_name)
-            errors_by_source[source_name] = f"Erro inesperado: {e}"
+            # Base local indisponível (tabela não migrada, SQLite travado): segue para as fontes remotas.
+            record_failure(source_name, ValueError(f"Erro inesperado: {e}"))
             logger.warning("[CEP] Erro inesperado via %s: %s: %s", source_name, type(e).__name__, e)
+            continue
+        if result and result.get("city"):
+            return result
+        record_failure(source_name, ValueError("Resultado vazio ou sem cidade"))
+    remote_sources = cep_health.order_sources([source for source in SOURCES if source[0] not in LOCAL_SOURCES])
+    sources = local_sources + remote_sources
+    observed = set()
+    observed_lock = threading.Lock()
 
-    if len(sources_tried) == len(SOURCES):
-        details = "; ".join(f"{s}: {e}" for s, e in errors_by_source.items())
-        raise ValueError(f"CEP {normalized} não encontrado em nenhuma fonte disponível. Detalhes: {details}")
+    def observe(source_name, started_at, future, timed_out=False):
+        # Registra a saúde da fonte uma única vez por consulta, inclusive das que perderam a
+        # corrida: essas terminam depois, e o callback do future anota a latência real.
+        # O registro acontece sob o lock, então quem chega depois já encontra a saúde gravada.
+        if (future.cancelled() or not started_at) and not timed_out:
+            return
+        with observed_lock:
+            if future in observed:
+                return
+            observed.add(future)
+            if timed_out:
+                cep_health.record_failure(source_name, provider_timeout, "Timeout")
+                return
+            error = future.exception()
+            if isinstance(error, _LookupExpired):
+                return
+            if error is None or isinstance(error, ZipCodeNotFound):
+                cep_health.record_success(source_name, monotonic() - started_at[0])
+            else:
+                cep_health.record_failure(source_name, monotonic() - started_at[0], str(error))
+
+    # Consulta escalonada (hedged): a próxima fonte sai após CEP_LOOKUP_HEDGE_DELAY_SECONDS
+    # sem resposta, ou na hora em que a anterior falha; vence o primeiro resultado com cidade.
+    # Com atraso 0 todas saem juntas. As que ficarem para trás são descartadas.
+    executor = _get_lookup_executor()
+    hedge_delay = max(0.0, settings.CEP_LOOKUP_HEDGE_DELAY_SECONDS)
+    provider_timeout = settings.CEP_PROVIDER_TIMEOUT_SECONDS
+    deadline = monotonic() + settings.CEP_LOOKUP_TIMEOUT_SECONDS
+    pending = {}
+    next_index = 0
+    next_launch_at = monotonic()
+
+    try:
+        while pending or next_index < len(remote_sources):
+            now = monotonic()
+            if now >= deadline:
+                break
+            if next_index < len(remote_sources) and (now >= next_launch_at or not pending):
+                source_name, fetch_fn = remote_sources[next_index]
+                next_index += 1
+                next_launch_at = now + hedge_delay
+                logger.warning("[CEP] Tentando buscar CEP %s via %s...", normalized, source_name)
+                started_at = []
+                future = executor.submit(_run_source, fetch_fn, normalized, started_at, provider_timeout, deadline)
+                pending[future] = (source_name, started_at)
+                future.add_done_callback(partial(observe, source_name, started_at))
+                if hedge_delay == 0:
+                    continue
+
+            # O prazo de cada fonte conta de quando a tarefa começou a rodar, não do envio ao pool.
+            for future, (source_name, started_at) in list(pending.items()):
+                if started_at and now >= started_at[0] + provider_timeout:
+                    del pending[future]
+                    observe(source_name, None, future, timed_out=True)
+                    future.cancel()
+                    record_failure(source_name, ValueError(f"Timeout ao consultar {source_name}."))
+                    logger.warning("[CEP] Falha via %s: tempo limite de %ss", source_name, provider_timeout)
+                    next_launch_at = now
+            if not pending:
+                continue
+
+            # Uma tarefa ainda na fila só começa depois de agora: acordar em now + provider_timeout
+            # nunca passa do prazo dela.
+            source_deadlines = [
+                (started_at[0] if started_at else now) + provider_timeout for _, started_at in pending.values()
+            ]
+            wake_at = min(deadline, *source_deadlines)
+            if next_index < len(remote_sources):
+                wake_at = min(wake_at, next_launch_at)
+            done, _ = wait(pending, timeout=max(0.0, wake_at - monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                source_name, started_at = pending.pop(future)
+                observe(source_name, started_at, future)
+                try:
+                    result = future.result()
+                except ValueError as e:
+                    record_failure(source_name, e)
+                    logger.warning("[CEP] Falha via %s: %s", source_name, e)
+                except Exception as e:
+                    record_failure(source_name, ValueError(f"Erro inesperado: {e}"))
+                    logger.warning("[CEP] Erro inesperado via %s: %s: %s", source_name, type(e).__name__, e)
+                else:
+                    if result and result.get("city"):
+                        logger.warning("[CEP] Sucesso! CEP %s encontrado via %s", normalized, source_name)
+                        cep_cache.store_address(normalized, result, source_name)
+                        return result
+                    record_failure(source_name, ValueError("Resultado vazio ou sem cidade"))
+                # Falhou: não há motivo para esperar o atraso antes da próxima fonte.
+                next_launch_at = monotonic()
+    finally:
+        for future in pending:
+            future.cancel()
+
+    for source_name, _ in pending.values():
+        record_failure(source_name, ValueError(f"Timeout ao consultar {source_name}."))
+    sources_tried = [source_name for source_name, _ in sources if source_name in errors_by_source]
+    if len(sources_tried) == len(sources):
+        details = "; ".join(f"{s}: {errors_by_source[s]}" for s in sources_tried)
+        message = f"CEP {normalized} não encontrado em nenhuma fonte disponível. Detalhes: {details}"
+        # Só vai para o cache negativo quando todas as fontes remotas responderam "não encontrado".
+        # Se alguma falhou por rede ou timeout, o CEP pode existir e a fonte só estar fora do ar.
+        if not_found and not unreachable:
+            cep_cache.store_not_found(normalized, message)
+        raise ValueError(message)
     if last_error:
         raise last_error
     raise ValueError(f"CEP não encontrado. Fontes tentadas: {', '.join(sources_tried)}")
+
+
+def _run_source(fetch_fn, normalized, started_at, provider_timeout, lookup_deadline):
+    started_at.append(monotonic())
+    if started_at[0] >= lookup_deadline:
+        raise _LookupExpired("A busca terminou antes de a consulta começar.")
+    _CALL_DEADLINE.value = min(lookup_deadline, started_at[0] + provider_timeout)
+    try:
+        return fetch_fn(normalized)
+    finally:
+        _CALL_DEADLINE.value = None
+
+
+def _get_lookup_executor():
+    global _LOOKUP_EXECUTOR
+    with _LOOKUP_EXECUTOR_LOCK:
+        if _LOOKUP_EXECUTOR is None:
+            _LOOKUP_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(1, settings.CEP_LOOKUP_MAX_WORKERS),
+                thread_name_prefix="cep-lookup",
+            )
+        return _LOOKUP_EXECUTOR
+
+
+def cep_provider_stats():
+    return cep_health.provider_health_stats([source for source in SOURCES if source[0] not in LOCAL_SOURCES])
@@ -0,0 +1,78 @@
+import logging
+import threading
+from datetime import timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from system.models import ZipCodeCache
+
+logger = logging.getLogger(__name__)
+
+_PURGE_LOCK = threading.Lock()
+_last_purge = None
+
+
+def get_cached_address(cep: str):
+    # Uma única consulta pelo índice único de cep; a validade é conferida em Python.
+    # Retorna o endereço, a mensagem de erro (cache negativo) ou None quando precisa ir à rede.
+    if not settings.CEP_CACHE_ENABLED:
+        return None
+    entry = ZipCodeCache.objects.filter(cep=cep).only("address", "error", "fetched_at").first()
+    if entry is None:
+        return None
+    ttl = settings.CEP_CACHE_TTL_SECONDS if entry.found else settings.CEP_CACHE_NEGATIVE_TTL_SECONDS
+    if entry.fetched_at < timezone.now() - timedelta(seconds=ttl):
+        return None
+    return dict(entry.address) if entry.found else entry.error
+
+
+def store_address(cep: str, address: dict, source: str) -> None:
+    _store(cep, {"address": address, "source": source, "error": ""})
+
+
+def store_not_found(cep: str, error: str) -> None:
+    _store(cep, {"address": {}, "source": "", "error": error[:500]})
+
+
+def purge_expired_zip_codes() -> int:
+    now = timezone.now()
+    found_cutoff = now - timedelta(seconds=settings.CEP_CACHE_TTL_SECONDS)
+    negative_cutoff = now - timedelta(seconds=settings.CEP_CACHE_NEGATIVE_TTL_SECONDS)
+    deleted, _ = ZipCodeCache.objects.filter(fetched_at__lt=found_cutoff).delete()
+    deleted += ZipCodeCache.objects.filter(address={}, fetched_at__lt=negative_cutoff).delete()[0]
+    if deleted:
+        logger.info("Cache de CEP: %s entrada(s) expirada(s) removida(s).", deleted)
+    return deleted
+
+
+def _store(cep, values) -> None:
+    if not settings.CEP_CACHE_ENABLED:
+        return
+    ZipCodeCache.objects.update_or_create(cep=cep, defaults={**values, "fetched_at": timezone.now()})
+    _schedule_purge()
+
+
+def _schedule_purge() -> None:
+    # A limpeza roda em uma thread à parte, no máximo uma vez por intervalo em cada processo,
+    # para não pesar na requisição que acabou de consultar a rede.
+    global _last_purge
+    interval = settings.CEP_CACHE_PURGE_INTERVAL_SECONDS
+    if interval <= 0:
+        return
+    with _PURGE_LOCK:
+        if _last_purge is not None and monotonic() - _last_purge < interval:
+            return
+        _last_purge = monotonic()
+    threading.Thread(target=_purge_in_background, name="cep-cache-purge", daemon=True).start()
+
+
+def _purge_in_background() -> None:
+    try:
+        purge_expired_zip_codes()
+    except Exception:
+        logger.exception("Falha ao limpar o cache de CEP.")
+    finally:
+        connection.close()
@@ -0,0 +1,149 @@
+import csv
+import re
+from contextlib import nullcontext
+from itertools import islice
+
+from django.db import transaction
+
+from system.models import LocalZipCode, ZipCodeCache
+
+LOCAL_SOURCE_NAME = "Base local"
+# Nomes aceitos no cabeçalho do CSV (em minúsculas, com _ no lugar de espaços); vale o primeiro presente.
+_COLUMN_ALIASES = {
+    "cep": ("cep",),
+    "cep_start": ("cep_start", "cep_inicial", "cep_inicio", "faixa_inicial"),
+    "cep_end": ("cep_end", "cep_final", "cep_fim", "faixa_final"),
+    "street": ("street", "logradouro", "endereco", "rua"),
+    "district": ("district", "bairro"),
+    "city": ("city", "cidade", "localidade", "municipio"),
+    "uf": ("uf", "estado", "state"),
+}
+_FIELD_LIMITS = {"street": 200, "district": 100, "city": 100}
+_ADDRESS_FIELDS = ("street", "district", "city", "uf")
+
+
+def lookup_local_zip_code(normalized: str):
+    # Primeiro o CEP exato, pelo índice único; só então a faixa mais específica, pelo índice parcial das faixas.
+    number = int(normalized)
+    record = LocalZipCode.objects.filter(cep_start=number, cep_end=number).only(*_ADDRESS_FIELDS).first()
+    if record is None:
+        record = (
+            LocalZipCode.objects.filter(is_range=True, cep_start__lte=number, cep_end__gte=number)
+            .order_by("-cep_start", "cep_end")
+            .only(*_ADDRESS_FIELDS)
+            .first()
+        )
+    if record is None:
+        return None
+    return {
+        "cep": normalized,
+        "street": record.street,
+        "district": record.district,
+        "city": record.city,
+        "uf": record.uf,
+        "complement": "",
+    }
+
+
+def import_zip_code_dataset(
+    path,
+    *,
+    batch_size: int = 5000,
+    replace: bool = False,
+    encoding: str = "utf-8-sig",
+    delimiter: str = "",
+    progress=None,
+) -> dict:
+    # Lê o CSV em streaming e grava em lotes: a memória fica limitada a um lote, mesmo com milhões de linhas.
+    # Com replace, a exclusão e todos os lotes ficam em uma transação: uma falha mantém a base anterior.
+    counts = {"read": 0, "imported": 0, "skipped": 0}
+    invalid_lines = []
+    with open(path, newline="", encoding=encoding) as handle:
+        reader = csv.reader(handle, delimiter=delimiter or _sniff_delimiter(handle))
+        columns = _resolve_columns(next(reader, []))
+        with transaction.atomic() if replace else nullcontext():
+            if replace:
+                LocalZipCode.objects.all().delete()
+            rows = (_parse_row(row, columns) for row in reader)
+            line_number = 1
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                # Chave repetida no mesmo lote: vale a última linha, como nos lotes seguintes.
+                records = {}
+                for record in chunk:
+                    line_number += 1
+                    counts["read"] += 1
+                    if record is None:
+                        counts["skipped"] += 1
+                        if len(invalid_lines) < 10:
+                            invalid_lines.append(line_number)
+                        continue
+                    records[(record.cep_start, record.cep_end)] = record
+                with transaction.atomic():
+                    LocalZipCode.objects.bulk_create(
+                        list(records.values()),
+                        batch_size=batch_size,
+                        update_conflicts=True,
+                        unique_fields=["cep_start", "cep_end"],
+                        update_fields=list(_ADDRESS_FIELDS),
+                    )
+                counts["imported"] += len(records)
+                if progress:
+                    progress(counts)
+    # Um CEP que agora existe na base local não pode continuar preso no cache negativo.
+    counts["negative_cache_cleared"] = ZipCodeCache.objects.filter(address={}).delete()[0]
+    counts["invalid_lines"] = invalid_lines
+    return counts
+
+
+def _sniff_delimiter(handle) -> str:
+    sample = handle.read(4096)
+    handle.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;|\t").delimiter
+    except csv.Error:
+        return ","
+
+
+def _resolve_columns(header):
+    normalized = [re.sub(r"\W+", "_", name.strip().lower()).strip("_") for name in header]
+    columns = {}
+    for field, aliases in _COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+    has_cep = "cep" in columns or {"cep_start", "cep_end"} <= columns.keys()
+    if not has_cep or "city" not in columns or "uf" not in columns:
+        raise ValueError(
+            "Cabeçalho inválido: são obrigatórias as colunas cep (ou cep_inicial e cep_final), cidade e uf."
+        )
+    return columns
+
+
+def _parse_row(row, columns):
+    def value(field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    if "cep" in columns and value("cep"):
+        start = end = _cep_number(value("cep"))
+    else:
+        start, end = _cep_number(value("cep_start")), _cep_number(value("cep_end"))
+    city, uf = value("city"), value("uf").upper()
+    if start is None or end is None or start > end or not city or len(uf) != 2:
+        return None
+    return LocalZipCode(
+        cep_start=start,
+        cep_end=end,
+        is_range=start != end,
+        uf=uf,
+        **{field: value(field)[:limit] for field, limit in _FIELD_LIMITS.items()},
+    )
+
+
+def _cep_number(raw):
+    digits = re.sub(r"\D", "", raw)
+    return int(digits) if len(digits) == 8 else None
@@ -0,0 +1,113 @@
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_CACHE_PREFIX = "cep:health:"
+# Peso da amostra mais recente nas médias móveis exponenciais de latência e erro.
+_EWMA_ALPHA = 0.3
+
+
+def order_sources(sources):
+    # Fontes com circuito aberto saem da lista; as demais vão pela latência esperada
+    # (média móvel + penalidade proporcional à taxa de erro). Fontes ainda sem histórico
+    # ficam depois das conhecidas, na ordem original de SOURCES.
+    health = _load_health([name for name, _ in sources])
+    now = time.time()
+    available = [
+        (index, source) for index, source in enumerate(sources) if health[source[0]].get("open_until", 0) <= now
+    ]
+    if not available:
+        # Todas em pausa: melhor tentar todas do que falhar sem consultar nada.
+        return list(sources)
+
+    def sort_key(item):
+        index, (name, _) = item
+        stats = health[name]
+        if not stats.get("samples"):
+            return (1, 0.0, index)
+        return (0, expected_latency(stats), index)
+
+    return [source for _, source in sorted(available, key=sort_key)]
+
+
+def expected_latency(stats) -> float:
+    penalty = stats.get("error_rate", 0.0) * settings.CEP_PROVIDER_TIMEOUT_SECONDS
+    return round(stats.get("latency", 0.0) + penalty, 4)
+
+
+def record_success(name: str, latency: float) -> None:
+    # "CEP não encontrado" também conta como sucesso: a fonte respondeu.
+    _update(name, latency, failed=False)
+
+
+def record_failure(name: str, latency: float, error: str = "") -> None:
+    _update(name, latency, failed=True, error=error)
+
+
+def provider_health_stats(sources) -> list[dict]:
+    health = _load_health([name for name, _ in sources])
+    now = time.time()
+    stats = []
+    for name, _ in sources:
+        entry = health[name]
+        open_until = entry.get("open_until", 0)
+        stats.append(
+            {
+                "source": name,
+                "samples": entry.get("samples", 0),
+                "latency_seconds": round(entry.get("latency", 0.0), 4),
+                "error_rate": round(entry.get("error_rate", 0.0), 3),
+                "expected_latency_seconds": expected_latency(entry) if entry.get("samples") else None,
+                "consecutive_failures": entry.get("consecutive_failures", 0),
+                "circuit": "open" if open_until > now else "closed",
+                "open_seconds_left": round(open_until - now, 1) if open_until > now else 0,
+                "last_error": entry.get("last_error", ""),
+            }
+        )
+    return stats
+
+
+def reset_provider_health(sources) -> None:
+    cache.delete_many([_cache_key(name) for name, _ in sources])
+
+
+def _cache_key(name):
+    # Só letras, dígitos e _ na chave: espaços e hífens quebram backends como o memcached.
+    return _CACHE_PREFIX + re.sub(r"\W", "_", name)
+
+
+def _load_health(names):
+    stored = cache.get_many([_cache_key(name) for name in names])
+    return {name: stored.get(_cache_key(name)) or {} for name in names}
+
+
+def _update(name, latency, *, failed, error=""):
+    # Leitura e escrita não são atômicas entre workers: uma amostra concorrente pode se
+    # perder, o que só suaviza as médias. O circuito abre com falhas seguidas.
+    key = _cache_key(name)
+    stats = cache.get(key) or {}
+    samples = stats.get("samples", 0)
+    alpha = 1.0 if samples == 0 else _EWMA_ALPHA
+    stats["latency"] = stats.get("latency", 0.0) * (1 - alpha) + latency * alpha
+    stats["error_rate"] = stats.get("error_rate", 0.0) * (1 - alpha) + (1.0 if failed else 0.0) * alpha
+    stats["samples"] = samples + 1
+    if failed:
+        stats["consecutive_failures"] = stats.get("consecutive_failures", 0) + 1
+        stats["last_error"] = error[:200]
+        if stats["consecutive_failures"] >= settings.CEP_CIRCUIT_FAILURE_THRESHOLD:
+            stats["open_until"] = time.time() + settings.CEP_CIRCUIT_COOLDOWN_SECONDS
+            logger.warning(
+                "[CEP] Circuito aberto para %s por %ss após %s falhas seguidas.",
+                name,
+                settings.CEP_CIRCUIT_COOLDOWN_SECONDS,
+                stats["consecutive_failures"],
+            )
+    else:
+        stats["consecutive_failures"] = 0
+        stats["open_until"] = 0
+    cache.set(key, stats, settings.CEP_HEALTH_TTL_SECONDS)
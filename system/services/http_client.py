@@ -0,0 +1,51 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+from django.conf import settings
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+    HTTPAdapter = None
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_http_session(name: str):
+    # Uma Session por integração, criada uma vez e compartilhada entre threads: o pool do
+    # urllib3 é thread-safe e mantém as conexões vivas (keep-alive), evitando DNS, TCP e TLS
+    # a cada chamada. Cookies são recusados para que nenhuma chamada altere o estado da Session.
+    if requests is None:
+        raise ValueError("Biblioteca requests não está instalada.")
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(name)
+        if session is None:
+            session = requests.Session()
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            session.headers["User-Agent"] = "visary"
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=max(1, settings.HTTP_POOL_MAXSIZE),
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[name] = session
+        return session
+
+
+def http_timeout(read_seconds: float):
+    # Conexão e leitura com prazos separados: um host fora do ar falha rápido na conexão,
+    # sem esperar o prazo de leitura inteiro.
+    return (min(settings.HTTP_CONNECT_TIMEOUT_SECONDS, read_seconds), read_seconds)
+
+
+def close_http_sessions() -> None:
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
@@ -0,0 +1,69 @@
+from django.db.models import Model, OuterRef, QuerySet, Subquery
+
+from system.models import LegacyRecordLink, LegacyRecordStatus
+
+LEGACY_CLIENT_TABLE = "clientes"
+LEGACY_PROCESS_TABLE = "processos"
+LEGACY_FINANCE_TABLE = "entradas"
+
+
+def legacy_model_label(model_class) -> str:
+    return model_class._meta.label_lower
+
+
+def legacy_link_index(queryset: QuerySet, legacy_table: str) -> dict[int, Model]:
+    links = dict(
+        LegacyRecordLink.objects.filter(
+            model=legacy_model_label(queryset.model),
+            legacy_table=legacy_table,
+        ).values_list("object_id", "legacy_id")
+    )
+    instances = queryset.in_bulk(list(links))
+    return {
+        legacy_id: instances[object_id]
+        for object_id, legacy_id in links.items()
+        if object_id in instances
+    }
+
+
+def build_legacy_link(instance: Model, legacy_table: str, legacy_id: int, issues=None) -> LegacyRecordLink:
+    issues = list(issues or [])
+    return LegacyRecordLink(
+        model=legacy_model_label(type(instance)),
+        object_id=instance.pk,
+        legacy_table=legacy_table,
+        legacy_id=int(legacy_id),
+        status=LegacyRecordStatus.PROBLEM if issues else LegacyRecordStatus.OK,
+        issues=issues,
+    )
+
+
+def save_legacy_links(links: list[LegacyRecordLink]) -> None:
+    # Vários registros legados podem cair no mesmo objeto; vale o último.
+    unique_links = {(link.model, link.object_id): link for link in links}
+    if not unique_links:
+        return
+    LegacyRecordLink.objects.bulk_create(
+        list(unique_links.values()),
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["model", "object_id"],
+        update_fields=["legacy_table", "legacy_id", "status", "issues", "updated_at"],
+    )
+
+
+def get_legacy_link(instance: Model, legacy_table: str) -> LegacyRecordLink | None:
+    return LegacyRecordLink.objects.filter(
+        model=legacy_model_label(type(instance)),
+        object_id=instance.pk,
+        legacy_table=legacy_table,
+    ).first()
+
+
+def annotate_legacy_status(queryset: QuerySet, legacy_table: str) -> QuerySet:
+    links = LegacyRecordLink.objects.filter(
+        model=legacy_model_label(queryset.model),
+        legacy_table=legacy_table,
+        object_id=OuterRef("pk"),
+    )
+    return queryset.annotate(legacy_status=Subquery(links.values("status")[:1]))
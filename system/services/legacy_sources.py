@@ -0,0 +1,308 @@
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class LegacySourceError(Exception):
+    pass
+
+
+LEGACY_PAYLOAD_TABLES = (
+    "passaportes",
+    "informacoes_adicionais_viagems",
+    "informacoes_educacionais",
+    "dados_escolas",
+    "dados_financeiros",
+    "dados_viagem_anteriores",
+    "dados_vistos_anteriores",
+    "saude_historico_imigracionals",
+)
+
+LEGACY_PROCESS_CHILD_TABLES = ("cronograma_processos", "entradas", *LEGACY_PAYLOAD_TABLES)
+
+LEGACY_DELTA_TABLES = ("clientes", "processos", *LEGACY_PROCESS_CHILD_TABLES)
+
+LEGACY_IN_BATCH_SIZE = 500
+
+LEGACY_FETCH_SIZE = 1000
+
+LEGACY_QUERIES = {
+    "clientes": {
+        "sql": """
+            SELECT
+                c.*, u.email AS user_email, u.name AS user_name, u.password AS user_password,
+                ur.email AS responsavel_email, ur.name AS responsavel_name
+            FROM clientes c
+            LEFT JOIN users u ON u.id = c.usuario_id
+            LEFT JOIN users ur ON ur.id = c.usuario_responsavel_id
+        """,
+        "alias": "c",
+        "soft_delete": True,
+        "user_joins": (
+            ("usuario_id", {"email": "user_email", "name": "user_name", "password": "user_password"}),
+            ("usuario_responsavel_id", {"email": "responsavel_email", "name": "responsavel_name"}),
+        ),
+    },
+    "familiares_clientes": {"sql": "SELECT * FROM familiares_clientes", "alias": "familiares_clientes", "soft_delete": False},
+    "processos": {"sql": "SELECT * FROM processos", "alias": "processos", "soft_delete": True},
+    "processo_clientes": {"sql": "SELECT * FROM processo_clientes", "alias": "processo_clientes", "soft_delete": False},
+    "cronograma_processos": {"sql": "SELECT * FROM cronograma_processos", "alias": "cronograma_processos", "soft_delete": True},
+    "situacao_processos": {"sql": "SELECT * FROM situacao_processos", "alias": "situacao_processos", "soft_delete": False},
+    **{
+        table: {"sql": f"SELECT * FROM {table}", "alias": table, "soft_delete": True}
+        for table in LEGACY_PAYLOAD_TABLES
+    },
+    "pais": {"sql": "SELECT * FROM pais", "alias": "pais", "soft_delete": True},
+    "tipo_vistos": {"sql": "SELECT * FROM tipo_vistos", "alias": "tipo_vistos", "soft_delete": True},
+    "pais_tipo_visto": {"sql": "SELECT * FROM pais_tipo_visto", "alias": "pais_tipo_visto", "soft_delete": False},
+    "parceiros": {
+        "sql": """
+            SELECT p.*, u.email AS user_email, u.name AS user_name
+            FROM parceiros p
+            LEFT JOIN users u ON u.id = p.usuario_id
+        """,
+        "alias": "p",
+        "soft_delete": True,
+        "user_joins": (("usuario_id", {"email": "user_email", "name": "user_name"}),),
+    },
+    "entradas": {"sql": "SELECT * FROM entradas", "alias": "entradas", "soft_delete": True},
+}
+
+LEGACY_REFERENCE_TABLES = tuple(key for key in LEGACY_QUERIES if key not in LEGACY_DELTA_TABLES)
+
+LEGACY_CPF_INDEX_QUERY = {"sql": "SELECT c.id, c.cpf FROM clientes c", "alias": "c", "soft_delete": True}
+
+LEGACY_SOURCE_KINDS = ("mysql", "sqlite", "jsonl")
+
+
+class LegacySource(ABC):
+    @abstractmethod
+    def iter_rows(self, table: str, *, watermark=None, column=None, ids=None, deleted=False) -> Iterator[dict]:
+        ...
+
+    @abstractmethod
+    def iter_client_cpfs(self) -> Iterator[dict]:
+        ...
+
+    def fetch_rows(self, table: str, **filters) -> list[dict]:
+        return list(self.iter_rows(table, **filters))
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SqlLegacySource(LegacySource):
+    placeholder = "%s"
+
+    @abstractmethod
+    def _execute(self, sql: str, params: list) -> Iterator[dict]:
+        ...
+
+    def _query_rows(self, query, *, watermark=None, column=None, ids=None, deleted=False) -> Iterator[dict]:
+        alias = query["alias"]
+        if deleted and not query["soft_delete"]:
+            return
+        conditions = [f"{alias}.deleted_at IS {'NOT NULL' if deleted else 'NULL'}"] if query["soft_delete"] else []
+        params = []
+        if watermark is not None:
+            updated_since, last_id = watermark
+            changed = []
+            if updated_since is not None:
+                changed.append(f"{alias}.updated_at >= {self.placeholder}")
+                params.append(updated_since)
+            if last_id is not None:
+                changed.append(f"{alias}.id > {self.placeholder}")
+                params.append(last_id)
+            conditions.append("(" + " OR ".join(changed) + ")")
+
+        def build_sql(where):
+            return query["sql"] + (" WHERE " + " AND ".join(where) if where else "")
+
+        if column is None:
+            yield from self._execute(build_sql(conditions), params)
+            return
+        ordered_ids = sorted(ids or [])
+        for start in range(0, len(ordered_ids), LEGACY_IN_BATCH_SIZE):
+            chunk = ordered_ids[start : start + LEGACY_IN_BATCH_SIZE]
+            placeholders = ", ".join([self.placeholder] * len(chunk))
+            yield from self._execute(
+                build_sql(conditions + [f"{alias}.{column} IN ({placeholders})"]),
+                params + chunk,
+            )
+
+    def iter_rows(self, table, *, watermark=None, column=None, ids=None, deleted=False):
+        return self._query_rows(LEGACY_QUERIES[table], watermark=watermark, column=column, ids=ids, deleted=deleted)
+
+    def iter_client_cpfs(self):
+        return self._query_rows(LEGACY_CPF_INDEX_QUERY)
+
+
+class MySQLLegacySource(SqlLegacySource):
+    def __init__(self):
+        try:
+            import pymysql
+        except ImportError as exc:
+            raise LegacySourceError("pymysql nao instalado no .venv.") from exc
+
+        env = {
+            "host": settings.LEGACY_DB_HOST or None,
+            "port": int(settings.LEGACY_DB_PORT or "3306"),
+            "database": settings.LEGACY_DB_NAME or None,
+            "user": settings.LEGACY_DB_USER or None,
+            "password": settings.LEGACY_DB_PASSWORD or None,
+        }
+        missing = [key for key, value in env.items() if not value and key != "port"]
+        if missing:
+            raise LegacySourceError(f"Variaveis LEGACY_DB_* ausentes: {', '.join(missing)}")
+
+        self._cursor_class = pymysql.cursors.SSDictCursor
+        try:
+            self.connection = pymysql.connect(
+                host=env["host"],
+                port=env["port"],
+                user=env["user"],
+                password=env["password"],
+                database=env["database"],
+                charset="utf8mb4",
+                cursorclass=pymysql.cursors.DictCursor,
+            )
+        except Exception as exc:
+            raise LegacySourceError(f"Falha na conexao ao legado: {exc}") from exc
+
+    def _execute(self, sql, params):
+        cursor = self.connection.cursor(self._cursor_class)
+        try:
+            cursor.execute(sql, params or None)
+            while True:
+                rows = cursor.fetchmany(LEGACY_FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def close(self):
+        self.connection.close()
+
+
+class SQLiteLegacySource(SqlLegacySource):
+    placeholder = "?"
+
+    def __init__(self, path):
+        path = Path(path)
+        if not path.is_file():
+            raise LegacySourceError(f"Arquivo SQLite do legado nao encontrado: {path}")
+        self.connection = sqlite3.connect(str(path))
+        self.connection.row_factory = sqlite3.Row
+
+    def _execute(self, sql, params):
+        params = [value.isoformat(sep=" ") if isinstance(value, datetime) else value for value in params]
+        cursor = self.connection.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(LEGACY_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+
+    def close(self):
+        self.connection.close()
+
+
+class JsonlLegacySource(LegacySource):
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        if not self.directory.is_dir():
+            raise LegacySourceError(f"Diretorio JSONL do legado nao encontrado: {self.directory}")
+        self._users = None
+
+    def _iter_file(self, table) -> Iterator[dict]:
+        path = self.directory / f"{table}.jsonl"
+        if not path.exists():
+            return
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def _users_by_id(self):
+        if self._users is None:
+            self._users = {
+                int(row["id"]): row
+                for row in self._iter_file("users")
+                if row.get("id") is not None
+            }
+        return self._users
+
+    def _matches_watermark(self, row, watermark):
+        updated_since, last_id = watermark
+        if last_id is not None and row.get("id") is not None and int(row["id"]) > last_id:
+            return True
+        if updated_since is None:
+            return False
+        updated_at = row.get("updated_at")
+        if not updated_at:
+            return False
+        parsed = parse_datetime(str(updated_at))
+        if parsed is None:
+            return False
+        if timezone.is_aware(parsed):
+            parsed = timezone.make_naive(parsed)
+        return parsed >= updated_since
+
+    def _query_rows(self, table, query, *, watermark=None, column=None, ids=None, deleted=False):
+        wanted = None if column is None else {int(value) for value in ids or []}
+        if (wanted is not None and not wanted) or (deleted and not query["soft_delete"]):
+            return
+        joins = query.get("user_joins", ())
+        users = self._users_by_id() if joins else {}
+        for row in self._iter_file(table):
+            if query["soft_delete"] and bool(row.get("deleted_at")) != deleted:
+                continue
+            if watermark is not None and not self._matches_watermark(row, watermark):
+                continue
+            if wanted is not None and (row.get(column) is None or int(row[column]) not in wanted):
+                continue
+            for foreign_key, fields in joins:
+                user = users.get(int(row[foreign_key])) if row.get(foreign_key) else None
+                for source_field, target_field in fields.items():
+                    row[target_field] = user.get(source_field) if user else None
+            yield row
+
+    def iter_rows(self, table, *, watermark=None, column=None, ids=None, deleted=False):
+        return self._query_rows(
+            table, LEGACY_QUERIES[table], watermark=watermark, column=column, ids=ids, deleted=deleted
+        )
+
+    def iter_client_cpfs(self):
+        for row in self._query_rows("clientes", LEGACY_CPF_INDEX_QUERY):
+            yield {"id": row.get("id"), "cpf": row.get("cpf")}
+
+
+def open_legacy_source(kind: str = "mysql", path=None) -> LegacySource:
+    if kind == "mysql":
+        return MySQLLegacySource()
+    if not path:
+        raise LegacySourceError(f"Informe o caminho da fonte legada '{kind}'.")
+    if kind == "sqlite":
+        return SQLiteLegacySource(path)
+    if kind == "jsonl":
+        return JsonlLegacySource(path)
+    raise LegacySourceError(f"Fonte legada desconhecida: {kind}")
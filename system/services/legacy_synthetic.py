@@ -0,0 +1,375 @@
+import json
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from system.services.legacy_sources import (
+    LEGACY_DELTA_TABLES,
+    LEGACY_PAYLOAD_TABLES,
+    LEGACY_PROCESS_CHILD_TABLES,
+)
+
+
+SYNTHETIC_COUNTRIES = (
+    (1, "Australia", "AUS"),
+    (2, "Canada", "CAN"),
+    (3, "Estados Unidos", "USA"),
+)
+
+SYNTHETIC_VISA_TYPES = (
+    (1, "Turismo"),
+    (2, "Estudante"),
+    (3, "Trabalho"),
+)
+
+SYNTHETIC_STATUSES = (
+    "Preencher ficha cadastral",
+    "Enviar documento para avaliacao",
+    "Pagar taxa consular",
+    "Aguardando entrevista / Analise consular",
+    "Documentacao em analise interna",
+    "Processo finalizado",
+)
+
+SYNTHETIC_FIRST_NAMES = (
+    "Ana", "Bruno", "Carla", "Diego", "Elisa", "Fabio", "Gabriela", "Heitor",
+    "Isabela", "Joao", "Karina", "Lucas", "Mariana", "Nicolas", "Olivia", "Pedro",
+)
+
+SYNTHETIC_LAST_NAMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Almeida",
+    "Ferreira", "Rodrigues", "Gomes", "Martins", "Araujo", "Barbosa", "Ribeiro",
+)
+
+SYNTHETIC_CITIES = (
+    ("Goiania", "GO", "74000-000"),
+    ("Sao Paulo", "SP", "01000-000"),
+    ("Belo Horizonte", "MG", "30100-000"),
+    ("Curitiba", "PR", "80000-000"),
+    ("Recife", "PE", "50000-000"),
+)
+
+SYNTHETIC_TABLE_COLUMNS = {
+    **{
+        table: ("id", "processo_id", "descricao", "updated_at", "deleted_at")
+        for table in LEGACY_PAYLOAD_TABLES
+    },
+    "users": ("id", "email", "name", "password"),
+    "clientes": (
+        "id", "usuario_id", "usuario_responsavel_id", "nome", "sobrenome", "cpf", "nascimento",
+        "nacionalidade", "telefone", "telefone_secundario", "cep", "endereco", "complemento",
+        "bairro", "cidade", "estado", "sexo", "estado_civil", "created_at", "updated_at", "deleted_at",
+    ),
+    "familiares_clientes": ("id", "id_cliente_principal", "id_cliente_familiar"),
+    "processos": (
+        "id", "cliente_id", "parceiro_id", "pais_id", "tipo_visto_id", "data_prevista_viagem",
+        "data_prevista_retorno", "percet_conclusao", "conclusao_formulario", "motivo_viagem",
+        "created_at", "updated_at", "deleted_at",
+    ),
+    "processo_clientes": ("id", "id_processo_cliente", "id_processo_principal"),
+    "cronograma_processos": (
+        "id", "processo_id", "situacao_id", "dias_prazo_finalizacao", "data_finalizacao",
+        "created_at", "updated_at", "deleted_at",
+    ),
+    "situacao_processos": ("id", "nome"),
+    "pais": ("id", "nome", "sigla", "deleted_at"),
+    "tipo_vistos": ("id", "nome", "observacao", "deleted_at"),
+    "pais_tipo_visto": ("id", "pais_id", "tipo_visto_id"),
+    "parceiros": ("id", "usuario_id", "empresa", "segmento", "telefone", "cidade", "estado", "deleted_at"),
+    "entradas": ("id", "processo_id", "valor", "data", "pago", "created_at", "updated_at", "deleted_at"),
+    "passaportes": (
+        "id", "processo_id", "tipo_passaporte", "numero", "orgao_emissor", "pais_emissor",
+        "data_emissao", "data_validade", "cidade_emissao", "updated_at", "deleted_at",
+    ),
+    "dados_escolas": (
+        "id", "processo_id", "nome", "curso", "endereco", "cidade", "estado", "numero_sevis",
+        "updated_at", "deleted_at",
+    ),
+    "dados_financeiros": ("id", "processo_id", "quem_custeara", "updated_at", "deleted_at"),
+}
+
+SYNTHETIC_FORMATS = ("jsonl", "sqlite")
+
+SYNTHETIC_PARTNERS = 20
+
+SYNTHETIC_ADVISORS = 5
+
+
+class JsonlDatasetWriter:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._handles = {}
+
+    def write(self, table, row):
+        handle = self._handles.get(table)
+        if handle is None:
+            handle = (self.directory / f"{table}.jsonl").open("w", encoding="utf-8")
+            self._handles[table] = handle
+        handle.write(json.dumps(row, ensure_ascii=False, default=str))
+        handle.write("\n")
+
+    def close(self):
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+
+
+class SqliteDatasetWriter:
+    def __init__(self, path, batch_size=5000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()
+        self.connection = sqlite3.connect(str(self.path))
+        self.batch_size = batch_size
+        self._pending = {}
+        for table, columns in SYNTHETIC_TABLE_COLUMNS.items():
+            self.connection.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+
+    def write(self, table, row):
+        pending = self._pending.setdefault(table, [])
+        pending.append(tuple(row.get(column) for column in SYNTHETIC_TABLE_COLUMNS[table]))
+        if len(pending) >= self.batch_size:
+            self._flush(table)
+
+    def _flush(self, table):
+        rows = self._pending.get(table)
+        if not rows:
+            return
+        columns = SYNTHETIC_TABLE_COLUMNS[table]
+        self.connection.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows,
+        )
+        self._pending[table] = []
+
+    def close(self):
+        for table in list(self._pending):
+            self._flush(table)
+        for table in LEGACY_DELTA_TABLES:
+            self.connection.execute(f"CREATE INDEX {table}_updated_at ON {table} (updated_at)")
+        for table in LEGACY_PROCESS_CHILD_TABLES:
+            self.connection.execute(f"CREATE INDEX {table}_processo_id ON {table} (processo_id)")
+        self.connection.execute("CREATE INDEX processos_cliente_id ON processos (cliente_id)")
+        self.connection.commit()
+        self.connection.close()
+
+
+def _format_datetime(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _synthetic_cpf(index: int) -> str:
+    digits = f"{(index * 7919) % 10**11:011d}"
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def generate_legacy_dataset(writer, clients: int, seed: int = 42, family_every: int = 5) -> dict[str, int]:
+    rng = random.Random(seed)
+    counts = {}
+    base_time = datetime(2024, 1, 1, 8, 0, 0)
+
+    def emit(table, row):
+        writer.write(table, row)
+        counts[table] = counts.get(table, 0) + 1
+
+    for country_id, name, iso in SYNTHETIC_COUNTRIES:
+        emit("pais", {"id": country_id, "nome": name, "sigla": iso, "deleted_at": None})
+    for visa_type_id, name in SYNTHETIC_VISA_TYPES:
+        emit("tipo_vistos", {"id": visa_type_id, "nome": name, "observacao": "", "deleted_at": None})
+    relation_id = 0
+    for country_id, _, _ in SYNTHETIC_COUNTRIES:
+        for visa_type_id, _ in SYNTHETIC_VISA_TYPES:
+            relation_id += 1
+            emit("pais_tipo_visto", {"id": relation_id, "pais_id": country_id, "tipo_visto_id": visa_type_id})
+    for status_id, name in enumerate(SYNTHETIC_STATUSES, start=1):
+        emit("situacao_processos", {"id": status_id, "nome": name})
+
+    user_id = 0
+    advisor_user_ids = []
+    for index in range(1, SYNTHETIC_ADVISORS + 1):
+        user_id += 1
+        advisor_user_ids.append(user_id)
+        emit("users", {"id": user_id, "email": f"assessor{index}@legado.local", "name": f"Assessor {index}", "password": ""})
+    for partner_id in range(1, SYNTHETIC_PARTNERS + 1):
+        user_id += 1
+        emit("users", {"id": user_id, "email": f"parceiro{partner_id}@legado.local", "name": f"Parceiro {partner_id}", "password": ""})
+        city, state, _ = SYNTHETIC_CITIES[partner_id % len(SYNTHETIC_CITIES)]
+        emit(
+            "parceiros",
+            {
+                "id": partner_id,
+                "usuario_id": user_id,
+                "empresa": f"Agencia Parceira {partner_id}",
+                "segmento": "agencia_viagem",
+                "telefone": f"(62) 3000-{partner_id:04d}",
+                "cidade": city,
+                "estado": state,
+                "deleted_at": None,
+            },
+        )
+
+    cronograma_id = 0
+    entry_id = 0
+    payload_ids = {table: 0 for table in LEGACY_PAYLOAD_TABLES}
+    principal = None
+    for client_id in range(1, clients + 1):
+        user_id += 1
+        first_name = rng.choice(SYNTHETIC_FIRST_NAMES)
+        last_name = f"{rng.choice(SYNTHETIC_LAST_NAMES)} {rng.choice(SYNTHETIC_LAST_NAMES)}"
+        city, state, zip_code = rng.choice(SYNTHETIC_CITIES)
+        created_at = base_time + timedelta(minutes=client_id)
+        updated_at = created_at + timedelta(days=rng.randint(0, 400))
+        emit(
+            "users",
+            {
+                "id": user_id,
+                "email": f"cliente{client_id}@legado.local",
+                "name": f"{first_name} {last_name}",
+                "password": f"legacy-{client_id}",
+            },
+        )
+        emit(
+            "clientes",
+            {
+                "id": client_id,
+                "usuario_id": user_id,
+                "usuario_responsavel_id": rng.choice(advisor_user_ids),
+                "nome": first_name,
+                "sobrenome": last_name,
+                "cpf": _synthetic_cpf(client_id),
+                "nascimento": (date(1960, 1, 1) + timedelta(days=rng.randint(0, 16000))).isoformat(),
+                "nacionalidade": "Brasileira",
+                "telefone": f"(62) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                "telefone_secundario": "",
+                "cep": zip_code,
+                "endereco": f"Rua {rng.randint(1, 300)}",
+                "complemento": "",
+                "bairro": "Centro",
+                "cidade": city,
+                "estado": state,
+                "sexo": rng.choice(("Masculino", "Feminino")),
+                "estado_civil": rng.choice(("Solteiro", "Casado")),
+                "created_at": _format_datetime(created_at),
+                "updated_at": _format_datetime(updated_at),
+                "deleted_at": None,
+            },
+        )
+
+        is_dependent = principal is not None and family_every > 0 and client_id % family_every == 0
+        if is_dependent:
+            emit(
+                "familiares_clientes",
+                {"id": counts.get("familiares_clientes", 0) + 1, "id_cliente_principal": principal["cliente_id"], "id_cliente_familiar": client_id},
+            )
+            country_id, visa_type_id = principal["pais_id"], principal["tipo_visto_id"]
+            departure = principal["data_prevista_viagem"]
+            return_date = principal["data_prevista_retorno"]
+            partner_id = principal["parceiro_id"]
+        else:
+            country_id = rng.choice(SYNTHETIC_COUNTRIES)[0]
+            visa_type_id = rng.choice(SYNTHETIC_VISA_TYPES)[0]
+            departure_date = date(2025, 1, 1) + timedelta(days=rng.randint(0, 700))
+            departure = departure_date.isoformat()
+            return_date = (departure_date + timedelta(days=rng.randint(7, 60))).isoformat()
+            partner_id = rng.randint(1, SYNTHETIC_PARTNERS) if rng.random() < 0.3 else None
+
+        process_id = client_id
+        status_count = rng.randint(1, len(SYNTHETIC_STATUSES))
+        process = {
+            "id": process_id,
+            "cliente_id": client_id,
+            "parceiro_id": partner_id,
+            "pais_id": country_id,
+            "tipo_visto_id": visa_type_id,
+            "data_prevista_viagem": departure,
+            "data_prevista_retorno": return_date,
+            "percet_conclusao": str(int(100 * status_count / len(SYNTHETIC_STATUSES))),
+            "conclusao_formulario": 0,
+            "motivo_viagem": rng.choice(("Turismo", "Estudo", "Negocios")),
+            "created_at": _format_datetime(created_at),
+            "updated_at": _format_datetime(updated_at),
+            "deleted_at": None,
+        }
+        emit("processos", process)
+        if is_dependent:
+            emit(
+                "processo_clientes",
+                {"id": counts.get("processo_clientes", 0) + 1, "id_processo_cliente": process_id, "id_processo_principal": principal["id"]},
+            )
+        else:
+            principal = process
+
+        for status_id in range(1, status_count + 1):
+            cronograma_id += 1
+            finished = status_id < status_count
+            emit(
+                "cronograma_processos",
+                {
+                    "id": cronograma_id,
+                    "processo_id": process_id,
+                    "situacao_id": status_id,
+                    "dias_prazo_finalizacao": str(rng.choice((5, 7, 14, 30))),
+                    "data_finalizacao": _format_datetime(updated_at) if finished else None,
+                    "created_at": _format_datetime(created_at),
+                    "updated_at": _format_datetime(updated_at),
+                    "deleted_at": None,
+                },
+            )
+
+        for _ in range(rng.randint(0, 2)):
+            entry_id += 1
+            emit(
+                "entradas",
+                {
+                    "id": entry_id,
+                    "processo_id": process_id,
+                    "valor": f"{rng.randint(300, 5000)},00",
+                    "data": updated_at.date().isoformat(),
+                    "pago": rng.choice((0, 1)),
+                    "created_at": _format_datetime(created_at),
+                    "updated_at": _format_datetime(updated_at),
+                    "deleted_at": None,
+                },
+            )
+
+        payload_rows = {
+            "passaportes": {
+                "tipo_passaporte": "Comum",
+                "numero": f"F{rng.randint(100000, 999999)}",
+                "orgao_emissor": "SR/PF/GO",
+                "pais_emissor": "Brasil",
+                "data_emissao": "2022-05-10",
+                "data_validade": "2032-05-09",
+                "cidade_emissao": city,
+            },
+            "dados_escolas": {
+                "nome": "Escola Internacional",
+                "curso": "Ingles",
+                "endereco": "Main Street 100",
+                "cidade": "Toronto",
+                "estado": "ON",
+                "numero_sevis": f"N{rng.randint(1000000, 9999999)}",
+            },
+            "dados_financeiros": {"quem_custeara": rng.choice(("Proprio", "Pais", "Empresa"))},
+        }
+        for table in LEGACY_PAYLOAD_TABLES:
+            if rng.random() >= 0.5:
+                continue
+            payload_ids[table] += 1
+            row = {"id": payload_ids[table], "processo_id": process_id, "updated_at": _format_datetime(updated_at), "deleted_at": None}
+            row.update(payload_rows.get(table, {"descricao": f"Registro sintetico {process_id}"}))
+            emit(table, row)
+
+    writer.close()
+    return counts
+
+
+def open_dataset_writer(kind: str, path):
+    if kind == "jsonl":
+        return JsonlDatasetWriter(path)
+    if kind == "sqlite":
+        return SqliteDatasetWriter(path)
+    raise ValueError(f"Formato de dataset desconhecido: {kind}")
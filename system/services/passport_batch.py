@@ -0,0 +1,229 @@
+import csv
+import json
+import re
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+from time import perf_counter
+
+import django
+from django.db import connections
+from django.utils import timezone
+
+from system.models import ConsultancyClient
+from system.services.form_prefill import normalize_text
+from system.services.passport_ocr import (
+    PassportExtractionError,
+    extract_passport_data_from_bytes,
+    get_cached_passport_extraction,
+    store_passport_extraction,
+)
+
+PASSPORT_BATCH_EXTENSIONS = (".png", ".jpg", ".jpeg", ".pdf")
+PASSPORT_BATCH_MAX_FILE_BYTES = 10 * 1024 * 1024
+PASSPORT_RESULT_FORMATS = ("jsonl", "csv")
+# Campos do cliente preenchidos a partir da MRZ.
+PASSPORT_CLIENT_FIELDS = ("passport_number", "passport_issuing_country", "passport_expiry_date", "passport_type")
+_CSV_COLUMNS = (
+    "file",
+    "status",
+    "latency_ms",
+    "first_name",
+    "last_name",
+    "birth_date",
+    *PASSPORT_CLIENT_FIELDS,
+    "nationality",
+    "client_id",
+    "match",
+    "warnings",
+    "error",
+)
+_CPF_IN_NAME = re.compile(r"(?<!\d)(\d{3})\.?(\d{3})\.?(\d{3})-?(\d{2})(?!\d)")
+
+
+def iter_passport_documents(path):
+    # Diretório (recursivo) ou ZIP; só arquivos aceitos pelo OCR, em ordem de nome.
+    path = Path(path)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            members = sorted(
+                (info for info in archive.infolist() if not info.is_dir() and _is_passport_file(info.filename)),
+                key=lambda info: info.filename,
+            )
+            for info in members:
+                if info.file_size > PASSPORT_BATCH_MAX_FILE_BYTES:
+                    yield info.filename, None
+                    continue
+                yield info.filename, archive.read(info)
+        return
+    for file_path in sorted(item for item in path.rglob("*") if item.is_file() and _is_passport_file(item.name)):
+        name = file_path.relative_to(path).as_posix()
+        if file_path.stat().st_size > PASSPORT_BATCH_MAX_FILE_BYTES:
+            yield name, None
+            continue
+        yield name, file_path.read_bytes()
+
+
+def extract_passport_batch(documents, *, workers: int):
+    # O cache fica no processo principal; os workers só rodam o OCR e não tocam no banco.
+    results = {}
+    order = []
+    pending = {}
+    connections.close_all()
+    # django.setup no initializer: com spawn/forkserver o worker precisa do registro de apps.
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=django.setup) as executor:
+        for name, file_bytes in documents:
+            order.append(name)
+            if file_bytes is None:
+                results[name] = _error_result(name, "Arquivo muito grande. Limite de 10MB.")
+                continue
+            started = perf_counter()
+            digest, cached = get_cached_passport_extraction(file_bytes)
+            if cached is not None:
+                results[name] = _ok_result(name, cached, perf_counter() - started, status="cached")
+                continue
+            while len(pending) >= max(1, workers) * 2:
+                _collect_done(pending, results, wait(pending, return_when=FIRST_COMPLETED).done)
+            pending[executor.submit(_extract_in_worker, name, file_bytes)] = (name, digest)
+        while pending:
+            _collect_done(pending, results, wait(pending, return_when=FIRST_COMPLETED).done)
+    return [results[name] for name in order]
+
+
+def match_passport_results(results):
+    # CPF no nome do arquivo (ex.: 123.456.789-09.jpg); senão nome completo + nascimento, se único.
+    clients = list(
+        ConsultancyClient.objects.only("pk", "cpf", "first_name", "last_name", "birth_date", *PASSPORT_CLIENT_FIELDS)
+    )
+    by_cpf = {_cpf_digits(client.cpf): client for client in clients if _cpf_digits(client.cpf)}
+    by_name = {}
+    for client in clients:
+        key = (normalize_text(client.full_name), client.birth_date.isoformat() if client.birth_date else "")
+        by_name.setdefault(key, []).append(client)
+
+    matched = {}
+    for result in results:
+        if result["status"] == "error":
+            continue
+        fields = result["fields"]
+        cpf = _cpf_from_filename(result["file"])
+        client = by_cpf.get(cpf) if cpf else None
+        method = "cpf" if client else ""
+        if client is None:
+            full_name = normalize_text(f"{fields.get('first_name', '')} {fields.get('last_name', '')}")
+            candidates = by_name.get((full_name, fields.get("birth_date", ""))) or []
+            if full_name and len(candidates) == 1:
+                client, method = candidates[0], "name"
+        if client is not None:
+            result["client_id"] = client.pk
+            result["match"] = method
+            matched[client.pk] = client
+    return matched
+
+
+def apply_passport_fields(results, clients, *, overwrite: bool = False) -> int:
+    updated = {}
+    for result in results:
+        client = clients.get(result.get("client_id"))
+        if client is None:
+            continue
+        for field_name in PASSPORT_CLIENT_FIELDS:
+            value = result["fields"].get(field_name)
+            if field_name == "passport_expiry_date" and value:
+                value = date.fromisoformat(value)
+            if value and (overwrite or not getattr(client, field_name)):
+                setattr(client, field_name, value)
+                updated[client.pk] = client
+    if updated:
+        # bulk_update não aplica o auto_now: o updated_at vai explícito na lista de campos.
+        now = timezone.now()
+        for client in updated.values():
+            client.updated_at = now
+        ConsultancyClient.objects.bulk_update(
+            list(updated.values()), [*PASSPORT_CLIENT_FIELDS, "updated_at"], batch_size=200
+        )
+    return len(updated)
+
+
+def write_passport_results(results, output, output_format: str) -> None:
+    with open(output, "w", encoding="utf-8", newline="") as handle:
+        if output_format == "jsonl":
+            for result in results:
+                handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+            return
+        writer = csv.DictWriter(handle, fieldnames=_CSV_COLUMNS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(
+                {
+                    **{column: result["fields"].get(column, "") for column in _CSV_COLUMNS},
+                    "file": result["file"],
+                    "status": result["status"],
+                    "latency_ms": result["latency_ms"],
+                    "client_id": result.get("client_id") or "",
+                    "match": result.get("match") or "",
+                    "warnings": " | ".join(result["warnings"]),
+                    "error": result["error"],
+                }
+            )
+
+
+def _extract_in_worker(name, file_bytes):
+    started = perf_counter()
+    try:
+        extraction = extract_passport_data_from_bytes(name, file_bytes)
+    except PassportExtractionError as exc:
+        return {"error": str(exc), "elapsed": perf_counter() - started}
+    return {"extraction": extraction, "elapsed": perf_counter() - started}
+
+
+def _collect_done(pending, results, done) -> None:
+    for future in done:
+        name, digest = pending.pop(future)
+        try:
+            outcome = future.result()
+        except Exception as exc:
+            results[name] = _error_result(name, f"Falha interna: {exc}")
+            continue
+        if "error" in outcome:
+            results[name] = _error_result(name, outcome["error"], outcome["elapsed"])
+            continue
+        store_passport_extraction(digest, outcome["extraction"])
+        results[name] = _ok_result(name, outcome["extraction"], outcome["elapsed"])
+
+
+def _ok_result(name, extraction, elapsed, status="ok"):
+    return {
+        "file": name,
+        "status": status,
+        "latency_ms": round(elapsed * 1000, 1),
+        "fields": extraction.get("fields", {}),
+        "warnings": extraction.get("warnings", []),
+        "error": "",
+    }
+
+
+def _error_result(name, error, elapsed=0.0):
+    return {
+        "file": name,
+        "status": "error",
+        "latency_ms": round(elapsed * 1000, 1),
+        "fields": {},
+        "warnings": [],
+        "error": error,
+    }
+
+
+def _is_passport_file(filename: str) -> bool:
+    return filename.lower().endswith(PASSPORT_BATCH_EXTENSIONS) and not Path(filename).name.startswith(".")
+
+
+def _cpf_from_filename(name: str) -> str:
+    match = _CPF_IN_NAME.search(Path(name).stem)
+    return "".join(match.groups()) if match else ""
+
+
+def _cpf_digits(value) -> str:
+    digits = "".join(c for c in str(value or "") if c.isdigit())
+    return digits if len(digits) == 11 else ""
@@ -0,0 +1,122 @@
+import platform
+import statistics
+import tracemalloc
+from collections import Counter, defaultdict
+from time import perf_counter
+
+from system.services.form_prefill import normalize_text
+from system.services.passport_ocr import (
+    PASSPORT_OCR_PIPELINE_VERSION,
+    PassportExtractionError,
+    extract_passport_data_from_bytes,
+    preload_passport_ocr,
+)
+from system.services.passport_synthetic import SYNTHETIC_PASSPORT_FIELDS
+from system.services.profiling import peak_rss_mb
+
+_NAME_FIELDS = {"first_name", "last_name"}
+
+
+def run_passport_ocr_benchmark(samples, *, warmup: bool = True, trace_memory: bool = False) -> dict:
+    # Roda o pipeline sem cache nem daemon, para medir o OCR em si. O tracemalloc deixa o
+    # Python bem mais lento, por isso só entra quando pedido; o pico de RSS vem sempre.
+    if warmup:
+        preload_passport_ocr()
+    rss_before = peak_rss_mb()
+    stage_timings = defaultdict(list)
+    field_hits = Counter()
+    field_totals = Counter()
+    variants = defaultdict(lambda: {"samples": 0, "exact": 0, "failures": 0, "latencies": []})
+    stages = Counter()
+    ocr_calls = []
+    failures = []
+    traced_peak = 0
+
+    for sample in samples:
+        variant = variants[sample["variant"]]
+        variant["samples"] += 1
+        if trace_memory:
+            tracemalloc.start()
+        started = perf_counter()
+        try:
+            extraction = extract_passport_data_from_bytes(sample["filename"], sample["content"])
+        except PassportExtractionError as exc:
+            extraction = None
+            failures.append({"id": sample["id"], "error": str(exc)})
+        elapsed = perf_counter() - started
+        if trace_memory:
+            traced_peak = max(traced_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        stage_timings["total"].append(elapsed)
+        variant["latencies"].append(elapsed)
+        if extraction is None:
+            variant["failures"] += 1
+            continue
+        pipeline = extraction.get("pipeline", {})
+        stages[pipeline.get("stage") or "none"] += 1
+        ocr_calls.append(pipeline.get("ocr_calls", 0))
+        for stage, seconds in pipeline.get("timings", {}).items():
+            stage_timings[stage].append(seconds)
+
+        exact = True
+        for field_name in SYNTHETIC_PASSPORT_FIELDS:
+            field_totals[field_name] += 1
+            if _field_matches(field_name, extraction["fields"].get(field_name), sample["truth"][field_name]):
+                field_hits[field_name] += 1
+            else:
+                exact = False
+        variant["exact"] += int(exact)
+
+    total_samples = sum(variant["samples"] for variant in variants.values())
+    return {
+        "pipeline_version": PASSPORT_OCR_PIPELINE_VERSION,
+        "python": platform.python_version(),
+        "samples": total_samples,
+        "failures": failures,
+        "stages": dict(stages),
+        # Chamadas de OCR de página inteira (fora a faixa da MRZ) por amostra extraída.
+        "ocr_calls": {
+            "mean": round(statistics.fmean(ocr_calls), 2) if ocr_calls else None,
+            "max": max(ocr_calls, default=None),
+        },
+        "latency_seconds": {stage: _percentiles(values) for stage, values in sorted(stage_timings.items())},
+        "memory": {
+            "rss_peak_mb": peak_rss_mb(),
+            "rss_peak_before_mb": rss_before,
+            "python_traced_peak_mb": round(traced_peak / (1024 * 1024), 1) if trace_memory else None,
+        },
+        "field_accuracy": {
+            field_name: round(field_hits[field_name] / field_totals[field_name], 3) if field_totals[field_name] else None
+            for field_name in SYNTHETIC_PASSPORT_FIELDS
+        },
+        "variants": {
+            name: {
+                "samples": variant["samples"],
+                "failures": variant["failures"],
+                "exact_rate": round(variant["exact"] / variant["samples"], 3),
+                "latency_seconds": _percentiles(variant["latencies"]),
+            }
+            for name, variant in sorted(variants.items())
+        },
+    }
+
+
+def _field_matches(field_name, extracted, expected) -> bool:
+    if field_name in _NAME_FIELDS:
+        return normalize_text(extracted) == normalize_text(expected)
+    return (extracted or "") == expected
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    # Percentil por posição (nearest-rank): com poucas amostras, o p95 é o pior caso.
+    p95_index = max(0, -(-95 * len(ordered) // 100) - 1)
+    return {
+        "count": len(ordered),
+        "p50": round(statistics.median(ordered), 4),
+        "p95": round(ordered[p95_index], 4),
+        "max": round(ordered[-1], 4),
+    }
@@ -1,22 +1,68 @@
 from __future__ import annotations
 
+import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from io import BytesIO
 from shutil import which
+from time import perf_counter
 from typing import TYPE_CHECKING, Any
 
+from django.conf import settings
+
+from system.services.passport_ocr_cache import get_cached_extraction, passport_document_digest, store_extraction
+
 if TYPE_CHECKING:
     import numpy as np
 
+logger = logging.getLogger(__name__)
+
 
 class PassportExtractionError(Exception):
     pass
 
 
+class _EngineFailure(Exception):
+    pass
+
+
+# Incrementar sempre que uma mudança no pipeline puder alterar os campos extraídos: invalida o cache.
+PASSPORT_OCR_PIPELINE_VERSION = "4"
+
 _OCR_ENGINE: Any = None
+_OCR_ENGINE_LOCK = threading.Lock()
+_OCR_EXECUTOR: ThreadPoolExecutor | None = None
+_OCR_EXECUTOR_LOCK = threading.Lock()
 _TESSERACT_AVAILABLE: bool | None = None
 _SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".pdf"}
+_MRZ_DETECTION_HEIGHT = 600
+# Resolução de trabalho: lado maior de ~2000 px equivale a uma página A4 em ~170 DPI
+# ou à página de dados do passaporte em ~400 DPI, suficiente para a MRZ.
+# Pico de memória por página: a decodificação é limitada a _MAX_DECODED_PIXELS
+# (~120 MB em BGR). Só o JPEG reduz dentro do decodificador (IMREAD_REDUCED_*), então o
+# limite vale para os pixels já reduzidos; PNG e demais formatos decodificam a imagem
+# cheia e o limite vale para o tamanho original. Logo em seguida a imagem cai para
+# _TARGET_LONG_EDGE (<= 12 MB); original, cinza e variantes montadas somam menos de
+# ~40 MB por página, no máximo duas páginas.
+_TARGET_LONG_EDGE = 2000
+_MAX_UPSCALE = 2.0
+# Limiares do analisador de qualidade (medidos na imagem reduzida a _QUALITY_ANALYSIS_EDGE).
+_QUALITY_ANALYSIS_EDGE = 1000
+_LOW_CONTRAST = 70.0
+_LOW_SHARPNESS = 150.0
+_SMALL_TEXT_HEIGHT = 20.0
+_TARGET_TEXT_HEIGHT = 32.0
+_MIN_DESKEW_DEGREES = 0.7
+_MAX_DESKEW_DEGREES = 15.0
+_MAX_PDF_RENDER_SCALE = 4.0
+_MAX_DECODED_PIXELS = 40_000_000
+_IMAGE_TOO_LARGE_MSG = "Imagem muito grande. Envie uma foto ou digitalização do passaporte com até 40 megapixels."
+_OCR_ENGINES = ("rapidocr", "pytesseract")
+_MRZ_CHECK_WEIGHTS = (7, 3, 1)
+_MRZ_DIGIT_FIXES = str.maketrans({"O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "Z": "2", "S": "5", "G": "6", "B": "8"})
+_MRZ_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<"
 _OCR_DEPS_MISSING_MSG = (
     "Dependências de OCR ausentes no ambiente. Instale na .venv: "
     "opencv-python-headless, numpy, pypdfium2, pytesseract, rapidocr-onnxruntime, Pillow."
@@ -27,11 +73,12 @@ _cv2: Any = None
 _np: Any = None
 _pdfium: Any = None
 _pytesseract: Any = None
+_PILImage: Any = None
 _RapidOCR_cls: Any = None
 
 
 def _ensure_ocr_stack() -> None:
-    global _cv2, _np, _pdfium, _pytesseract, _RapidOCR_cls
+    global _cv2, _np, _pdfium, _pytesseract, _PILImage, _RapidOCR_cls
     if _cv2 is not None:
         return
     try:
@@ -39,6 +86,7 @@ def _ensure_ocr_stack() -> None:
         import numpy as np_mod
         import pypdfium2 as pdfium_mod
         import pytesseract as pytesseract_mod
+        from PIL import Image as PILImage_mod
         from rapidocr_onnxruntime import RapidOCR as RapidOCR_cls_mod
     except ImportError as exc:
         raise PassportExtractionError(
@@ -48,6 +96,7 @@ def _ensure_ocr_stack() -> None:
     _np = np_mod
     _pdfium = pdfium_mod
     _pytesseract = pytesseract_mod
+    _PILImage = PILImage_mod
     _RapidOCR_cls = RapidOCR_cls_mod
 
 
@@ -57,15 +106,101 @@ def extract_passport_data_from_document(uploaded_file) -> dict[str, object]:
         raise PassportExtractionError("Arquivo vazio. Envie um PNG, JPG ou PDF de passaporte.")
     if not _is_supported_file(uploaded_file.name):
         raise PassportExtractionError("Formato não suportado. Use PNG, JPG ou PDF.")
+    digest, cached = get_cached_passport_extraction(file_bytes)
+    if cached is not None:
+        return cached
+    extraction = _extract_via_daemon(uploaded_file.name, file_bytes)
+    if extraction is None:
+        extraction = extract_passport_data_from_bytes(uploaded_file.name, file_bytes)
+    store_passport_extraction(digest, extraction)
+    return extraction
+
+
+def get_cached_passport_extraction(file_bytes: bytes) -> tuple[str, dict | None]:
+    # A chave do cache (SHA-256 do arquivo + versão do pipeline) é montada só aqui, para a API e o lote.
+    digest = passport_document_digest(file_bytes)
+    return digest, get_cached_extraction(digest, PASSPORT_OCR_PIPELINE_VERSION)
+
+
+def store_passport_extraction(digest: str, extraction: dict) -> None:
+    store_extraction(digest, PASSPORT_OCR_PIPELINE_VERSION, extraction)
+
+
+def preload_passport_ocr() -> None:
+    # Usado pelo daemon de OCR: importa a pilha e carrega os modelos antes da primeira requisição.
+    _ensure_ocr_stack()
+    _get_ocr_engine()
+    _is_tesseract_available()
+
+
+def extract_passport_data_from_bytes(filename: str, file_bytes: bytes) -> dict[str, object]:
     _ensure_ocr_stack()
-    is_pdf = uploaded_file.name.lower().endswith(".pdf")
-    images = _extract_images(uploaded_file.name, file_bytes)
-    lines_by_source = _collect_lines_multisource(images, file_bytes=file_bytes, is_pdf=is_pdf)
+    trace = {"stage": None, "timings": {}}
+    pdf_lines = []
+    if filename.lower().endswith(".pdf"):
+        # PDFs gerados digitalmente costumam trazer a MRZ na camada de texto: sem renderizar nem OCR.
+        started = perf_counter()
+        pdf_lines = _extract_pdf_text_lines(file_bytes)
+        _add_timing(trace["timings"], "pdf_text", perf_counter() - started)
+        if _is_valid_mrz(_extract_mrz_lines(pdf_lines)):
+            trace["stage"] = "pdf_text"
+            return _build_extraction({"pdf_text": _deduplicate_lines(pdf_lines)}, trace)
+    started = perf_counter()
+    images = _extract_images(filename, file_bytes)
+    _add_timing(trace["timings"], "decode", perf_counter() - started)
+    started = perf_counter()
+    lines_by_source = _collect_mrz_roi_lines(images)
+    _add_timing(trace["timings"], "mrz_roi", perf_counter() - started)
+    mrz_lines = _extract_mrz_lines(_merge_multisource_lines(lines_by_source))
+    if _is_valid_mrz(mrz_lines):
+        trace["stage"] = "mrz_roi"
+    else:
+        roi_lines = lines_by_source
+        lines_by_source = _collect_lines_multisource(images, pdf_lines=pdf_lines, trace=trace)
+        for name, source_lines in roi_lines.items():
+            lines_by_source[name] = _deduplicate_lines([*lines_by_source.get(name, []), *source_lines])
+    return _build_extraction(lines_by_source, trace)
+
+
+def _build_extraction(lines_by_source, trace) -> dict[str, object]:
+    mrz_lines = _extract_mrz_lines(_merge_multisource_lines(lines_by_source))
+    mrz_valid = _is_valid_mrz(mrz_lines)
     lines = _merge_multisource_lines(lines_by_source)
-    mrz_lines = _extract_mrz_lines(lines)
     fields = _build_fields(lines_by_source, mrz_lines)
-    warnings = _build_warnings(fields, mrz_lines, lines_by_source)
-    return {"fields": fields, "warnings": warnings, "raw_lines": lines[:20]}
+    warnings = _build_warnings(fields, mrz_lines, lines_by_source, early_exit=bool(trace["stage"]))
+    return {
+        "fields": fields,
+        "warnings": warnings,
+        "raw_lines": lines[:20],
+        "pipeline": {
+            "stage": trace["stage"] if mrz_valid else None,
+            "mrz_valid": mrz_valid,
+            "timings": trace["timings"],
+            "ocr_calls": trace.get("ocr_calls", 0),
+            "cache": "miss",
+        },
+    }
+
+
+def _extract_via_daemon(filename: str, file_bytes: bytes):
+    socket_path = settings.PASSPORT_OCR_DAEMON_SOCKET
+    if not socket_path:
+        return None
+    from system.services.passport_ocr_daemon import PassportOcrDaemonUnavailable, request_daemon_extraction
+
+    try:
+        response = request_daemon_extraction(
+            socket_path,
+            filename,
+            file_bytes,
+            timeout=settings.PASSPORT_OCR_DAEMON_TIMEOUT_SECONDS,
+        )
+    except PassportOcrDaemonUnavailable as exc:
+        logger.warning("Daemon de OCR indisponível em %s (%s); extraindo no processo.", socket_path, exc)
+        return None
+    if "error" in response:
+        raise PassportExtractionError(response["error"])
+    return response["extraction"]
 
 
 def _is_supported_file(filename: str) -> bool:
@@ -90,57 +225,318 @@ def _render_pdf_pages(file_bytes: bytes, max_pages: int = 2) -> list[Any]:
     try:
         images: list[Any] = []
         for index in range(min(len(pdf), max_pages)):
-            pil_image = pdf[index].render(scale=2).to_pil().convert("RGB")
-            images.append(_np.array(pil_image))
+            page = pdf[index]
+            pil_image = page.render(scale=_pdf_render_scale(*page.get_size())).to_pil().convert("RGB")
+            images.append(_cv2.cvtColor(_np.array(pil_image), _cv2.COLOR_RGB2BGR))
         return images
     finally:
         pdf.close()
 
 
+def _pdf_render_scale(width_points: float, height_points: float) -> float:
+    # Escala escolhida pelo tamanho da página: A4 sai com ~2000 px, página pequena não explode.
+    long_edge = max(width_points, height_points, 1.0)
+    return min(_MAX_PDF_RENDER_SCALE, _TARGET_LONG_EDGE / long_edge)
+
+
 def _decode_image(file_bytes: bytes) -> Any:
-    np_bytes = _np.frombuffer(file_bytes, dtype=_np.uint8)
-    return _cv2.imdecode(np_bytes, _cv2.IMREAD_COLOR)
+    image_format, dimensions = _image_header(file_bytes)
+    reduction = 1
+    if dimensions:
+        long_edge = max(dimensions)
+        # Fora do JPEG, IMREAD_REDUCED_* decodifica a imagem cheia e só depois reduz: nada a ganhar.
+        can_reduce = image_format == "JPEG"
+        while can_reduce and reduction < 8 and long_edge // (reduction * 2) >= _TARGET_LONG_EDGE:
+            reduction *= 2
+        if dimensions[0] * dimensions[1] // (reduction * reduction) > _MAX_DECODED_PIXELS:
+            raise PassportExtractionError(_IMAGE_TOO_LARGE_MSG)
+    flags = {1: _cv2.IMREAD_COLOR, 2: _cv2.IMREAD_REDUCED_COLOR_2, 4: _cv2.IMREAD_REDUCED_COLOR_4, 8: _cv2.IMREAD_REDUCED_COLOR_8}
+    # Em JPEG a redução acontece dentro do decodificador (escala DCT), sem alocar a imagem cheia.
+    image = _cv2.imdecode(_np.frombuffer(file_bytes, dtype=_np.uint8), flags[reduction])
+    if image is None:
+        return None
+    return _limit_resolution(image)
 
 
-def _collect_lines_multisource(images, *, file_bytes, is_pdf):
-    sources = {
-        "rapidocr": _collect_lines_with_rapidocr(images),
-        "pytesseract": _collect_lines_with_tesseract(images),
-    }
-    if is_pdf:
-        sources["pdfminer"] = _extract_pdf_text_lines(file_bytes)
-    return {name: _deduplicate_lines(lines) for name, lines in sources.items() if lines}
+def _image_header(file_bytes: bytes):
+    # Lê só o cabeçalho (formato e dimensões); os pixels não são decodificados aqui.
+    try:
+        with _PILImage.open(BytesIO(file_bytes)) as header:
+            return header.format, header.size
+    except _PILImage.DecompressionBombError as exc:
+        raise PassportExtractionError(_IMAGE_TOO_LARGE_MSG) from exc
+    except Exception:
+        return None, None
 
 
-def _collect_lines_with_rapidocr(images):
-    lines = []
+def _limit_resolution(image):
+    long_edge = max(image.shape[:2])
+    if long_edge <= _TARGET_LONG_EDGE:
+        return image
+    ratio = _TARGET_LONG_EDGE / long_edge
+    return _cv2.resize(image, None, fx=ratio, fy=ratio, interpolation=_cv2.INTER_AREA)
+
+
+def _collect_mrz_roi_lines(images):
+    # Caminho rápido: OCR apenas da faixa MRZ; a página inteira só é lida quando a faixa não é achada.
     for image in images:
-        for candidate in _image_candidates_for_ocr(image):
-            lines.extend(_run_rapidocr(candidate))
-    return lines
+        region = _locate_mrz_region(image)
+        if region is None:
+            continue
+        rows = _split_mrz_rows(region)
+        if 2 <= len(rows) <= 3:
+            lines = [line for row in rows for line in _run_rapidocr_recognition(row)]
+        else:
+            lines = _run_rapidocr(_cv2.cvtColor(region, _cv2.COLOR_BGR2RGB))
+        if _is_valid_mrz(_extract_mrz_lines(lines)):
+            return {"rapidocr": _deduplicate_lines(lines)}
+        tesseract_lines = _run_tesseract_mrz(region)
+        if _is_valid_mrz(_extract_mrz_lines(tesseract_lines)):
+            return {"pytesseract": _deduplicate_lines(tesseract_lines)}
+        # MRZ com dígitos inválidos ainda ajuda a escolher o melhor par depois do OCR completo.
+        found = {"rapidocr": lines, "pytesseract": tesseract_lines}
+        return {name: _deduplicate_lines(found_lines) for name, found_lines in found.items() if found_lines}
+    return {}
+
+
+def _locate_mrz_region(image):
+    gray = _cv2.cvtColor(image, _cv2.COLOR_BGR2GRAY)
+    height = gray.shape[0]
+    ratio = _MRZ_DETECTION_HEIGHT / height if height > _MRZ_DETECTION_HEIGHT else 1.0
+    small = _cv2.resize(gray, None, fx=ratio, fy=ratio, interpolation=_cv2.INTER_AREA) if ratio < 1 else gray
+    small_height, small_width = small.shape
+    rect_kernel = _cv2.getStructuringElement(_cv2.MORPH_RECT, (max(13, small_width // 60), 5))
+    square_size = max(21, small_width // 30)
+    square_kernel = _cv2.getStructuringElement(_cv2.MORPH_RECT, (square_size, square_size))
+
+    # Blackhat realça texto escuro sobre fundo claro; o gradiente horizontal
+    # e o fechamento juntam os caracteres da MRZ em um bloco largo e baixo.
+    small = _cv2.GaussianBlur(small, (3, 3), 0)
+    blackhat = _cv2.morphologyEx(small, _cv2.MORPH_BLACKHAT, rect_kernel)
+    gradient = _np.absolute(_cv2.Sobel(blackhat, _cv2.CV_32F, 1, 0, ksize=-1))
+    gradient = _cv2.normalize(gradient, None, 0, 255, _cv2.NORM_MINMAX).astype("uint8")
+    gradient = _cv2.morphologyEx(gradient, _cv2.MORPH_CLOSE, rect_kernel)
+    _, thresholded = _cv2.threshold(gradient, 0, 255, _cv2.THRESH_BINARY + _cv2.THRESH_OTSU)
+    thresholded = _cv2.morphologyEx(thresholded, _cv2.MORPH_CLOSE, square_kernel)
+    thresholded = _cv2.erode(thresholded, None, iterations=2)
+    contours, _ = _cv2.findContours(thresholded, _cv2.RETR_EXTERNAL, _cv2.CHAIN_APPROX_SIMPLE)
+
+    best = None
+    for contour in contours:
+        x, y, width, height = _cv2.boundingRect(contour)
+        if width < small_width * 0.4 or width / max(height, 1) < 5:
+            continue
+        score = width * (1.0 + (y + height) / small_height)
+        if best is None or score > best[0]:
+            best = (score, x, y, width, height)
+    if best is None:
+        return None
+
+    _, x, y, width, height = best
+    pad_x, pad_y = int(width * 0.03), int(height * 0.25)
+    top = int(max(0, y - pad_y) / ratio)
+    bottom = int(min(small_height, y + height + pad_y) / ratio)
+    left = int(max(0, x - pad_x) / ratio)
+    right = int(min(small_width, x + width + pad_x) / ratio)
+    return image[top:bottom, left:right]
+
+
+def _split_mrz_rows(region):
+    gray = _cv2.cvtColor(region, _cv2.COLOR_BGR2GRAY)
+    _, inverted = _cv2.threshold(gray, 0, 255, _cv2.THRESH_BINARY_INV + _cv2.THRESH_OTSU)
+    ink_rows = (inverted > 0).sum(axis=1) > max(1, 0.02 * inverted.shape[1])
+    bands = []
+    start = None
+    for index, has_ink in enumerate(ink_rows):
+        if has_ink and start is None:
+            start = index
+        elif not has_ink and start is not None:
+            bands.append((start, index))
+            start = None
+    if start is not None:
+        bands.append((start, len(ink_rows)))
+    min_height = max(4, int(0.15 * inverted.shape[0]))
+    return [
+        _cv2.cvtColor(region[max(0, top - 4) : bottom + 4], _cv2.COLOR_BGR2RGB)
+        for top, bottom in bands
+        if bottom - top >= min_height
+    ]
 
 
-def _collect_lines_with_tesseract(images):
+def _run_rapidocr_recognition(row_image):
+    # Linha já recortada: pula detecção e classificação de ângulo do RapidOCR.
+    result, _ = _get_ocr_engine()(row_image, use_det=False, use_cls=False)
+    if not result:
+        return []
+    return [text.strip() for text, conf in result if float(conf) >= 0.35 and text.strip()]
+
+
+def _run_tesseract_mrz(region):
     if not _is_tesseract_available():
         return []
-    lines = []
-    config = "--oem 1 --psm 6"
-    for image in images:
-        for candidate in _image_candidates_for_ocr(image):
-            try:
-                text = _pytesseract.image_to_string(candidate, lang="eng", config=config)
-            except Exception:
-                return []
-            lines.extend(line.strip() for line in text.splitlines() if line.strip())
-    return lines
+    config = f"--oem 1 --psm 6 -c tessedit_char_whitelist={_MRZ_ALPHABET}"
+    try:
+        text = _pytesseract.image_to_string(_cv2.cvtColor(region, _cv2.COLOR_BGR2RGB), lang="eng", config=config)
+    except Exception:
+        return []
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _collect_lines_multisource(images, *, pdf_lines=(), trace=None):
+    # Cascata do mais barato para o mais caro; para assim que a MRZ fecha os dígitos verificadores.
+    # Cada página tem seu plano de variantes (ver _plan_ocr_variants); a posição no plano é o
+    # estágio, e as variantes só são montadas quando o estágio entra na fila.
+    # O primeiro estágio roda sozinho; se falhar, os demais vão juntos para o pool
+    # e são conferidos na mesma ordem, então o resultado não depende do agendamento.
+    trace = {} if trace is None else trace
+    timings = trace.setdefault("timings", {})
+    started = perf_counter()
+    qualities = [_analyze_image_quality(image) for image in images]
+    plans = [_plan_ocr_variants(quality) for quality in qualities]
+    bases = [
+        _deskew(image, quality["skew"]) if plan[0] == "deskewed" else image
+        for image, quality, plan in zip(images, qualities, plans)
+    ]
+    _add_timing(timings, "quality", perf_counter() - started)
+    variants = {}
+    results = {}
+    failed = set()
+
+    def collected():
+        return _assemble_sources(results, failed, pdf_lines)
+
+    def variant_image(image_index, rank):
+        key = (image_index, rank)
+        if key not in variants:
+            variants[key] = _build_ocr_variant(bases[image_index], plans[image_index][rank], qualities[image_index])
+        return variants[key]
+
+    stages = [
+        (engine, rank)
+        for rank in range(max((len(plan) for plan in plans), default=0))
+        for engine in _OCR_ENGINES
+        if engine != "pytesseract" or _is_tesseract_available()
+    ]
+    executor = _get_ocr_executor()
+    futures = {}
 
+    def submit(stage):
+        engine, rank = stage
+        for image_index, plan in enumerate(plans):
+            if rank < len(plan):
+                futures[(engine, image_index, rank)] = executor.submit(
+                    _timed_engine_run, engine, variant_image(image_index, rank)
+                )
 
-def _extract_pdf_text_lines(file_bytes):
+    try:
+        for position, stage in enumerate(stages):
+            if position == 0:
+                submit(stage)
+            elif position == 1:
+                for pending_stage in stages[1:]:
+                    submit(pending_stage)
+            engine, rank = stage
+            for image_index in range(len(images)):
+                key = (engine, image_index, rank)
+                if key not in futures:
+                    continue
+                try:
+                    lines, elapsed = futures[key].result()
+                except _EngineFailure:
+                    failed.add(engine)
+                    continue
+                results[key] = lines
+                trace["ocr_calls"] = trace.get("ocr_calls", 0) + 1
+                _add_timing(timings, engine, elapsed)
+            if engine not in failed and _is_valid_mrz(_extract_mrz_lines(_merge_multisource_lines(collected()))):
+                names = dict.fromkeys(plan[rank] for plan in plans if rank < len(plan))
+                trace["stage"] = f"{engine}:{'+'.join(names)}"
+                return collected()
+        return collected()
+    finally:
+        for future in futures.values():
+            future.cancel()
+
+
+def _timed_engine_run(engine, image):
+    started = perf_counter()
+    lines = _run_engine(engine, image)
+    return lines, perf_counter() - started
+
+
+def _add_timing(timings, name, elapsed):
+    timings[name] = round(timings.get(name, 0.0) + elapsed, 3)
+
+
+def _get_ocr_executor():
+    global _OCR_EXECUTOR
+    with _OCR_EXECUTOR_LOCK:
+        if _OCR_EXECUTOR is None:
+            _OCR_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(1, settings.PASSPORT_OCR_MAX_WORKERS),
+                thread_name_prefix="passport-ocr-engine",
+            )
+        return _OCR_EXECUTOR
+
+
+def _assemble_sources(results, failed, pdf_lines):
+    # Ordem fixa (motor, página, variante), igual à execução sequencial completa.
+    sources = {}
+    for engine in _OCR_ENGINES:
+        if engine in failed:
+            continue
+        keys = sorted(key for key in results if key[0] == engine)
+        sources[engine] = [line for key in keys for line in results[key]]
+    if pdf_lines:
+        sources["pdf_text"] = list(pdf_lines)
+    return {name: _deduplicate_lines(lines) for name, lines in sources.items() if lines}
+
+
+def _run_engine(engine, image):
+    if engine == "rapidocr":
+        return _run_rapidocr(image)
+    return _run_tesseract(image)
+
+
+def _run_tesseract(image):
+    try:
+        text = _pytesseract.image_to_string(image, lang="eng", config="--oem 1 --psm 6")
+    except Exception as exc:
+        raise _EngineFailure from exc
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _extract_pdf_text_lines(file_bytes, max_pages: int = 2):
+    # Camada de texto do pdfium (mesmo parser da renderização); pdfminer fica de reserva
+    # para PDFs em que o pdfium não devolve uma MRZ válida.
+    lines = _split_text_lines(_extract_pdfium_text(file_bytes, max_pages))
+    if _is_valid_mrz(_extract_mrz_lines(lines)):
+        return lines
+    return _deduplicate_lines([*lines, *_split_text_lines(_extract_pdfminer_text(file_bytes, max_pages))])
+
+
+def _extract_pdfium_text(file_bytes, max_pages):
+    try:
+        pdf = _pdfium.PdfDocument(BytesIO(file_bytes))
+    except Exception:
+        return ""
+    try:
+        return "\n".join(pdf[index].get_textpage().get_text_range() for index in range(min(len(pdf), max_pages)))
+    except Exception:
+        return ""
+    finally:
+        pdf.close()
+
+
+def _extract_pdfminer_text(file_bytes, max_pages):
     try:
         from pdfminer.high_level import extract_text as pdfminer_extract_text
-        text = pdfminer_extract_text(BytesIO(file_bytes))
+        return pdfminer_extract_text(BytesIO(file_bytes), maxpages=max_pages)
     except Exception:
-        return []
+        return ""
+
+
+def _split_text_lines(text):
     return [line.strip() for line in text.splitlines() if line.strip()]
 
 
@@ -151,13 +547,102 @@ def _merge_multisource_lines(lines_by_source):
     return _deduplicate_lines(merged)
 
 
-def _image_candidates_for_ocr(image):
+def _analyze_image_quality(image):
+    # Métricas baratas (imagem reduzida a ~1000 px) que decidem quais pré-processamentos valem a pena.
     gray = _cv2.cvtColor(image, _cv2.COLOR_BGR2GRAY)
-    resized = _cv2.resize(gray, None, fx=2.0, fy=2.0, interpolation=_cv2.INTER_CUBIC)
-    _, thresholded = _cv2.threshold(resized, 0, 255, _cv2.THRESH_BINARY + _cv2.THRESH_OTSU)
-    rgb_original = _cv2.cvtColor(image, _cv2.COLOR_BGR2RGB)
-    rgb_thresholded = _cv2.cvtColor(thresholded, _cv2.COLOR_GRAY2RGB)
-    return [rgb_original, rgb_thresholded]
+    ratio = min(1.0, _QUALITY_ANALYSIS_EDGE / max(gray.shape))
+    small = _cv2.resize(gray, None, fx=ratio, fy=ratio, interpolation=_cv2.INTER_AREA) if ratio < 1 else gray
+    _, ink = _cv2.threshold(small, 0, 255, _cv2.THRESH_BINARY_INV + _cv2.THRESH_OTSU)
+    text_height, contrast = _text_statistics(small, ink)
+    return {
+        "contrast": round(contrast, 1),
+        "sharpness": round(float(_cv2.Laplacian(small, _cv2.CV_64F).var()), 1),
+        "skew": round(_estimate_skew(ink), 2),
+        "text_height": round(text_height / ratio, 1) if text_height else None,
+        "long_edge": max(gray.shape),
+    }
+
+
+def _text_statistics(gray, ink):
+    # Altura mediana dos componentes com cara de caractere (nem ruído, nem foto/bordas) e o
+    # contraste entre esses caracteres e o papel; fotos e fundos uniformes não entram na conta.
+    count, labels, stats, _ = _cv2.connectedComponentsWithStats(ink, connectivity=8)
+    heights = stats[1:count, _cv2.CC_STAT_HEIGHT]
+    widths = stats[1:count, _cv2.CC_STAT_WIDTH]
+    plausible = (heights >= 4) & (heights <= ink.shape[0] * 0.08) & (widths <= heights * 2)
+    if plausible.sum() < 20:
+        return None, float(_np.percentile(gray, 98) - _np.percentile(gray, 2))
+    characters = _np.isin(labels, _np.flatnonzero(plausible) + 1)
+    contrast = float(_np.median(gray[ink == 0]) - _np.median(gray[characters]))
+    return float(_np.median(heights[plausible])), contrast
+
+
+def _estimate_skew(ink):
+    # Linhas de texto viram blocos largos após o fechamento horizontal; o ângulo mediano é a inclinação.
+    kernel = _cv2.getStructuringElement(_cv2.MORPH_RECT, (max(15, ink.shape[1] // 40), 3))
+    lines = _cv2.morphologyEx(ink, _cv2.MORPH_CLOSE, kernel)
+    contours, _ = _cv2.findContours(lines, _cv2.RETR_EXTERNAL, _cv2.CHAIN_APPROX_SIMPLE)
+    angles = []
+    for contour in contours:
+        (_, _), (width, height), angle = _cv2.minAreaRect(contour)
+        if width < height:
+            width, height, angle = height, width, angle + 90
+        if width < ink.shape[1] * 0.15 or width < height * 5:
+            continue
+        # Ângulo do lado maior normalizado para [-90, 90); a convenção do minAreaRect muda entre versões.
+        angles.append(((angle + 90) % 180) - 90)
+    return float(_np.median(angles)) if angles else 0.0
+
+
+def _plan_ocr_variants(quality):
+    # Ordem = custo/benefício: a imagem (endireitada, se preciso) primeiro, depois só o que a métrica indica.
+    plan = ["deskewed" if _MIN_DESKEW_DEGREES <= abs(quality["skew"]) <= _MAX_DESKEW_DEGREES else "original"]
+    low_contrast = quality["contrast"] < _LOW_CONTRAST
+    blurry = quality["sharpness"] < _LOW_SHARPNESS
+    small_text = quality["text_height"] is not None and quality["text_height"] < _SMALL_TEXT_HEIGHT
+    if low_contrast:
+        plan.append("clahe")
+    if low_contrast or blurry:
+        plan.append("adaptive")
+    elif small_text or quality["text_height"] is None:
+        plan.append("otsu")
+    return plan
+
+
+def _build_ocr_variant(image, name, quality):
+    if name in {"original", "deskewed"}:
+        return _cv2.cvtColor(image, _cv2.COLOR_BGR2RGB)
+    gray = _cv2.cvtColor(image, _cv2.COLOR_BGR2GRAY)
+    if name == "clahe":
+        clahe = _cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        return _cv2.cvtColor(clahe.apply(gray), _cv2.COLOR_GRAY2RGB)
+    # Só amplia quando o texto é pequeno, até a altura-alvo; digitalizações de alta resolução ficam como estão.
+    scale = 1.0
+    if quality["text_height"]:
+        scale = min(_MAX_UPSCALE, _TARGET_TEXT_HEIGHT / quality["text_height"])
+    elif max(gray.shape) < _TARGET_LONG_EDGE:
+        scale = min(_MAX_UPSCALE, _TARGET_LONG_EDGE / max(gray.shape))
+    if scale > 1.0:
+        gray = _cv2.resize(gray, None, fx=scale, fy=scale, interpolation=_cv2.INTER_CUBIC)
+    if name == "adaptive":
+        block = int(max(15, (quality["text_height"] or 12) * scale * 2)) | 1
+        thresholded = _cv2.adaptiveThreshold(
+            _cv2.GaussianBlur(gray, (3, 3), 0),
+            255,
+            _cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            _cv2.THRESH_BINARY,
+            block,
+            10,
+        )
+    else:
+        _, thresholded = _cv2.threshold(gray, 0, 255, _cv2.THRESH_BINARY + _cv2.THRESH_OTSU)
+    return _cv2.cvtColor(thresholded, _cv2.COLOR_GRAY2RGB)
+
+
+def _deskew(image, angle):
+    height, width = image.shape[:2]
+    matrix = _cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return _cv2.warpAffine(image, matrix, (width, height), flags=_cv2.INTER_CUBIC, borderMode=_cv2.BORDER_REPLICATE)
 
 
 def _run_rapidocr(image):
@@ -176,8 +661,9 @@ def _is_tesseract_available():
 
 def _get_ocr_engine():
     global _OCR_ENGINE
-    if _OCR_ENGINE is None:
-        _OCR_ENGINE = _RapidOCR_cls()
+    with _OCR_ENGINE_LOCK:
+        if _OCR_ENGINE is None:
+            _OCR_ENGINE = _RapidOCR_cls()
     return _OCR_ENGINE
 
 
@@ -196,9 +682,55 @@ def _extract_mrz_lines(lines):
     candidates = [_normalize_mrz_text(line) for line in lines]
     candidates = [line for line in candidates if line.count("<") >= 2 and len(line) >= 30]
     candidates.sort(key=lambda v: (v.count("<"), len(v)), reverse=True)
+    valid_line2 = [line for line in candidates if all(_mrz_check_digits(line).values())]
+    name_lines = [line for line in candidates if line.startswith("P") and line not in valid_line2]
+    if valid_line2 and name_lines:
+        return [name_lines[0], _repair_mrz_line2(valid_line2[0])]
     return candidates[:2]
 
 
+def _repair_mrz_line2(line2):
+    # Posições numéricas da linha 2 (TD3): troca letras que o OCR confunde com dígitos.
+    chars = list(line2[:44])
+    for start, end in ((9, 10), (13, 20), (21, 28), (43, 44)):
+        for index in range(start, min(end, len(chars))):
+            chars[index] = chars[index].translate(_MRZ_DIGIT_FIXES)
+    return "".join(chars) + line2[44:]
+
+
+def _mrz_check_digit(value):
+    total = 0
+    for index, char in enumerate(value):
+        if char.isdigit():
+            number = int(char)
+        elif "A" <= char <= "Z":
+            number = ord(char) - 55
+        else:
+            number = 0
+        total += number * _MRZ_CHECK_WEIGHTS[index % 3]
+    return str(total % 10)
+
+
+def _mrz_check_digits(line2):
+    """Dígitos verificadores ICAO 9303 da linha 2 de um passaporte (TD3)."""
+    line2 = _repair_mrz_line2(line2)
+    if len(line2) < 44:
+        return {"passport_number": False, "birth_date": False, "expiry_date": False, "composite": False}
+    personal_check = line2[42]
+    return {
+        "passport_number": _mrz_check_digit(line2[0:9]) == line2[9],
+        "birth_date": _mrz_check_digit(line2[13:19]) == line2[19],
+        "expiry_date": _mrz_check_digit(line2[21:27]) == line2[27],
+        "personal_number": _mrz_check_digit(line2[28:42]) == personal_check
+        or (personal_check == "<" and set(line2[28:42]) == {"<"}),
+        "composite": _mrz_check_digit(line2[0:10] + line2[13:20] + line2[21:43]) == line2[43],
+    }
+
+
+def _is_valid_mrz(mrz_lines):
+    return len(mrz_lines) >= 2 and mrz_lines[0].startswith("P") and all(_mrz_check_digits(mrz_lines[1]).values())
+
+
 def _normalize_mrz_text(text):
     normalized = text.upper().replace(" ", "").replace("«", "<")
     return re.sub(r"[^A-Z0-9<]", "", normalized)
@@ -224,7 +756,7 @@ def _build_fields(lines_by_source, mrz_lines):
 def _fields_from_mrz(mrz_lines):
     if len(mrz_lines) < 2:
         return {}
-    line1, line2 = mrz_lines[0], mrz_lines[1]
+    line1, line2 = mrz_lines[0], _repair_mrz_line2(mrz_lines[1])
     if len(line1) < 30 or len(line2) < 30:
         return {}
     surname, given_names = _split_mrz_name(line1[5:44])
@@ -331,13 +863,15 @@ def _pick_consensus(candidates, min_votes):
     return ""
 
 
-def _build_warnings(fields, mrz_lines, lines_by_source):
+def _build_warnings(fields, mrz_lines, lines_by_source, early_exit=False):
     warnings = []
     if len(mrz_lines) < 2:
         warnings.append("MRZ não identificada com confiança alta.")
-    if len(lines_by_source) < 2:
+    elif not _is_valid_mrz(mrz_lines):
+        warnings.append("Dígitos verificadores da MRZ não conferem; revise número do passaporte e datas.")
+    if not early_exit and len(lines_by_source) < 2:
         warnings.append("Apenas um motor de análise disponível neste ambiente.")
-    if "pytesseract" not in lines_by_source:
+    if not early_exit and "pytesseract" not in lines_by_source:
         warnings.append("Tesseract OCR indisponível localmente; extração baseada em motores alternativos.")
     if not fields:
         warnings.append("Nenhum campo confiável foi extraído do documento.")
@@ -0,0 +1,134 @@
+import copy
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from datetime import timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from system.models import PassportOcrCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_MEMORY_CACHE: OrderedDict = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
+_STATS: Counter = Counter()
+
+
+def passport_document_digest(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def get_cached_extraction(digest: str, pipeline_version: str) -> dict | None:
+    if not settings.PASSPORT_OCR_CACHE_ENABLED:
+        return None
+    key = (digest, pipeline_version)
+    with _MEMORY_LOCK:
+        cached = _MEMORY_CACHE.get(key)
+        if cached and cached[0] > monotonic():
+            _MEMORY_CACHE.move_to_end(key)
+            _STATS["memory_hits"] += 1
+            return _as_extraction(cached[1], "memory")
+        if cached:
+            del _MEMORY_CACHE[key]
+
+    entry = (
+        PassportOcrCacheEntry.objects.filter(
+            digest=digest,
+            pipeline_version=pipeline_version,
+            created_at__gte=_expiry_cutoff(),
+        )
+        .only("fields", "warnings", "pipeline", "created_at")
+        .first()
+    )
+    if entry is None:
+        with _MEMORY_LOCK:
+            _STATS["misses"] += 1
+        return None
+
+    PassportOcrCacheEntry.objects.filter(pk=entry.pk).update(hit_count=F("hit_count") + 1, last_used_at=timezone.now())
+    payload = {"fields": entry.fields, "warnings": entry.warnings, "pipeline": entry.pipeline}
+    remaining = settings.PASSPORT_OCR_CACHE_TTL_SECONDS - (timezone.now() - entry.created_at).total_seconds()
+    with _MEMORY_LOCK:
+        _STATS["database_hits"] += 1
+        _remember(key, payload, remaining)
+    return _as_extraction(payload, "database")
+
+
+def store_extraction(digest: str, pipeline_version: str, extraction: dict) -> None:
+    if not settings.PASSPORT_OCR_CACHE_ENABLED:
+        return
+    pipeline = extraction.get("pipeline", {})
+    payload = {
+        "fields": copy.deepcopy(extraction.get("fields", {})),
+        "warnings": list(extraction.get("warnings", [])),
+        "pipeline": {"stage": pipeline.get("stage"), "mrz_valid": bool(pipeline.get("mrz_valid"))},
+    }
+    PassportOcrCacheEntry.objects.update_or_create(
+        digest=digest,
+        pipeline_version=pipeline_version,
+        defaults={**payload, "hit_count": 0, "created_at": timezone.now(), "last_used_at": timezone.now()},
+    )
+    with _MEMORY_LOCK:
+        _STATS["stores"] += 1
+        _remember((digest, pipeline_version), payload, settings.PASSPORT_OCR_CACHE_TTL_SECONDS)
+    _evict_persistent_entries()
+
+
+def passport_ocr_cache_stats() -> dict[str, int]:
+    with _MEMORY_LOCK:
+        stats = {name: _STATS[name] for name in ("memory_hits", "database_hits", "misses", "stores", "evictions")}
+        stats["memory_entries"] = len(_MEMORY_CACHE)
+    stats["database_entries"] = PassportOcrCacheEntry.objects.count()
+    return stats
+
+
+def clear_passport_ocr_cache(*, persistent: bool = False) -> None:
+    with _MEMORY_LOCK:
+        _MEMORY_CACHE.clear()
+        _STATS.clear()
+    if persistent:
+        PassportOcrCacheEntry.objects.all().delete()
+
+
+def _as_extraction(payload: dict, tier: str) -> dict:
+    payload = copy.deepcopy(payload)
+    return {
+        "fields": payload["fields"],
+        "warnings": payload["warnings"],
+        "raw_lines": [],
+        "pipeline": {**payload["pipeline"], "timings": {}, "cache": tier},
+    }
+
+
+def _remember(key, payload, ttl_seconds) -> None:
+    # Chamado com _MEMORY_LOCK adquirido.
+    max_entries = settings.PASSPORT_OCR_CACHE_MEMORY_ENTRIES
+    if max_entries <= 0 or ttl_seconds <= 0:
+        return
+    _MEMORY_CACHE[key] = (monotonic() + ttl_seconds, payload)
+    _MEMORY_CACHE.move_to_end(key)
+    while len(_MEMORY_CACHE) > max_entries:
+        _MEMORY_CACHE.popitem(last=False)
+
+
+def _expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.PASSPORT_OCR_CACHE_TTL_SECONDS)
+
+
+def _evict_persistent_entries() -> None:
+    evicted, _ = PassportOcrCacheEntry.objects.filter(created_at__lt=_expiry_cutoff()).delete()
+    overflow = PassportOcrCacheEntry.objects.order_by("-last_used_at", "-pk").values_list("pk", flat=True)[
+        settings.PASSPORT_OCR_CACHE_MAX_ENTRIES :
+    ]
+    overflow_pks = list(overflow)
+    if overflow_pks:
+        evicted += PassportOcrCacheEntry.objects.filter(pk__in=overflow_pks).delete()[0]
+    if evicted:
+        logger.info("Cache de OCR de passaporte: %s entrada(s) removida(s).", evicted)
+        with _MEMORY_LOCK:
+            _STATS["evictions"] += evicted
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+
+logger = logging.getLogger(__name__)
+
+# Quadro: tamanho do cabeçalho JSON e do payload (big-endian), seguidos dos dois.
+_FRAME = struct.Struct(">II")
+_MAX_HEADER_BYTES = 1024 * 1024
+_MAX_PAYLOAD_BYTES = 32 * 1024 * 1024
+
+
+class PassportOcrDaemonUnavailable(Exception):
+    pass
+
+
+def request_daemon_extraction(socket_path: str, filename: str, file_bytes: bytes, timeout: float) -> dict:
+    # Daemon parado ou com falha interna vira PassportOcrDaemonUnavailable: quem chama faz o OCR local.
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            _send_message(client, {"filename": filename}, file_bytes)
+            response, _ = _recv_message(client)
+    except (OSError, ValueError) as exc:
+        raise PassportOcrDaemonUnavailable(str(exc)) from exc
+    if "extraction" not in response and "error" not in response:
+        raise PassportOcrDaemonUnavailable(response.get("failure") or "Resposta inválida do daemon de OCR.")
+    return response
+
+
+class PassportOcrDaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, extract, extraction_error=Exception):
+        self.extract = extract
+        self.extraction_error = extraction_error
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _PassportOcrRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class _PassportOcrRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header, payload = _recv_message(self.request)
+        except (OSError, ValueError) as exc:
+            logger.warning("Daemon OCR: requisição inválida (%s).", exc)
+            return
+        try:
+            response = {"extraction": self.server.extract(str(header.get("filename") or ""), payload)}
+        except self.server.extraction_error as exc:
+            response = {"error": str(exc)}
+        except Exception:
+            logger.exception("Daemon OCR: falha inesperada ao extrair passaporte.")
+            response = {"failure": "Falha interna no daemon de OCR."}
+        try:
+            _send_message(self.request, response)
+        except OSError as exc:
+            logger.warning("Daemon OCR: cliente desconectou antes da resposta (%s).", exc)
+
+
+def _send_message(sock, header: dict, payload: bytes = b"") -> None:
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_FRAME.pack(len(encoded), len(payload)) + encoded)
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv_message(sock) -> tuple[dict, bytes]:
+    header_size, payload_size = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    if header_size > _MAX_HEADER_BYTES or payload_size > _MAX_PAYLOAD_BYTES:
+        raise ValueError("Mensagem maior que o limite do daemon de OCR.")
+    header = json.loads(_recv_exact(sock, header_size).decode("utf-8"))
+    return header, _recv_exact(sock, payload_size)
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise ValueError("Conexão encerrada no meio da mensagem.")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise OSError(f"Já existe um daemon de OCR ouvindo em {socket_path}.")
@@ -0,0 +1,189 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from system.models import PassportOcrJob, PassportOcrJobStatus
+from system.services.passport_ocr import PassportExtractionError, extract_passport_data_from_document
+
+logger = logging.getLogger(__name__)
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+_PURGE_LOCK = threading.Lock()
+_PURGE_INTERVAL_SECONDS = 3600
+_last_purge = None
+
+
+def create_passport_ocr_job(document, user, *, target: str = "client", persist_in_session: bool = False) -> PassportOcrJob:
+    job = PassportOcrJob.objects.create(
+        created_by=user,
+        filename=document.name,
+        document=document.read(),
+        target=target,
+        persist_in_session=persist_in_session,
+    )
+    transaction.on_commit(lambda: _enqueue(job.pk))
+    return job
+
+
+def get_passport_ocr_job(job_id, user) -> PassportOcrJob | None:
+    job = PassportOcrJob.objects.filter(job_id=job_id, created_by=user).first()
+    if job and not job.is_finished and _looks_stale(job):
+        if _requeue_stale_jobs(job.pk):
+            transaction.on_commit(lambda: _enqueue(job.pk))
+        job.refresh_from_db()
+    return job
+
+
+def run_passport_ocr_job(job_pk: int) -> None:
+    claimed = PassportOcrJob.objects.filter(pk=job_pk, status=PassportOcrJobStatus.PENDING).update(
+        status=PassportOcrJobStatus.RUNNING,
+        started_at=timezone.now(),
+        attempts=F("attempts") + 1,
+    )
+    if not claimed:
+        return
+
+    job = PassportOcrJob.objects.get(pk=job_pk)
+    document = ContentFile(bytes(job.document or b""), name=job.filename)
+    try:
+        extraction = extract_passport_data_from_document(document)
+    except PassportExtractionError as exc:
+        _finish_job(job, PassportOcrJobStatus.FAILED, error=str(exc))
+    except Exception:
+        logger.exception("Falha inesperada ao extrair OCR de passaporte (job %s).", job.job_id)
+        _finish_job(job, PassportOcrJobStatus.FAILED, error="Falha interna ao processar o documento.")
+    else:
+        pipeline = extraction.get("pipeline", {})
+        logger.info(
+            "OCR passaporte job %s estagio=%s cache=%s",
+            job.job_id,
+            pipeline.get("stage") or "-",
+            pipeline.get("cache") or "-",
+        )
+        _finish_job(
+            job,
+            PassportOcrJobStatus.DONE,
+            fields=extraction.get("fields", {}),
+            warnings=extraction.get("warnings", []),
+        )
+
+
+def _finish_job(job, status, *, fields=None, warnings=None, error=""):
+    # O documento só é necessário até a extração; não mantemos a imagem do passaporte.
+    job.status = status
+    job.fields = fields or {}
+    job.warnings = warnings or []
+    job.error = error
+    job.document = None
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "fields", "warnings", "error", "document", "finished_at"])
+
+
+def purge_finished_passport_ocr_jobs() -> int:
+    retention = settings.PASSPORT_OCR_JOB_RETENTION_SECONDS
+    if retention <= 0:
+        return 0
+    cutoff = timezone.now() - timedelta(seconds=retention)
+    deleted, _ = PassportOcrJob.objects.filter(
+        status__in=[PassportOcrJobStatus.DONE, PassportOcrJobStatus.FAILED],
+        finished_at__lt=cutoff,
+    ).delete()
+    if deleted:
+        logger.info("Jobs de OCR de passaporte: %s job(s) finalizado(s) removido(s).", deleted)
+    return deleted
+
+
+def _looks_stale(job) -> bool:
+    # Evita a varredura no banco a cada consulta de status enquanto o job anda normalmente.
+    cutoff = timezone.now() - timedelta(seconds=settings.PASSPORT_OCR_JOB_STALE_SECONDS)
+    if job.status == PassportOcrJobStatus.RUNNING:
+        return bool(job.started_at) and job.started_at < cutoff
+    return job.queued_at < cutoff
+
+
+def _requeue_stale_jobs(job_pk: int | None = None) -> list[int]:
+    # RUNNING parado há mais que o limite: o worker caiu (reinício, OOM). PENDING parado: o envio ao pool se perdeu.
+    # O queued_at é renovado a cada reenvio, então o mesmo job só volta a ser pego depois de outro intervalo.
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.PASSPORT_OCR_JOB_STALE_SECONDS)
+    stale = Q(status=PassportOcrJobStatus.RUNNING, started_at__lt=cutoff) | Q(
+        status=PassportOcrJobStatus.PENDING,
+        queued_at__lt=cutoff,
+    )
+    queryset = PassportOcrJob.objects.filter(stale)
+    if job_pk is not None:
+        queryset = queryset.filter(pk=job_pk)
+
+    # Um documento que derruba o worker a cada tentativa não volta para a fila indefinidamente.
+    exhausted = queryset.filter(
+        status=PassportOcrJobStatus.RUNNING,
+        attempts__gte=settings.PASSPORT_OCR_JOB_MAX_ATTEMPTS,
+    ).update(
+        status=PassportOcrJobStatus.FAILED,
+        error="O processamento do documento foi interrompido repetidas vezes.",
+        document=None,
+        finished_at=now,
+    )
+    if exhausted:
+        logger.warning("Jobs de OCR de passaporte: %s job(s) falharam após esgotar as tentativas.", exhausted)
+
+    job_pks = list(queryset.values_list("pk", flat=True))
+    if job_pks:
+        PassportOcrJob.objects.filter(stale, pk__in=job_pks).update(
+            status=PassportOcrJobStatus.PENDING,
+            started_at=None,
+            queued_at=now,
+        )
+    return job_pks
+
+
+def _run_in_worker(job_pk: int) -> None:
+    try:
+        run_passport_ocr_job(job_pk)
+        _purge_if_due()
+    finally:
+        connections.close_all()
+
+
+def _purge_if_due() -> None:
+    # A limpeza roda na própria thread do pool, no máximo uma vez por intervalo em cada processo.
+    global _last_purge
+    with _PURGE_LOCK:
+        if _last_purge is not None and monotonic() - _last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = monotonic()
+    try:
+        purge_finished_passport_ocr_jobs()
+    except Exception:
+        logger.exception("Falha ao limpar os jobs de OCR de passaporte.")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(1, settings.PASSPORT_OCR_JOB_WORKERS),
+                thread_name_prefix="passport-ocr",
+            )
+            # Jobs pendentes de um processo anterior (reinício/deploy) voltam para a fila.
+            pending = set(_requeue_stale_jobs())
+            pending.update(
+                PassportOcrJob.objects.filter(status=PassportOcrJobStatus.PENDING).values_list("pk", flat=True)
+            )
+            for job_pk in sorted(pending):
+                _EXECUTOR.submit(_run_in_worker, job_pk)
+        return _EXECUTOR
+
+
+def _enqueue(job_pk: int) -> None:
+    _get_executor().submit(_run_in_worker, job_pk)
@@ -0,0 +1,152 @@
+import random
+from datetime import date, timedelta
+from io import BytesIO
+
+from system.services.legacy_synthetic import SYNTHETIC_FIRST_NAMES, SYNTHETIC_LAST_NAMES
+
+SYNTHETIC_PASSPORT_VARIANTS = ("clean", "noise", "rotation", "blur", "jpeg", "pdf_scan", "pdf_text")
+SYNTHETIC_PASSPORT_FIELDS = (
+    "first_name",
+    "last_name",
+    "passport_number",
+    "passport_issuing_country",
+    "nationality",
+    "birth_date",
+    "passport_expiry_date",
+)
+_PAGE_SIZE = (1600, 1100)
+_MRZ_WEIGHTS = (7, 3, 1)
+_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def mrz_check_digit(value: str) -> int:
+    # Implementação independente do parser (ICAO 9303), para que o gabarito não herde os bugs dele.
+    total = 0
+    for index, char in enumerate(value):
+        if char.isdigit():
+            number = int(char)
+        elif char.isalpha():
+            number = ord(char.upper()) - 55
+        else:
+            number = 0
+        total += number * _MRZ_WEIGHTS[index % 3]
+    return total % 10
+
+
+def build_mrz_lines(surname, given_names, number, birth, expiry, sex="M", country="BRA") -> list[str]:
+    # Passaporte TD3: duas linhas de 44 caracteres; datas no formato AAMMDD.
+    line1 = f"P<{country}{surname.upper()}<<{given_names.upper().replace(' ', '<')}".ljust(44, "<")[:44]
+    personal = "<" * 14
+    line2 = (
+        f"{number.ljust(9, '<')}{mrz_check_digit(number.ljust(9, '<'))}{country}"
+        f"{birth}{mrz_check_digit(birth)}{sex}{expiry}{mrz_check_digit(expiry)}"
+        f"{personal}{mrz_check_digit(personal)}"
+    )
+    composite = line2[0:10] + line2[13:20] + line2[21:43]
+    return [line1, f"{line2}{mrz_check_digit(composite)}"]
+
+
+def render_passport_page(mrz_lines, labels=(), size=_PAGE_SIZE):
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = size
+    page = Image.new("RGB", (width, height), (235, 230, 220))
+    draw = ImageDraw.Draw(page)
+    draw.rectangle((60, 150, 460, 650), fill=(150, 150, 160))
+    label_font = ImageFont.load_default(size=28)
+    for index, text in enumerate(labels):
+        draw.text((520, 120 + index * 70), text, fill=(30, 30, 30), font=label_font)
+    mrz_font = ImageFont.load_default(size=34)
+    for index, line in enumerate(mrz_lines):
+        draw.text((60, height - 220 + index * 60), line, fill=(10, 10, 10), font=mrz_font)
+    return page
+
+
+def build_text_layer_pdf(lines) -> bytes:
+    # PDF mínimo com camada de texto (Courier), como os gerados digitalmente pelos consulados.
+    content = "BT /F1 10 Tf 40 80 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 420 300] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>",
+    ]
+    output = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n"
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n"
+    return output.encode("latin-1")
+
+
+def generate_synthetic_passports(count: int, *, seed: int = 42, variants=SYNTHETIC_PASSPORT_VARIANTS):
+    # Determinístico pela semente; as variantes se alternam para cobrir todas mesmo com poucas amostras.
+    rng = random.Random(seed)
+    today = date.today()
+    for index in range(count):
+        variant = variants[index % len(variants)]
+        given_names = " ".join(rng.sample(SYNTHETIC_FIRST_NAMES, rng.choice((1, 2))))
+        surname = rng.choice(SYNTHETIC_LAST_NAMES)
+        number = "".join(rng.choices(_LETTERS, k=2)) + "".join(rng.choices("0123456789", k=7))
+        birth = today - timedelta(days=rng.randint(6 * 365, 70 * 365))
+        expiry = today + timedelta(days=rng.randint(30, 10 * 365))
+        mrz_lines = build_mrz_lines(
+            surname,
+            given_names,
+            number,
+            birth.strftime("%y%m%d"),
+            expiry.strftime("%y%m%d"),
+            sex=rng.choice("MF"),
+        )
+        labels = ("REPUBLICA FEDERATIVA DO BRASIL", "PASSAPORTE / PASSPORT", surname.upper(), given_names.upper())
+        filename, content = _render_variant(variant, mrz_lines, labels, rng)
+        yield {
+            "id": f"{index:04d}-{variant}",
+            "variant": variant,
+            "filename": filename,
+            "content": content,
+            "truth": {
+                "first_name": given_names,
+                "last_name": surname,
+                "passport_number": number,
+                "passport_issuing_country": "BRA",
+                "nationality": "BRA",
+                "birth_date": birth.isoformat(),
+                "passport_expiry_date": expiry.isoformat(),
+            },
+        }
+
+
+def _render_variant(variant, mrz_lines, labels, rng):
+    from PIL import Image, ImageFilter
+
+    if variant == "pdf_text":
+        return "passport.pdf", build_text_layer_pdf(mrz_lines)
+
+    page = render_passport_page(mrz_lines, labels)
+    quality = 90
+    if variant == "noise":
+        import numpy as np
+
+        pixels = np.asarray(page, dtype=np.int16)
+        noise = np.random.default_rng(rng.randrange(2**32)).normal(0, 14, pixels.shape)
+        page = Image.fromarray(np.clip(pixels + noise, 0, 255).astype("uint8"))
+    elif variant == "rotation":
+        angle = rng.uniform(1.0, 3.5) * rng.choice((-1, 1))
+        page = page.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=(235, 230, 220))
+    elif variant == "blur":
+        page = page.filter(ImageFilter.GaussianBlur(rng.uniform(1.0, 1.8)))
+    elif variant == "jpeg":
+        quality = rng.randint(20, 35)
+
+    output = BytesIO()
+    if variant == "pdf_scan":
+        page.save(output, format="PDF", resolution=150)
+        return "passport.pdf", output.getvalue()
+    page.save(output, format="JPEG", quality=quality)
+    return "passport.jpg", output.getvalue()
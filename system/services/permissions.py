@@ -0,0 +1,155 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from system.models import ConsultancyUser, Profile
+
+# Atributo de memoização no objeto User, no mesmo espírito do _perm_cache do ModelBackend.
+_CONSULTANT_CACHE_ATTR = "_consultant_cache"
+_MATRIX_CACHE_PREFIX = "permissions:profile:"
+_EMPTY_MATRIX = {
+    "is_admin": False,
+    "can_create": False,
+    "can_view": False,
+    "can_update": False,
+    "can_delete": False,
+    "modules": frozenset(),
+    "module_slugs": frozenset(),
+}
+
+
+def get_profile_permissions(profile: Profile | None) -> dict:
+    # Matriz compilada do perfil (flags CRUD, is_admin e módulos), guardada no cache do Django.
+    # A chave leva o updated_at do perfil, que vem do banco a cada requisição (select_related do
+    # consultor): qualquer alteração muda a chave em todos os workers, mesmo com cache por processo.
+    if profile is None:
+        return _EMPTY_MATRIX
+    version = profile.updated_at.timestamp() if profile.updated_at else 0
+    key = f"{_MATRIX_CACHE_PREFIX}{profile.pk}:{version}"
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = _compile_profile_permissions(profile)
+        cache.set(key, matrix, settings.PERMISSION_MATRIX_TTL_SECONDS)
+    return matrix
+
+
+def invalidate_profile_permissions(profile_ids) -> None:
+    # Avança o updated_at no banco em vez de apagar a chave local, que só valeria para este worker.
+    profile_ids = [profile_id for profile_id in profile_ids if profile_id]
+    if profile_ids:
+        Profile.objects.filter(pk__in=profile_ids).update(updated_at=timezone.now())
+
+
+def _compile_profile_permissions(profile: Profile) -> dict:
+    # O perfil já vem do select_related do consultor; só os módulos custam uma consulta.
+    modules = list(profile.modules.values_list("name", "slug"))
+    return {
+        "is_admin": (profile.name or "").strip().lower() == "administrador"
+        or (profile.can_create and profile.can_view and profile.can_update and profile.can_delete),
+        "can_create": profile.can_create,
+        "can_view": profile.can_view,
+        "can_update": profile.can_update,
+        "can_delete": profile.can_delete,
+        "modules": frozenset(name for name, _ in modules),
+        "module_slugs": frozenset(slug for _, slug in modules),
+    }
+
+
+def get_user_consultant(user) -> ConsultancyUser | None:
+    # Uma consulta, memoizada no próprio User: o request.user vive uma requisição, então
+    # list_clients, os helpers e as views compartilham o mesmo resultado.
+    if not user or not user.username:
+        return None
+    if hasattr(user, _CONSULTANT_CACHE_ATTR):
+        return getattr(user, _CONSULTANT_CACHE_ATTR)
+
+    username = user.username.strip().lower()
+    email = (user.email or "").strip().lower()
+    lookup = Q(email__iexact=username)
+    if email:
+        lookup |= Q(email__iexact=email)
+    candidates = ConsultancyUser.objects.select_related("profile").filter(lookup, is_active=True)[:2]
+    # O e-mail igual ao username tem precedência, como na busca original em duas etapas.
+    consultant = min(candidates, key=lambda candidate: candidate.email.lower() != username, default=None)
+
+    setattr(user, _CONSULTANT_CACHE_ATTR, consultant)
+    return consultant
+
+
+def user_can_manage_all(user, consultant: ConsultancyUser | None) -> bool:
+    if user.is_superuser or user.is_staff:
+        return True
+    # Perfil "Administrador" ou com CRUD completo: regra compilada na matriz do perfil.
+    return bool(consultant) and get_profile_permissions(consultant.profile)["is_admin"]
+
+
+def user_has_module_access(user, consultant: ConsultancyUser | None, module_name: str) -> bool:
+    if user_can_manage_all(user, consultant):
+        return True
+    if not consultant:
+        return False
+    return module_name in get_profile_permissions(consultant.profile)["modules"]
+
+
+class RequestPermissions:
+    # Permissões do usuário logado, resolvidas sob demanda e uma única vez por requisição.
+    # O VisaryRequestMiddleware anexa uma instância em request.permissions.
+
+    def __init__(self, request):
+        self._request = request
+
+    @cached_property
+    def user(self):
+        return getattr(self._request, "user", None)
+
+    @cached_property
+    def consultant(self) -> ConsultancyUser | None:
+        if self.user is None or not self.user.is_authenticated:
+            return None
+        return get_user_consultant(self.user)
+
+    @cached_property
+    def profile(self):
+        return self.consultant.profile if self.consultant else None
+
+    @cached_property
+    def matrix(self) -> dict:
+        return get_profile_permissions(self.profile)
+
+    @cached_property
+    def can_manage_all(self) -> bool:
+        if self.user is None:
+            return False
+        return bool(self.user.is_superuser or self.user.is_staff or self.matrix["is_admin"])
+
+    @property
+    def can_create(self) -> bool:
+        return self.can_manage_all or self.matrix["can_create"]
+
+    @property
+    def can_view(self) -> bool:
+        return self.can_manage_all or self.matrix["can_view"]
+
+    @property
+    def can_update(self) -> bool:
+        return self.can_manage_all or self.matrix["can_update"]
+
+    @property
+    def can_delete(self) -> bool:
+        return self.can_manage_all or self.matrix["can_delete"]
+
+    @property
+    def module_names(self) -> frozenset:
+        return self.matrix["modules"]
+
+    @property
+    def module_slugs(self) -> frozenset:
+        return self.matrix["module_slugs"]
+
+    def has_module(self, module: str) -> bool:
+        # Aceita o nome ("Parceiros") ou o slug ("parceiros") do módulo.
+        if self.can_manage_all:
+            return True
+        return module in self.module_names or module in self.module_slugs
@@ -0,0 +1,83 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+class PhaseProfiler:
+    COLUMNS = (
+        ("phase", "Fase"),
+        ("wall_seconds", "Tempo (s)"),
+        ("rows_in", "Linhas lidas"),
+        ("rows_written", "Linhas gravadas"),
+        ("sql_statements", "SQL"),
+        ("peak_rss_mb", "RSS pico (MB)"),
+        ("rows_per_second", "Linhas/s"),
+    )
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.records = []
+
+    @contextmanager
+    def phase(self, name: str, rows_in: int = 0):
+        record = {"phase": name, "rows_in": rows_in, "rows_written": 0}
+        if not self.enabled:
+            yield record
+            return
+
+        statements = [0]
+
+        def count_statements(execute, sql, params, many, context):
+            statements[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_statements):
+                yield record
+        finally:
+            elapsed = time.perf_counter() - started
+            record["wall_seconds"] = round(elapsed, 3)
+            record["sql_statements"] = statements[0]
+            record["peak_rss_mb"] = peak_rss_mb()
+            record["rows_per_second"] = round(record["rows_in"] / elapsed, 1) if elapsed > 0 else None
+            self.records.append(record)
+
+    def render_table(self) -> list[str]:
+        header = [label for _, label in self.COLUMNS]
+        rows = [
+            ["" if record.get(key) is None else str(record.get(key)) for key, _ in self.COLUMNS]
+            for record in self.records
+        ]
+        widths = [max(len(line[index]) for line in [header, *rows]) for index in range(len(header))]
+
+        def format_line(values):
+            return " | ".join(
+                value.ljust(width) if index == 0 else value.rjust(width)
+                for index, (value, width) in enumerate(zip(values, widths))
+            )
+
+        separator = "-+-".join("-" * width for width in widths)
+        return [format_line(header), separator, *(format_line(row) for row in rows)]
+
+    def write_json(self, path, **extra) -> None:
+        payload = {**extra, "phases": self.records}
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2, default=str)
@@ -1,17 +1,23 @@
 import logging
 
 from django.db import models, transaction
-from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from system.models import (
+    ConsultancyClient,
     FinancialRecord,
     FinancialStatus,
+    LegacyRecordLink,
+    Module,
+    Process,
     ProcessStatus,
+    Profile,
     Trip,
     TripClient,
     TripProcessStatus,
 )
+from system.services.permissions import invalidate_profile_permissions
 
 logger = logging.getLogger("visary.financial")
 
@@ -125,3 +131,31 @@ def sync_trip_statuses_on_status_change(sender, instance, **kwargs):
         trips = trips.filter(visa_type=instance.visa_type)
     for trip in trips:
         _sync_trip_statuses(trip)
+
+
+@receiver(post_save, sender=Module)
+@receiver(pre_delete, sender=Module)
+def invalidate_permissions_on_module_change(sender, instance, **kwargs):
+    if kwargs.get("created"):
+        return
+    # Na exclusão, roda antes de os vínculos com os perfis serem apagados.
+    invalidate_profile_permissions(instance.profiles.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=Profile.modules.through)
+def invalidate_permissions_on_modules_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            invalidate_profile_permissions([instance.pk])
+    elif action == "pre_clear":
+        invalidate_profile_permissions(instance.profiles.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        invalidate_profile_permissions(pk_set)
+
+
+@receiver(post_delete, sender=ConsultancyClient)
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Process)
+@receiver(post_delete, sender=FinancialRecord)
+def delete_legacy_record_links(sender, instance, **kwargs):
+    LegacyRecordLink.objects.filter(model=sender._meta.label_lower, object_id=instance.pk).delete()
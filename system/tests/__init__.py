@@ -1 +1,2 @@
-pass                       
+# Cache em memória para os testes que usam o cache: nunca lê nem apaga o cache em arquivo dos workers.
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "visary-tests"}}
@@ -0,0 +1,152 @@
+import json
+import tempfile
+import threading
+import time
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from system.models import ConsultancyClient, ConsultancyUser, LocalZipCode, Profile
+from system.services.address_backfill import RateLimiter, backfill_client_addresses
+
+User = get_user_model()
+
+PAULISTA = {
+    "cep": "01310100",
+    "street": "Avenida Paulista",
+    "district": "Bela Vista",
+    "city": "São Paulo",
+    "uf": "SP",
+    "complement": "",
+}
+
+
+@override_settings(CEP_CACHE_PURGE_INTERVAL_SECONDS=0)
+class BackfillAddressesTests(TestCase):
+    def setUp(self):
+        advisor = ConsultancyUser.objects.create(
+            name="Assessor",
+            email="assessor.cep@test.com",
+            profile=Profile.objects.create(name="Assessor"),
+            password="!",
+        )
+        self.defaults = {
+            "assigned_advisor": advisor,
+            "nationality": "Brasileira",
+            "phone": "(11) 99999-9999",
+            "password": "!",
+            "created_by": User.objects.create_user(username="cep", password="senha-segura-123"),
+        }
+        self.sequence = 0
+
+    def _client(self, zip_code, **fields):
+        self.sequence += 1
+        return ConsultancyClient.objects.create(
+            first_name=f"Cliente {self.sequence}",
+            last_name="Importado",
+            cpf=f"000.000.000-{self.sequence:02d}",
+            birth_date=date(1990, 1, 1),
+            zip_code=zip_code,
+            **fields,
+            **self.defaults,
+        )
+
+    def test_cada_cep_e_consultado_uma_vez(self):
+        first = self._client("01310-100")
+        second = self._client("01310100", street="Rua Preenchida")
+        calls = []
+
+        def fetch(cep):
+            calls.append(cep)
+            return dict(PAULISTA)
+
+        with patch("system.services.address_backfill.fetch_address_by_zip", side_effect=fetch):
+            report = backfill_client_addresses(workers=2, rate=0)
+
+        self.assertEqual(calls, ["01310100"])
+        self.assertEqual(report["clients_updated"], 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.street, first.city, first.state), ("Avenida Paulista", "São Paulo", "SP"))
+        self.assertEqual(second.street, "Rua Preenchida")
+        self.assertEqual(second.district, "Bela Vista")
+
+    def test_base_local_dispensa_consulta_online(self):
+        LocalZipCode.objects.create(cep_start=78000000, cep_end=78109999, city="Cuiabá", uf="MT")
+        client = self._client("78050-000")
+        previous_updated_at = client.updated_at
+
+        with patch("system.services.address_backfill.fetch_address_by_zip") as fetch:
+            report = backfill_client_addresses(rate=0)
+
+        fetch.assert_not_called()
+        self.assertEqual(report["resolved_locally"], 1)
+        client.refresh_from_db()
+        self.assertEqual((client.city, client.state, client.street), ("Cuiabá", "MT", ""))
+        self.assertGreater(client.updated_at, previous_updated_at)
+
+    def test_falhas_e_ceps_invalidos_entram_no_relatorio(self):
+        self._client("99999-999")
+        self._client("123")
+
+        with patch(
+            "system.services.address_backfill.fetch_address_by_zip",
+            side_effect=ValueError("CEP não encontrado."),
+        ):
+            report = backfill_client_addresses(rate=0)
+
+        self.assertEqual(report["invalid_zip_codes"], 1)
+        self.assertEqual(report["failures"], {"99999999": "CEP não encontrado."})
+        self.assertEqual(report["clients_updated"], 0)
+
+    def test_comando_grava_em_lotes_e_relatorio_retomavel(self):
+        for index in range(3):
+            self._client(f"0131010{index}")
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        report_path = Path(work_dir.name) / "backfill.json"
+        output = StringIO()
+
+        with patch(
+            "system.services.address_backfill.fetch_address_by_zip",
+            side_effect=lambda cep: dict(PAULISTA, cep=cep),
+        ) as fetch:
+            call_command(
+                "backfill_addresses",
+                *("--batch-size", "1", "--rate", "0", "--limit", "2", "--report", str(report_path)),
+                stdout=output,
+            )
+            call_command("backfill_addresses", "--rate", "0", stdout=StringIO())
+
+        self.assertEqual(fetch.call_count, 3)
+        self.assertFalse(ConsultancyClient.objects.filter(city="").exists())
+        self.assertEqual(json.loads(report_path.read_text())["clients_updated"], 2)
+        self.assertIn("Clientes atualizados: 2.", output.getvalue())
+
+    def test_dry_run_nao_grava(self):
+        client = self._client("01310100")
+
+        with patch("system.services.address_backfill.fetch_address_by_zip", return_value=dict(PAULISTA)):
+            report = backfill_client_addresses(rate=0, dry_run=True)
+
+        client.refresh_from_db()
+        self.assertEqual(report["clients_updated"], 1)
+        self.assertEqual(client.city, "")
+
+
+class RateLimiterTests(SimpleTestCase):
+    def test_limita_liberacoes_por_segundo_entre_threads(self):
+        limiter = RateLimiter(20)
+        started = time.monotonic()
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
@@ -0,0 +1,439 @@
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from system.models import LocalZipCode, ZipCodeCache
+from system.services import cep, cep_dataset, cep_health
+from system.services.cep_cache import purge_expired_zip_codes
+from system.tests import TEST_CACHES
+
+SAO_PAULO = {
+    "cep": "01310100",
+    "street": "Avenida Paulista",
+    "district": "Bela Vista",
+    "city": "São Paulo",
+    "uf": "SP",
+    "complement": "",
+}
+
+
+@override_settings(CACHES=TEST_CACHES, CEP_CACHE_PURGE_INTERVAL_SECONDS=0)
+class ZipCodeCacheTests(TestCase):
+    def setUp(self):
+        # Ordem fixa das fontes: a saúde registrada por outros testes não interfere aqui.
+        ordering = patch.object(cep.cep_health, "order_sources", side_effect=list)
+        ordering.start()
+        self.addCleanup(ordering.stop)
+
+    def _sources(self, *fetchers):
+        return patch.object(cep, "SOURCES", [(f"fonte{index}", fetch) for index, fetch in enumerate(fetchers)])
+
+    def test_segunda_busca_nao_consulta_a_rede(self):
+        fetch = Mock(return_value=dict(SAO_PAULO))
+
+        with self._sources(fetch):
+            first = cep.fetch_address_by_zip("01310-100")
+            with self.assertNumQueries(1):
+                second = cep.fetch_address_by_zip("01310100")
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(ZipCodeCache.objects.get(cep="01310100").source, "fonte0")
+
+    def test_cep_inexistente_fica_em_cache_negativo(self):
+        fetch = Mock(side_effect=cep.ZipCodeNotFound("CEP não encontrado."))
+
+        with self._sources(fetch):
+            with self.assertRaisesMessage(ValueError, "não encontrado em nenhuma fonte"):
+                cep.fetch_address_by_zip("99999999")
+            with self.assertRaisesMessage(ValueError, "fonte0: CEP não encontrado."):
+                cep.fetch_address_by_zip("99999999")
+
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_falha_de_rede_nao_e_cacheada(self):
+        fetch = Mock(side_effect=ValueError("Timeout ao consultar ViaCEP."))
+
+        with self._sources(fetch):
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    cep.fetch_address_by_zip("01310100")
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertFalse(ZipCodeCache.objects.exists())
+
+    @override_settings(CEP_CACHE_NEGATIVE_TTL_SECONDS=60)
+    def test_cache_negativo_expira_antes_do_positivo(self):
+        old = timezone.now() - timedelta(minutes=5)
+        ZipCodeCache.objects.create(cep="99999999", error="CEP não encontrado.", fetched_at=old)
+        ZipCodeCache.objects.create(cep="01310100", address=SAO_PAULO, source="ViaCEP", fetched_at=old)
+        fetch = Mock(return_value=dict(SAO_PAULO, cep="99999999"))
+
+        with self._sources(fetch):
+            self.assertEqual(cep.fetch_address_by_zip("01310100")["city"], "São Paulo")
+            self.assertEqual(cep.fetch_address_by_zip("99999999")["city"], "São Paulo")
+
+        self.assertEqual(fetch.call_count, 1)
+
+    @override_settings(CEP_CACHE_TTL_SECONDS=3600, CEP_CACHE_NEGATIVE_TTL_SECONDS=60)
+    def test_limpeza_remove_entradas_expiradas(self):
+        now = timezone.now()
+        ZipCodeCache.objects.create(cep="11111111", address=SAO_PAULO, fetched_at=now - timedelta(hours=2))
+        ZipCodeCache.objects.create(cep="22222222", address=SAO_PAULO, fetched_at=now - timedelta(minutes=5))
+        ZipCodeCache.objects.create(cep="33333333", error="CEP não encontrado.", fetched_at=now - timedelta(minutes=5))
+
+        self.assertEqual(purge_expired_zip_codes(), 2)
+        self.assertEqual(list(ZipCodeCache.objects.values_list("cep", flat=True)), ["22222222"])
+
+
+def _slow(seconds, result=None, error=None):
+    def fetch(cep_value):
+        time.sleep(seconds)
+        if error:
+            raise error
+        return dict(result, cep=cep_value)
+
+    return fetch
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    CEP_CACHE_ENABLED=False,
+    CEP_LOOKUP_TIMEOUT_SECONDS=2,
+    CEP_PROVIDER_TIMEOUT_SECONDS=1,
+    CEP_LOOKUP_HEDGE_DELAY_SECONDS=0.05,
+)
+class ZipCodeHedgedLookupTests(TestCase):
+    def setUp(self):
+        ordering = patch.object(cep.cep_health, "order_sources", side_effect=list)
+        ordering.start()
+        self.addCleanup(ordering.stop)
+
+    def _sources(self, *fetchers):
+        return patch.object(cep, "SOURCES", [(f"fonte{index}", fetch) for index, fetch in enumerate(fetchers)])
+
+    def test_fonte_lenta_e_ultrapassada_pela_seguinte(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stuck(cep_value):
+            release.wait(1)
+            return dict(SAO_PAULO, city="Lenta")
+
+        with self._sources(stuck, _slow(0, SAO_PAULO)):
+            started = time.monotonic()
+            address = cep.fetch_address_by_zip("01310100")
+
+        self.assertEqual(address["city"], "São Paulo")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    @override_settings(CEP_LOOKUP_HEDGE_DELAY_SECONDS=5)
+    def test_falha_dispara_a_proxima_fonte_sem_esperar_o_atraso(self):
+        failing = _slow(0, error=ValueError("Erro ao consultar ViaCEP."))
+
+        with self._sources(failing, _slow(0, SAO_PAULO)):
+            started = time.monotonic()
+            address = cep.fetch_address_by_zip("01310100")
+
+        self.assertEqual(address["city"], "São Paulo")
+        self.assertLess(time.monotonic() - started, 1)
+
+    @override_settings(CEP_PROVIDER_TIMEOUT_SECONDS=0.1)
+    def test_prazo_por_fonte_gera_timeout(self):
+        with self._sources(_slow(0.5, SAO_PAULO), _slow(0, error=cep.ZipCodeNotFound("CEP não encontrado."))):
+            with self.assertRaisesMessage(
+                ValueError, "fonte0: Timeout ao consultar fonte0.; fonte1: CEP não encontrado."
+            ):
+                cep.fetch_address_by_zip("01310100")
+
+    @override_settings(CEP_CACHE_ENABLED=True, CEP_CACHE_PURGE_INTERVAL_SECONDS=0, CEP_PROVIDER_TIMEOUT_SECONDS=0.1)
+    def test_nao_encontrado_com_outra_fonte_em_timeout_nao_vai_para_o_cache_negativo(self):
+        not_found = _slow(0, error=cep.ZipCodeNotFound("CEP não encontrado."))
+
+        with self._sources(not_found, _slow(0.5, SAO_PAULO)):
+            with self.assertRaisesMessage(ValueError, "fonte1: Timeout ao consultar fonte1."):
+                cep.fetch_address_by_zip("01310100")
+
+        self.assertFalse(ZipCodeCache.objects.exists())
+
+    @override_settings(CEP_LOOKUP_TIMEOUT_SECONDS=0.2, CEP_LOOKUP_HEDGE_DELAY_SECONDS=0)
+    def test_prazo_total_encerra_a_busca(self):
+        with self._sources(_slow(0.6, SAO_PAULO), _slow(0.6, SAO_PAULO)):
+            started = time.monotonic()
+            with self.assertRaisesMessage(ValueError, "não encontrado em nenhuma fonte disponível"):
+                cep.fetch_address_by_zip("01310100")
+
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    @override_settings(CEP_PROVIDER_TIMEOUT_SECONDS=0.3)
+    def test_prazo_da_fonte_conta_do_inicio_da_tarefa(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        executor.submit(time.sleep, 0.2)
+
+        with patch.object(cep, "_get_lookup_executor", return_value=executor):
+            with self._sources(_slow(0.15, SAO_PAULO)):
+                address = cep.fetch_address_by_zip("01310100")
+
+        self.assertEqual(address["city"], "São Paulo")
+
+    @override_settings(CEP_PROVIDER_TIMEOUT_SECONDS=5)
+    def test_timeout_http_nao_passa_do_fim_da_busca(self):
+        timeouts = []
+
+        def fetch(cep_value):
+            timeouts.append(cep._request_timeout())
+            return dict(SAO_PAULO, cep=cep_value)
+
+        with self._sources(fetch):
+            cep.fetch_address_by_zip("01310100")
+
+        self.assertLessEqual(timeouts[0][1], 2)
+        self.assertEqual(cep._request_timeout()[1], 5)
+
+    @override_settings(CEP_LOOKUP_HEDGE_DELAY_SECONDS=0)
+    def test_modo_paralelo_mantem_a_ordem_das_fontes_na_mensagem(self):
+        with self._sources(
+            _slow(0.1, error=ValueError("Erro ao consultar ViaCEP.")),
+            _slow(0, error=ValueError("Erro ao consultar BrasilAPI.")),
+        ):
+            with self.assertRaisesMessage(
+                ValueError, "fonte0: Erro ao consultar ViaCEP.; fonte1: Erro ao consultar BrasilAPI."
+            ):
+                cep.fetch_address_by_zip("01310100")
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    CEP_CACHE_ENABLED=False,
+    CEP_LOOKUP_HEDGE_DELAY_SECONDS=5,
+    CEP_PROVIDER_TIMEOUT_SECONDS=1,
+    CEP_CIRCUIT_FAILURE_THRESHOLD=2,
+    CEP_CIRCUIT_COOLDOWN_SECONDS=60,
+)
+class ZipCodeProviderHealthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _fetchers(self, **fetchers):
+        return [(f"saude-{name}", fetch) for name, fetch in fetchers.items()]
+
+    def test_fonte_mais_rapida_passa_a_frente(self):
+        sources = self._fetchers(lenta=Mock(), rapida=Mock())
+        cep_health.record_success("saude-lenta", 0.8)
+        cep_health.record_success("saude-rapida", 0.1)
+
+        self.assertEqual([name for name, _ in cep_health.order_sources(sources)], ["saude-rapida", "saude-lenta"])
+
+    def test_taxa_de_erro_penaliza_a_fonte(self):
+        sources = self._fetchers(instavel=Mock(), estavel=Mock())
+        cep_health.record_success("saude-instavel", 0.1)
+        cep_health.record_failure("saude-instavel", 0.1, "Erro")
+        cep_health.record_success("saude-estavel", 0.3)
+
+        self.assertEqual([name for name, _ in cep_health.order_sources(sources)], ["saude-estavel", "saude-instavel"])
+
+    def test_circuito_aberto_pula_a_fonte_ate_o_fim_da_pausa(self):
+        failing = Mock(side_effect=ValueError("Erro ao consultar ViaCEP."))
+        healthy = Mock(return_value=dict(SAO_PAULO))
+        sources = self._fetchers(fora=failing, ok=healthy)
+        for _ in range(2):
+            cep_health.record_failure("saude-fora", 0.1, "Erro ao consultar ViaCEP.")
+
+        with patch.object(cep, "SOURCES", sources):
+            self.assertEqual(cep.fetch_address_by_zip("01310100")["city"], "São Paulo")
+            stats = {item["source"]: item for item in cep.cep_provider_stats()}
+
+        failing.assert_not_called()
+        self.assertEqual(stats["saude-fora"]["circuit"], "open")
+        self.assertEqual(stats["saude-fora"]["consecutive_failures"], 2)
+        with patch.object(cep_health.time, "time", return_value=time.time() + 61):
+            self.assertEqual([name for name, _ in cep_health.order_sources(sources)], ["saude-ok", "saude-fora"])
+
+    def test_falhas_seguidas_abrem_o_circuito(self):
+        failing = Mock(side_effect=ValueError("Erro ao consultar ViaCEP."))
+
+        with patch.object(cep, "SOURCES", self._fetchers(fora=failing)):
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    cep.fetch_address_by_zip("01310100")
+            stats = cep.cep_provider_stats()
+
+        self.assertEqual(stats[0]["circuit"], "open")
+        self.assertEqual(stats[0]["last_error"], "Erro ao consultar ViaCEP.")
+
+    def test_com_todos_os_circuitos_abertos_tenta_todas(self):
+        sources = self._fetchers(a=Mock(), b=Mock())
+        for _ in range(2):
+            cep_health.record_failure("saude-a", 1, "Timeout")
+            cep_health.record_failure("saude-b", 1, "Timeout")
+
+        self.assertEqual(cep_health.order_sources(sources), sources)
+
+    def test_cep_inexistente_nao_conta_como_falha(self):
+        missing = Mock(side_effect=cep.ZipCodeNotFound("CEP não encontrado."))
+
+        with patch.object(cep, "SOURCES", self._fetchers(vazia=missing)):
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    cep.fetch_address_by_zip("99999999")
+            stats = cep.cep_provider_stats()
+
+        self.assertEqual(stats[0]["error_rate"], 0.0)
+        self.assertEqual(stats[0]["circuit"], "closed")
+
+    def test_circuito_aberto_por_um_worker_vale_para_os_outros(self):
+        # Duas instâncias do FileBasedCache no mesmo diretório fazem o papel de dois processos.
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        worker_a, worker_b = (FileBasedCache(work_dir.name, {}) for _ in range(2))
+        sources = self._fetchers(fora=Mock(), ok=Mock())
+
+        with patch.object(cep_health, "cache", worker_a):
+            for _ in range(2):
+                cep_health.record_failure("saude-fora", 0.1, "Timeout")
+        with patch.object(cep_health, "cache", worker_b):
+            self.assertEqual([name for name, _ in cep_health.order_sources(sources)], ["saude-ok"])
+
+    def test_endpoint_de_estatisticas_exige_administrador(self):
+        user = get_user_model().objects.create_user(username="comum", password="x")
+        admin = get_user_model().objects.create_superuser(username="admin", password="x", email="admin@example.com")
+        cep_health.record_success("ViaCEP", 0.2)
+        url = reverse("system:api_cep_provider_stats")
+
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(admin)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        providers = {item["source"]: item for item in response.json()["providers"]}
+        self.assertEqual(providers["ViaCEP"]["samples"], 1)
+        self.assertEqual(providers["ViaCEP"]["circuit"], "closed")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LocalZipCodeDatasetTests(TestCase):
+    def _write_csv(self, content, encoding="utf-8"):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "ceps.csv"
+        path.write_text(content, encoding=encoding)
+        return path
+
+    def test_importa_ceps_e_faixas_em_lotes(self):
+        path = self._write_csv(
+            "cep;logradouro;bairro;cidade;uf\n"
+            "01310-100;Avenida Paulista;Bela Vista;São Paulo;sp\n"
+            "01310-200;Avenida Paulista;Bela Vista;São Paulo;SP\n"
+            "123;Rua Errada;Centro;Lugar Nenhum;XX\n"
+        )
+        ranges = self._write_csv("cep_inicial,cep_final,cidade,uf\n78000000,78109999,Cuiabá,MT\n")
+        output = StringIO()
+
+        call_command("import_zip_codes", str(path), "--batch-size", "1", stdout=output)
+        call_command("import_zip_codes", str(ranges), stdout=StringIO())
+
+        self.assertEqual(LocalZipCode.objects.count(), 3)
+        self.assertIn("importadas: 2 | ignoradas: 1", output.getvalue())
+        self.assertEqual(LocalZipCode.objects.get(cep_start=1310100).uf, "SP")
+
+    def test_reimportacao_atualiza_sem_duplicar(self):
+        first = self._write_csv("cep,cidade,uf\n01310100,Sao Paulo,SP\n")
+        second = self._write_csv("cep,cidade,uf\n01310100,São Paulo,SP\n01310100,São Paulo,SP\n")
+
+        call_command("import_zip_codes", str(first), stdout=StringIO())
+        call_command("import_zip_codes", str(second), stdout=StringIO())
+
+        self.assertEqual(list(LocalZipCode.objects.values_list("city", flat=True)), ["São Paulo"])
+
+    def test_replace_com_falha_mantem_a_base_anterior(self):
+        LocalZipCode.objects.create(cep_start=1310100, cep_end=1310100, city="São Paulo", uf="SP")
+        path = self._write_csv("cep,cidade,uf\n78050000,Cuiabá,MT\n78060000,Cuiabá,MT\n")
+        original_bulk_create = LocalZipCode.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("falha simulada")
+            return original_bulk_create(*args, **kwargs)
+
+        with patch.object(LocalZipCode.objects, "bulk_create", failing_bulk_create):
+            with self.assertRaises(RuntimeError):
+                cep_dataset.import_zip_code_dataset(path, batch_size=1, replace=True)
+
+        self.assertEqual(list(LocalZipCode.objects.values_list("cep_start", flat=True)), [1310100])
+
+    def test_cep_exato_tem_precedencia_sobre_a_faixa(self):
+        LocalZipCode.objects.create(cep_start=78000000, cep_end=78109999, city="Cuiabá", uf="MT")
+        LocalZipCode.objects.create(
+            cep_start=78050000, cep_end=78050000, street="Avenida do CPA", city="Cuiabá", uf="MT"
+        )
+
+        with self.assertNumQueries(1):
+            exact = cep_dataset.lookup_local_zip_code("78050000")
+        with self.assertNumQueries(2):
+            in_range = cep_dataset.lookup_local_zip_code("78050001")
+
+        self.assertEqual(exact["street"], "Avenida do CPA")
+        self.assertEqual((in_range["street"], in_range["city"]), ("", "Cuiabá"))
+        self.assertEqual(list(LocalZipCode.objects.filter(is_range=True).values_list("cep_start", flat=True)), [78000000])
+
+    def test_cabecalho_sem_cidade_e_recusado(self):
+        path = self._write_csv("cep,uf\n01310100,SP\n")
+
+        with self.assertRaisesMessage(CommandError, "Cabeçalho inválido"):
+            call_command("import_zip_codes", str(path), stdout=StringIO())
+
+    def test_base_local_responde_antes_das_fontes_online(self):
+        LocalZipCode.objects.create(
+            cep_start=1310100, cep_end=1310100, street="Avenida Paulista", city="São Paulo", uf="SP"
+        )
+        LocalZipCode.objects.create(cep_start=78000000, cep_end=78109999, city="Cuiabá", uf="MT")
+        remote = Mock(return_value=dict(SAO_PAULO))
+
+        with patch.object(cep, "SOURCES", [cep.SOURCES[0], ("remota", remote)]):
+            with self.assertNumQueries(2):
+                address = cep.fetch_address_by_zip("01310-100")
+            self.assertEqual(cep.fetch_address_by_zip("78050-000")["city"], "Cuiabá")
+
+        remote.assert_not_called()
+        self.assertEqual(address["street"], "Avenida Paulista")
+        self.assertFalse(ZipCodeCache.objects.exists())
+
+    def test_erro_na_base_local_segue_para_as_fontes_online(self):
+        broken_local = Mock(side_effect=DatabaseError("database is locked"))
+        remote = Mock(return_value=dict(SAO_PAULO))
+
+        with patch.object(cep, "SOURCES", [(cep.LOCAL_SOURCE_NAME, broken_local), ("remota", remote)]):
+            address = cep.fetch_address_by_zip("01310-100")
+
+        remote.assert_called_once()
+        self.assertEqual(address["city"], "São Paulo")
+
+    @override_settings(CEP_CACHE_PURGE_INTERVAL_SECONDS=0)
+    def test_cep_fora_da_base_local_segue_para_as_fontes_online(self):
+        remote = Mock(side_effect=cep.ZipCodeNotFound("CEP não encontrado."))
+
+        with patch.object(cep, "SOURCES", [cep.SOURCES[0], ("remota", remote)]):
+            with self.assertRaisesMessage(ValueError, "Base local: CEP não encontrado na base local.; remota:"):
+                cep.fetch_address_by_zip("99999999")
+
+        remote.assert_called_once()
+        self.assertTrue(ZipCodeCache.objects.filter(cep="99999999").exists())
@@ -0,0 +1,79 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from system.services import cep
+from system.services.http_client import close_http_sessions, get_http_session, http_timeout
+
+
+class _StubCepHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Uma chamada de setup por conexão TCP aceita.
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.paths.append(self.path)
+        if "00000000" in self.path:
+            body = json.dumps({"erro": "true"}).encode()
+        else:
+            address = {"cep": "01310-100", "logradouro": "Avenida Paulista", "localidade": "São Paulo", "uf": "SP"}
+            body = json.dumps(address).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpSessionPoolTests(SimpleTestCase):
+    def setUp(self):
+        close_http_sessions()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubCepHandler)
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.paths = []
+        thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        # Fecha as sessões antes do servidor, que espera as conexões keep-alive terminarem.
+        self.addCleanup(close_http_sessions)
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}"
+
+    def test_viacep_reaproveita_a_conexao_entre_consultas(self):
+        with patch.object(cep, "VIACEP_URL", self.base_url + "/ws/{cep}/json/"):
+            for _ in range(5):
+                self.assertEqual(cep._fetch_viacep("01310100")["city"], "São Paulo")
+            with self.assertRaises(cep.ZipCodeNotFound):
+                cep._fetch_viacep("00000000")
+
+        self.assertEqual(len(self.server.paths), 6)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_sessao_e_compartilhada_entre_threads(self):
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(get_http_session("teste"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(session) for session in sessions}), 1)
+        self.assertIsNot(get_http_session("outra"), sessions[0])
+
+    @override_settings(HTTP_CONNECT_TIMEOUT_SECONDS=2)
+    def test_prazo_de_conexao_separado_do_de_leitura(self):
+        self.assertEqual(http_timeout(5), (2, 5))
+        self.assertEqual(http_timeout(1), (1, 1))
@@ -1,7 +1,23 @@
-from django.test import SimpleTestCase
+from datetime import date
+from importlib import import_module
 
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase, TestCase
+
+from system.models import ConsultancyClient, ConsultancyUser, LegacyRecordLink, LegacyRecordStatus, Profile
+from system.services.legacy_links import (
+    LEGACY_CLIENT_TABLE,
+    annotate_legacy_status,
+    build_legacy_link,
+    legacy_link_index,
+    save_legacy_links,
+)
 from system.services.legacy_markers import extract_legacy_meta, strip_legacy_meta, upsert_legacy_meta
 
+User = get_user_model()
+
 
 class LegacyMarkersTests(SimpleTestCase):
     def test_upsert_and_extract_legacy_meta(self):
@@ -22,3 +38,61 @@ class LegacyMarkersTests(SimpleTestCase):
         with_marker = upsert_legacy_meta(text, payload)
 
         self.assertEqual(strip_legacy_meta(with_marker), text)
+
+
+class LegacyRecordLinkTests(TestCase):
+    def setUp(self):
+        profile = Profile.objects.create(name="Assessor")
+        advisor = ConsultancyUser.objects.create(
+            name="Assessor",
+            email="assessor@test.com",
+            profile=profile,
+            password="!",
+        )
+        self.client_record = ConsultancyClient.objects.create(
+            assigned_advisor=advisor,
+            first_name="Cliente",
+            last_name="Legado",
+            cpf="111.111.111-11",
+            birth_date=date(1990, 1, 1),
+            nationality="Brasileira",
+            phone="(11) 99999-9999",
+            password="!",
+            created_by=User.objects.create_user(username="criador", password="senha-segura-123"),
+            notes=upsert_legacy_meta(
+                "Observacao original",
+                {"source": "legacy", "legacy_cliente_id": 42, "imported": True, "status": "problem", "issues": ["CPF ausente"]},
+            ),
+        )
+
+    def test_migracao_move_marcadores_para_vinculos(self):
+        migration = import_module("system.migrations.0005_move_legacy_markers")
+
+        migration.move_markers_to_links(apps, None)
+
+        self.client_record.refresh_from_db()
+        link = LegacyRecordLink.objects.get(model="system.consultancyclient", object_id=self.client_record.pk)
+        self.assertEqual(self.client_record.notes, "Observacao original")
+        self.assertEqual((link.legacy_table, link.legacy_id), (LEGACY_CLIENT_TABLE, 42))
+        self.assertEqual(link.status, LegacyRecordStatus.PROBLEM)
+        self.assertEqual(link.issues, ["CPF ausente"])
+        self.assertEqual(legacy_link_index(ConsultancyClient.objects.all(), LEGACY_CLIENT_TABLE), {42: self.client_record})
+
+        migration.restore_markers_from_links(apps, None)
+
+        self.client_record.refresh_from_db()
+        self.assertEqual(extract_legacy_meta(self.client_record.notes)["legacy_cliente_id"], 42)
+        self.assertEqual(strip_legacy_meta(self.client_record.notes), "Observacao original")
+
+    def test_listagem_anota_status_e_exclusao_remove_vinculo(self):
+        save_legacy_links([build_legacy_link(self.client_record, LEGACY_CLIENT_TABLE, 7)])
+
+        annotated = annotate_legacy_status(ConsultancyClient.objects.all(), LEGACY_CLIENT_TABLE).get()
+        self.assertEqual(annotated.legacy_status, LegacyRecordStatus.OK)
+
+        self.client_record.delete()
+        self.assertFalse(LegacyRecordLink.objects.exists())
+
+    def test_limpeza_de_vinculos_so_escuta_modelos_vinculados(self):
+        self.assertTrue(post_delete.has_listeners(ConsultancyClient))
+        self.assertFalse(post_delete.has_listeners(Profile))
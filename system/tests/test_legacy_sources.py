@@ -0,0 +1,178 @@
+import json
+import sqlite3
+import tempfile
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from system.models import ConsultancyClient, ConsultancyUser, Process, Profile
+from system.services.legacy_sources import (
+    JsonlLegacySource,
+    LegacySourceError,
+    SQLiteLegacySource,
+    SqlLegacySource,
+    open_legacy_source,
+)
+from system.services.legacy_synthetic import (
+    JsonlDatasetWriter,
+    SqliteDatasetWriter,
+    generate_legacy_dataset,
+)
+
+
+class RecordingSqlSource(SqlLegacySource):
+    def __init__(self):
+        self.executed = []
+
+    def _execute(self, sql, params):
+        self.executed.append((sql, params))
+        return iter(())
+
+
+class LegacySourcesTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+
+    def test_sql_source_filtra_por_marca_dagua(self):
+        source = RecordingSqlSource()
+
+        source.fetch_rows("processos", watermark=(datetime(2026, 3, 1, 8, 0), 120))
+
+        sql, params = source.executed[0]
+        self.assertIn("processos.deleted_at IS NULL", sql)
+        self.assertIn("(processos.updated_at >= %s OR processos.id > %s)", sql)
+        self.assertEqual(params, [datetime(2026, 3, 1, 8, 0), 120])
+
+    def test_sql_source_lista_excluidas_so_em_tabelas_com_soft_delete(self):
+        source = RecordingSqlSource()
+
+        source.fetch_rows("processos", watermark=(None, 120), deleted=True)
+        source.fetch_rows("processo_clientes", deleted=True)
+
+        self.assertEqual(len(source.executed), 1)
+        self.assertIn("processos.deleted_at IS NOT NULL", source.executed[0][0])
+
+    def test_sql_source_divide_filtro_in_em_lotes(self):
+        source = RecordingSqlSource()
+
+        source.fetch_rows("entradas", column="processo_id", ids=set(range(1, 1202)))
+
+        self.assertEqual(len(source.executed), 3)
+        self.assertEqual(len(source.executed[-1][1]), 201)
+
+    def test_sqlite_source_aplica_marca_dagua_e_soft_delete(self):
+        path = self.root / "legado.sqlite3"
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE processos (id INTEGER, updated_at TEXT, deleted_at TEXT)")
+        connection.executemany(
+            "INSERT INTO processos VALUES (?, ?, ?)",
+            [
+                (1, "2026-02-01 10:00:00", None),
+                (2, "2026-03-05 10:00:00", None),
+                (3, "2026-03-05 10:00:00", "2026-03-06 10:00:00"),
+                (4, "2026-01-01 10:00:00", None),
+            ],
+        )
+        connection.commit()
+        connection.close()
+
+        with SQLiteLegacySource(path) as source:
+            rows = source.fetch_rows("processos", watermark=(datetime(2026, 3, 1), 3))
+
+        self.assertEqual(sorted(row["id"] for row in rows), [2, 4])
+
+    def test_jsonl_source_emula_join_de_usuarios(self):
+        (self.root / "users.jsonl").write_text(
+            json.dumps({"id": 7, "email": "ana@legado.local", "name": "Ana"}) + "\n",
+            encoding="utf-8",
+        )
+        (self.root / "clientes.jsonl").write_text(
+            "\n".join(
+                json.dumps(row)
+                for row in [
+                    {"id": 1, "cpf": "1", "usuario_responsavel_id": 7, "updated_at": "2026-03-05 10:00:00"},
+                    {"id": 2, "cpf": "2", "deleted_at": "2026-03-06 10:00:00"},
+                    {"id": 3, "cpf": "3", "updated_at": "2026-01-01 10:00:00"},
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+        source = JsonlLegacySource(self.root)
+        rows = source.fetch_rows("clientes")
+        changed = source.fetch_rows("clientes", watermark=(datetime(2026, 3, 1), 5))
+
+        self.assertEqual([row["id"] for row in rows], [1, 3])
+        self.assertEqual(rows[0]["responsavel_email"], "ana@legado.local")
+        self.assertIsNone(rows[1]["responsavel_email"])
+        self.assertEqual([row["id"] for row in changed], [1])
+        self.assertEqual([row["id"] for row in source.fetch_rows("clientes", deleted=True)], [2])
+        self.assertEqual(list(source.iter_client_cpfs()), [{"id": 1, "cpf": "1"}, {"id": 3, "cpf": "3"}])
+
+    def test_fonte_sql_incompleta_falha_ao_ser_criada(self):
+        class IncompleteSqlSource(SqlLegacySource):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSqlSource()
+
+    def test_open_legacy_source_exige_caminho_existente(self):
+        with self.assertRaises(LegacySourceError):
+            open_legacy_source("jsonl")
+        with self.assertRaises(LegacySourceError):
+            open_legacy_source("sqlite", self.root / "inexistente.sqlite3")
+
+
+class SyntheticLegacyDatasetTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        profile = Profile.objects.create(name="Assessor Legado")
+        ConsultancyUser.objects.create(
+            name="Assessor Legado",
+            email="assessor.legado@test.com",
+            profile=profile,
+            password="!",
+        )
+
+    def _seed(self, source, path):
+        stdout = StringIO()
+        call_command("seed_legacy", source=source, source_path=str(path), stdout=stdout)
+        return stdout.getvalue()
+
+    def test_gerador_e_deterministico(self):
+        first = self.root / "a"
+        second = self.root / "b"
+        generate_legacy_dataset(JsonlDatasetWriter(first), clients=20, seed=7)
+        generate_legacy_dataset(JsonlDatasetWriter(second), clients=20, seed=7)
+
+        self.assertEqual(
+            (first / "clientes.jsonl").read_text(encoding="utf-8"),
+            (second / "clientes.jsonl").read_text(encoding="utf-8"),
+        )
+
+    def test_seed_legacy_importa_dataset_jsonl(self):
+        directory = self.root / "legado"
+        counts = generate_legacy_dataset(JsonlDatasetWriter(directory), clients=25)
+
+        output = self._seed("jsonl", directory)
+
+        self.assertIn("OK: importacao principal consistente com legado.", output)
+        self.assertEqual(ConsultancyClient.objects.count(), counts["clientes"])
+        self.assertEqual(Process.objects.count(), counts["processos"])
+
+    def test_seed_legacy_importa_dataset_sqlite(self):
+        path = self.root / "legado.sqlite3"
+        counts = generate_legacy_dataset(SqliteDatasetWriter(path, batch_size=7), clients=25)
+
+        output = self._seed("sqlite", path)
+
+        self.assertIn("OK: importacao principal consistente com legado.", output)
+        self.assertEqual(ConsultancyClient.objects.count(), counts["clientes"])
+        self.assertEqual(Process.objects.count(), counts["processos"])
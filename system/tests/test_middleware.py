@@ -1,9 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.http import HttpResponse
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 
 from system.middleware import VisaryRequestMiddleware
+from system.models import ConsultancyUser, Module, Profile
+from system.services.permissions import get_user_consultant
+from system.tests import TEST_CACHES
 
+User = get_user_model()
 
+
+@override_settings(CACHES=TEST_CACHES)
 class VisaryRequestMiddlewareTests(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -41,3 +50,81 @@ class VisaryRequestMiddlewareTests(TestCase):
         self.assertEqual(req.visary_partner_id, 9)
         self.assertTrue(req.visary_is_client_area)
         self.assertTrue(req.visary_is_partner_area)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RequestPermissionsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+        self.module = Module.objects.create(name="Parceiros", slug="parceiros")
+        self.profile = Profile.objects.create(name="Assessor", can_view=True, can_create=True)
+        self.profile.modules.add(self.module)
+        self.consultant = ConsultancyUser.objects.create(
+            name="Assessora",
+            email="assessora@test.com",
+            profile=self.profile,
+            password="!",
+        )
+        self.user = User.objects.create_user(username="assessora@test.com", password="senha-segura-123")
+
+    def _request(self, user):
+        captured = {}
+
+        def capture(req):
+            captured["request"] = req
+            return HttpResponse()
+
+        request = self.factory.get("/")
+        request.session = {}
+        request.user = user
+        with self.assertNumQueries(0):
+            VisaryRequestMiddleware(capture)(request)
+        return captured["request"]
+
+    def test_resolve_consultor_e_modulos_uma_vez(self):
+        request = self._request(User.objects.get(pk=self.user.pk))
+
+        with self.assertNumQueries(2):
+            self.assertEqual(request.consultant, self.consultant)
+            self.assertEqual(request.permissions.consultant.pk, self.consultant.pk)
+            self.assertFalse(request.permissions.can_manage_all)
+            self.assertTrue(request.permissions.has_module("Parceiros"))
+            self.assertTrue(request.permissions.has_module("parceiros"))
+            self.assertFalse(request.permissions.has_module("Financeiro"))
+            self.assertTrue(request.permissions.can_create)
+            self.assertFalse(request.permissions.can_delete)
+            self.assertEqual(get_user_consultant(request.user), self.consultant)
+
+        # Próxima requisição: a matriz do perfil já está no cache, só o consultor é consultado.
+        request = self._request(User.objects.get(pk=self.user.pk))
+        with self.assertNumQueries(1):
+            self.assertTrue(request.permissions.has_module("Parceiros"))
+
+    def test_usuario_anonimo_nao_consulta_o_banco(self):
+        request = self._request(AnonymousUser())
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(request.permissions.consultant)
+            self.assertFalse(request.consultant)
+            self.assertFalse(request.permissions.can_manage_all)
+            self.assertFalse(request.permissions.has_module("Parceiros"))
+
+    def test_staff_sem_consultor_gerencia_tudo(self):
+        staff = User.objects.create_user(username="equipe", password="senha-segura-123", is_staff=True)
+        request = self._request(staff)
+
+        self.assertIsNone(request.permissions.consultant)
+        self.assertTrue(request.permissions.can_manage_all)
+        self.assertTrue(request.permissions.has_module("Financeiro"))
+        self.assertTrue(request.permissions.can_delete)
+
+    def test_consultor_pelo_email_quando_username_nao_corresponde(self):
+        self.user.username = "assessora"
+        self.user.email = "ASSESSORA@test.com"
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user_consultant(self.user), self.consultant)
+            self.assertEqual(get_user_consultant(self.user), self.consultant)
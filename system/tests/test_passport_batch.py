@@ -0,0 +1,112 @@
+import json
+import tempfile
+import zipfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from system.models import ConsultancyClient, ConsultancyUser, Profile
+from system.services import passport_ocr_cache
+from system.services.passport_synthetic import build_mrz_lines
+from system.tests.test_passport_ocr import build_passport_page
+
+User = get_user_model()
+
+VITTORIA_MRZ = [
+    "P<BRAFERREIRA<<VITTORIA<EMIDIA<<<<<<<<<<<<<<",
+    "AB12345671BRA9001011F3201015<<<<<<<<<<<<<<04",
+]
+
+
+class ExtractPassportsCommandTests(TestCase):
+    def setUp(self):
+        passport_ocr_cache.clear_passport_ocr_cache()
+        advisor = ConsultancyUser.objects.create(
+            name="Assessor",
+            email="assessor.lote@test.com",
+            profile=Profile.objects.create(name="Assessor"),
+            password="!",
+        )
+        creator = User.objects.create_user(username="lote", password="senha-segura-123")
+        defaults = {
+            "assigned_advisor": advisor,
+            "nationality": "Brasileira",
+            "phone": "(11) 99999-9999",
+            "password": "!",
+            "created_by": creator,
+        }
+        self.by_cpf = ConsultancyClient.objects.create(
+            first_name="Joao",
+            last_name="Aluno",
+            cpf="123.456.789-09",
+            birth_date=date(2008, 5, 20),
+            **defaults,
+        )
+        self.by_name = ConsultancyClient.objects.create(
+            first_name="Vittoria Emidia",
+            last_name="Ferreira",
+            cpf="987.654.321-00",
+            birth_date=date(1990, 1, 1),
+            passport_number="ANTIGO123",
+            **defaults,
+        )
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.work_dir = Path(work_dir.name)
+        self.zip_path = self.work_dir / "turma.zip"
+        with zipfile.ZipFile(self.zip_path, "w") as archive:
+            archive.writestr(
+                "turma/12345678909.jpg",
+                build_passport_page(build_mrz_lines("SILVA", "JOAO", "CD9876543", "080520", "330101")),
+            )
+            archive.writestr("turma/vittoria.jpg", build_passport_page(VITTORIA_MRZ))
+            archive.writestr("turma/quebrado.png", b"nao e imagem")
+            archive.writestr("turma/leia-me.txt", b"lista da turma")
+
+    def _run(self, source, output, **options):
+        stdout = StringIO()
+        call_command("extract_passports", str(source), output=str(output), workers=2, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_zip_gera_jsonl_e_preenche_passaporte_dos_clientes(self):
+        output = self.work_dir / "resultado.jsonl"
+        previous_updated_at = self.by_cpf.updated_at
+
+        report = self._run(self.zip_path, output, apply=True)
+
+        results = {item["file"]: item for item in map(json.loads, output.read_text(encoding="utf-8").splitlines())}
+        self.assertEqual(sorted(results), ["turma/12345678909.jpg", "turma/quebrado.png", "turma/vittoria.jpg"])
+        self.assertEqual(results["turma/12345678909.jpg"]["match"], "cpf")
+        self.assertEqual(results["turma/vittoria.jpg"]["match"], "name")
+        self.assertEqual(results["turma/quebrado.png"]["status"], "error")
+        self.by_cpf.refresh_from_db()
+        self.by_name.refresh_from_db()
+        self.assertEqual(self.by_cpf.passport_number, "CD9876543")
+        self.assertEqual(self.by_cpf.passport_expiry_date, date(2033, 1, 1))
+        self.assertEqual(self.by_cpf.passport_type, "regular")
+        self.assertGreater(self.by_cpf.updated_at, previous_updated_at)
+        # Sem --overwrite, o número já cadastrado é mantido e só os campos vazios são preenchidos.
+        self.assertEqual(self.by_name.passport_number, "ANTIGO123")
+        self.assertEqual(self.by_name.passport_issuing_country, "BRA")
+        self.assertIn("falhas: 1", report)
+        self.assertIn("atualizados: 2", report)
+        self.assertIn("arquivos/s", report)
+
+    def test_diretorio_em_csv_reaproveita_cache_na_segunda_execucao(self):
+        source = self.work_dir / "scans"
+        with zipfile.ZipFile(self.zip_path) as archive:
+            archive.extractall(source)
+        output = self.work_dir / "resultado.csv"
+
+        self._run(source, output)
+        report = self._run(source, output)
+
+        self.assertIn("cache: 2", report)
+        header, *rows = output.read_text(encoding="utf-8").splitlines()
+        self.assertTrue(header.startswith("file,status,latency_ms"))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(ConsultancyClient.objects.get(pk=self.by_cpf.pk).passport_number, "")
@@ -0,0 +1,67 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from system.services import passport_ocr
+from system.services.passport_benchmark import _percentiles
+from system.services.passport_synthetic import (
+    SYNTHETIC_PASSPORT_VARIANTS,
+    build_mrz_lines,
+    generate_synthetic_passports,
+    mrz_check_digit,
+)
+
+
+class PassportSyntheticTests(SimpleTestCase):
+    def test_digito_verificador_confere_com_especime_icao(self):
+        self.assertEqual(mrz_check_digit("L898902C3"), 6)
+        self.assertEqual(mrz_check_digit("740812"), 2)
+        self.assertEqual(mrz_check_digit("ZE184226B<<<<<"), 1)
+
+    def test_mrz_gerada_passa_na_validacao_do_pipeline(self):
+        mrz_lines = build_mrz_lines("SILVA", "JOAO PEDRO", "CD9876543", "080520", "330101")
+
+        self.assertEqual([len(line) for line in mrz_lines], [44, 44])
+        self.assertTrue(passport_ocr._is_valid_mrz(mrz_lines))
+        self.assertEqual(passport_ocr._fields_from_mrz(mrz_lines)["first_name"], "Joao Pedro")
+
+    def test_gerador_e_deterministico_e_cobre_todas_as_variantes(self):
+        first = list(generate_synthetic_passports(len(SYNTHETIC_PASSPORT_VARIANTS), seed=7))
+        second = list(generate_synthetic_passports(len(SYNTHETIC_PASSPORT_VARIANTS), seed=7))
+
+        self.assertEqual([sample["variant"] for sample in first], list(SYNTHETIC_PASSPORT_VARIANTS))
+        self.assertEqual([sample["truth"] for sample in first], [sample["truth"] for sample in second])
+        self.assertTrue(all(sample["content"] for sample in first))
+
+    def test_percentis_por_posicao(self):
+        stats = _percentiles([0.1 * value for value in range(1, 21)])
+
+        self.assertEqual(stats["count"], 20)
+        self.assertAlmostEqual(stats["p50"], 1.05)
+        self.assertAlmostEqual(stats["p95"], 1.9)
+
+
+class BenchmarkPassportOcrCommandTests(SimpleTestCase):
+    def test_relatorio_json_com_latencia_memoria_e_acerto(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            output = Path(work_dir) / "bench.json"
+            call_command(
+                "benchmark_passport_ocr",
+                samples=2,
+                variants=["clean", "pdf_text"],
+                output=str(output),
+                stdout=StringIO(),
+            )
+            report = json.loads(output.read_text(encoding="utf-8"))
+
+        self.assertEqual(report["samples"], 2)
+        self.assertEqual(report["pipeline_version"], passport_ocr.PASSPORT_OCR_PIPELINE_VERSION)
+        self.assertEqual(report["stages"], {"mrz_roi": 1, "pdf_text": 1})
+        self.assertEqual(set(report["latency_seconds"]["total"]), {"count", "p50", "p95", "max"})
+        self.assertIn("rss_peak_mb", report["memory"])
+        self.assertEqual(report["field_accuracy"]["passport_number"], 1.0)
+        self.assertEqual(set(report["variants"]), {"clean", "pdf_text"})
@@ -1,20 +1,40 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from system.services.passport_ocr import extract_passport_data_from_document
+from system.models import PassportOcrCacheEntry, PassportOcrJob, PassportOcrJobStatus
+from system.services import passport_ocr, passport_ocr_cache
+from system.services.passport_ocr import PassportExtractionError, extract_passport_data_from_document
+from system.services.passport_ocr_daemon import PassportOcrDaemonServer
+from system.services.passport_synthetic import build_text_layer_pdf, render_passport_page
+from system.services.passport_ocr_jobs import (
+    _requeue_stale_jobs,
+    purge_finished_passport_ocr_jobs,
+    run_passport_ocr_job,
+)
 
 
 User = get_user_model()
 
 
 class PassportOcrServiceTests(TestCase):
+    def setUp(self):
+        passport_ocr_cache.clear_passport_ocr_cache()
+
+    @patch("system.services.passport_ocr._collect_mrz_roi_lines", return_value={})
     @patch("system.services.passport_ocr._collect_lines_multisource")
     @patch("system.services.passport_ocr._extract_images")
-    def test_extract_passport_data_from_document_parses_mrz(self, mock_extract_images, mock_collect_lines):
+    def test_extract_passport_data_from_document_parses_mrz(self, mock_extract_images, mock_collect_lines, mock_roi):
         mock_extract_images.return_value = [object()]
         mock_collect_lines.return_value = {
             "rapidocr": [
@@ -37,9 +57,10 @@ class PassportOcrServiceTests(TestCase):
         self.assertEqual(fields.get("birth_date"), "1990-01-01")
         self.assertEqual(fields.get("passport_expiry_date"), "2032-01-01")
 
+    @patch("system.services.passport_ocr._collect_mrz_roi_lines", return_value={})
     @patch("system.services.passport_ocr._collect_lines_multisource")
     @patch("system.services.passport_ocr._extract_images")
-    def test_extract_passport_data_from_document_ignora_linha_de_assinatura(self, mock_extract_images, mock_collect_lines):
+    def test_extract_passport_data_from_document_ignora_linha_de_assinatura(self, mock_extract_images, mock_collect_lines, mock_roi):
         mock_extract_images.return_value = [object()]
         mock_collect_lines.return_value = {
             "rapidocr": ["ASSINATURA DO TITULAR SIGNATUREDU TITULAIRE"],
@@ -52,6 +73,470 @@ class PassportOcrServiceTests(TestCase):
         self.assertNotIn("nome", result["fields"])
 
 
+def build_passport_page(mrz_lines, width=1600, height=1100):
+    page = render_passport_page(
+        mrz_lines,
+        ["REPUBLICA FEDERATIVA DO BRASIL", "PASSAPORTE / PASSPORT", "FERREIRA", "VITTORIA EMIDIA"],
+        size=(width, height),
+    )
+    output = BytesIO()
+    page.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+class PassportOcrMrzRegionTests(TestCase):
+    MRZ = [
+        "P<BRAFERREIRA<<VITTORIA<EMIDIA<<<<<<<<<<<<<<",
+        "AB12345671BRA9001011F3201015<<<<<<<<<<<<<<04",
+    ]
+
+    def setUp(self):
+        passport_ocr_cache.clear_passport_ocr_cache()
+        passport_ocr._ensure_ocr_stack()
+        self.page_bytes = build_passport_page(self.MRZ)
+
+    def test_localiza_faixa_mrz_no_rodape_da_pagina(self):
+        image = passport_ocr._decode_image(self.page_bytes)
+
+        region = passport_ocr._locate_mrz_region(image)
+
+        self.assertIsNotNone(region)
+        self.assertLess(region.shape[0], image.shape[0] * 0.2)
+        self.assertEqual(len(passport_ocr._split_mrz_rows(region)), 2)
+
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    @patch("system.services.passport_ocr._run_rapidocr_recognition")
+    def test_mrz_encontrada_na_faixa_dispensa_ocr_da_pagina(self, mock_recognition, mock_collect_lines):
+        mock_recognition.side_effect = [[self.MRZ[0]], [self.MRZ[1]]]
+        document = SimpleUploadedFile("passport.jpg", self.page_bytes, content_type="image/jpeg")
+
+        result = extract_passport_data_from_document(document)
+
+        mock_collect_lines.assert_not_called()
+        self.assertEqual(result["fields"]["passport_number"], "AB1234567")
+        self.assertEqual(result["fields"]["last_name"], "Ferreira")
+        self.assertEqual(result["pipeline"]["stage"], "mrz_roi")
+        self.assertTrue(result["pipeline"]["mrz_valid"])
+        self.assertIn("mrz_roi", result["pipeline"]["timings"])
+
+    @patch("system.services.passport_ocr._run_tesseract_mrz", return_value=[])
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    @patch("system.services.passport_ocr._run_rapidocr_recognition", return_value=["RUIDO"])
+    def test_sem_mrz_na_faixa_usa_pagina_inteira(self, mock_recognition, mock_collect_lines, mock_tesseract):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+        document = SimpleUploadedFile("passport.jpg", self.page_bytes, content_type="image/jpeg")
+
+        result = extract_passport_data_from_document(document)
+
+        mock_collect_lines.assert_called_once()
+        self.assertEqual(result["fields"]["passport_number"], "AB1234567")
+
+
+class PassportOcrResolutionTests(SimpleTestCase):
+    def setUp(self):
+        passport_ocr._ensure_ocr_stack()
+
+    def _photo_bytes(self, size, fmt="JPEG"):
+        from PIL import Image
+
+        page = Image.open(BytesIO(build_passport_page(PassportOcrMrzRegionTests.MRZ))).resize(size)
+        output = BytesIO()
+        page.save(output, format=fmt)
+        return output.getvalue()
+
+    def test_foto_grande_e_reduzida_na_decodificacao(self):
+        image = passport_ocr._decode_image(self._photo_bytes((6400, 4400)))
+
+        self.assertEqual(max(image.shape[:2]), passport_ocr._TARGET_LONG_EDGE)
+        self.assertIsNotNone(passport_ocr._locate_mrz_region(image))
+
+    def test_imagem_acima_do_limite_e_recusada(self):
+        with patch.object(passport_ocr, "_MAX_DECODED_PIXELS", 1000):
+            with self.assertRaises(PassportExtractionError):
+                passport_ocr._decode_image(self._photo_bytes((400, 300), fmt="PNG"))
+
+    def test_png_grande_e_limitado_pelo_tamanho_original(self):
+        # PNG não é reduzido no decodificador: 600x500 passaria se o limite dividisse pela redução.
+        with patch.object(passport_ocr, "_MAX_DECODED_PIXELS", 100_000), patch.object(
+            passport_ocr, "_TARGET_LONG_EDGE", 150
+        ):
+            with self.assertRaises(PassportExtractionError):
+                passport_ocr._decode_image(self._photo_bytes((600, 500), fmt="PNG"))
+            image = passport_ocr._decode_image(self._photo_bytes((600, 500)))
+
+        self.assertEqual(max(image.shape[:2]), 150)
+
+    def test_escala_do_pdf_depende_do_tamanho_da_pagina(self):
+        a4_scale = passport_ocr._pdf_render_scale(595, 842)
+        small_scale = passport_ocr._pdf_render_scale(250, 350)
+
+        self.assertEqual(round(842 * a4_scale), passport_ocr._TARGET_LONG_EDGE)
+        self.assertEqual(small_scale, passport_ocr._MAX_PDF_RENDER_SCALE)
+
+
+class PassportOcrQualityTests(SimpleTestCase):
+    def setUp(self):
+        passport_ocr._ensure_ocr_stack()
+
+    def _page(self, **kwargs):
+        page = render_passport_page(PassportOcrMrzRegionTests.MRZ, ("PASSAPORTE / PASSPORT", "SILVA", "JOAO PEDRO"))
+        if kwargs.get("angle"):
+            page = page.rotate(kwargs["angle"], expand=True, fillcolor=(235, 230, 220))
+        if kwargs.get("faded"):
+            from PIL import Image
+
+            page = Image.eval(page, lambda value: 150 + value * 90 // 255)
+        return passport_ocr._cv2.cvtColor(passport_ocr._np.asarray(page), passport_ocr._cv2.COLOR_RGB2BGR)
+
+    def test_pagina_limpa_usa_so_a_imagem_original(self):
+        quality = passport_ocr._analyze_image_quality(self._page())
+
+        self.assertEqual(passport_ocr._plan_ocr_variants(quality), ["original"])
+
+    def test_pagina_inclinada_e_endireitada_antes_do_ocr(self):
+        quality = passport_ocr._analyze_image_quality(self._page(angle=3))
+        plan = passport_ocr._plan_ocr_variants(quality)
+        straightened = passport_ocr._deskew(self._page(angle=3), quality["skew"])
+
+        self.assertAlmostEqual(quality["skew"], -3, delta=0.5)
+        self.assertEqual(plan[0], "deskewed")
+        self.assertLess(abs(passport_ocr._analyze_image_quality(straightened)["skew"]), 0.5)
+
+    def test_baixo_contraste_aplica_clahe_e_limiar_adaptativo(self):
+        quality = passport_ocr._analyze_image_quality(self._page(faded=True))
+
+        self.assertLess(quality["contrast"], passport_ocr._LOW_CONTRAST)
+        self.assertEqual(passport_ocr._plan_ocr_variants(quality), ["original", "clahe", "adaptive"])
+
+    def test_so_amplia_quando_o_texto_e_pequeno(self):
+        image = passport_ocr._np.zeros((1375, 2000, 3), dtype="uint8")
+        large_text = {"text_height": 40.0, "skew": 0.0}
+        small_text = {"text_height": 16.0, "skew": 0.0}
+
+        self.assertEqual(passport_ocr._build_ocr_variant(image, "otsu", large_text).shape[:2], (1375, 2000))
+        self.assertEqual(passport_ocr._build_ocr_variant(image, "otsu", small_text).shape[:2], (2750, 4000))
+
+
+@patch("system.services.passport_ocr._collect_mrz_roi_lines", return_value={})
+@patch("system.services.passport_ocr._extract_images", return_value=[object()])
+class PassportOcrCacheTests(TestCase):
+    MRZ = PassportOcrMrzRegionTests.MRZ
+
+    def setUp(self):
+        passport_ocr_cache.clear_passport_ocr_cache()
+
+    def _extract(self, content=b"passport-bytes"):
+        return extract_passport_data_from_document(SimpleUploadedFile("passport.png", content, content_type="image/png"))
+
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    def test_mesmo_arquivo_nao_refaz_ocr(self, mock_collect_lines, mock_images, mock_roi):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+
+        first = self._extract()
+        second = self._extract()
+
+        mock_collect_lines.assert_called_once()
+        self.assertEqual(first["pipeline"]["cache"], "miss")
+        self.assertEqual(second["pipeline"]["cache"], "memory")
+        self.assertEqual(second["fields"], first["fields"])
+        self.assertEqual(second["warnings"], first["warnings"])
+        self.assertEqual(passport_ocr_cache.passport_ocr_cache_stats()["memory_hits"], 1)
+
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    def test_cache_persistente_sobrevive_ao_processo(self, mock_collect_lines, mock_images, mock_roi):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+        first = self._extract()
+        passport_ocr_cache.clear_passport_ocr_cache()
+
+        second = self._extract()
+
+        mock_collect_lines.assert_called_once()
+        self.assertEqual(second["pipeline"]["cache"], "database")
+        self.assertEqual(second["fields"], first["fields"])
+        entry = PassportOcrCacheEntry.objects.get()
+        self.assertEqual(entry.digest, passport_ocr_cache.passport_document_digest(b"passport-bytes"))
+        self.assertEqual(entry.hit_count, 1)
+        self.assertEqual(set(entry.pipeline), {"stage", "mrz_valid"})
+
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    def test_nova_versao_do_pipeline_invalida_cache(self, mock_collect_lines, mock_images, mock_roi):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+        self._extract()
+        passport_ocr_cache.clear_passport_ocr_cache()
+
+        with patch.object(passport_ocr, "PASSPORT_OCR_PIPELINE_VERSION", "test-next"):
+            result = self._extract()
+
+        self.assertEqual(mock_collect_lines.call_count, 2)
+        self.assertEqual(result["pipeline"]["cache"], "miss")
+
+    @override_settings(PASSPORT_OCR_CACHE_TTL_SECONDS=60)
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    def test_entrada_expirada_e_ignorada(self, mock_collect_lines, mock_images, mock_roi):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+        self._extract()
+        passport_ocr_cache.clear_passport_ocr_cache()
+        PassportOcrCacheEntry.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+
+        result = self._extract()
+
+        self.assertEqual(result["pipeline"]["cache"], "miss")
+        self.assertEqual(PassportOcrCacheEntry.objects.count(), 1)
+
+    @override_settings(PASSPORT_OCR_CACHE_MAX_ENTRIES=2, PASSPORT_OCR_CACHE_MEMORY_ENTRIES=2)
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    def test_limite_de_tamanho_remove_entradas_menos_usadas(self, mock_collect_lines, mock_images, mock_roi):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+        for content in (b"doc-1", b"doc-2", b"doc-3"):
+            self._extract(content)
+
+        digests = set(PassportOcrCacheEntry.objects.values_list("digest", flat=True))
+        stats = passport_ocr_cache.passport_ocr_cache_stats()
+
+        self.assertNotIn(passport_ocr_cache.passport_document_digest(b"doc-1"), digests)
+        self.assertEqual(len(digests), 2)
+        self.assertEqual(stats["memory_entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    def test_endpoint_de_estatisticas_exige_administrador(self, mock_collect_lines, mock_images, mock_roi):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+        self._extract()
+        self._extract()
+        user = User.objects.create_user(username="comum.ocr", password="senha-segura-123")
+        admin = User.objects.create_superuser(username="admin.ocr", password="x", email="admin.ocr@example.com")
+        url = reverse("system:api_passport_ocr_cache_stats")
+
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(admin)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()["cache"]
+        self.assertEqual((stats["memory_hits"], stats["misses"], stats["stores"]), (1, 1, 1))
+        self.assertEqual(stats["database_entries"], 1)
+
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    def test_falha_de_extracao_nao_e_cacheada(self, mock_collect_lines, mock_images, mock_roi):
+        mock_images.side_effect = PassportExtractionError("Não foi possível abrir a imagem enviada.")
+
+        with self.assertRaises(PassportExtractionError):
+            self._extract()
+
+        self.assertFalse(PassportOcrCacheEntry.objects.exists())
+
+
+class PassportOcrPdfTextLayerTests(TestCase):
+    MRZ = PassportOcrMrzRegionTests.MRZ
+
+    def setUp(self):
+        passport_ocr_cache.clear_passport_ocr_cache()
+
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    @patch("system.services.passport_ocr._render_pdf_pages")
+    def test_mrz_na_camada_de_texto_dispensa_renderizacao(self, mock_render, mock_collect_lines):
+        document = SimpleUploadedFile("passport.pdf", build_text_layer_pdf(self.MRZ), content_type="application/pdf")
+
+        result = extract_passport_data_from_document(document)
+
+        mock_render.assert_not_called()
+        mock_collect_lines.assert_not_called()
+        self.assertEqual(result["fields"]["passport_number"], "AB1234567")
+        self.assertEqual(result["fields"]["birth_date"], "1990-01-01")
+        self.assertEqual(result["pipeline"]["stage"], "pdf_text")
+        self.assertIn("pdf_text", result["pipeline"]["timings"])
+
+    @patch("system.services.passport_ocr._collect_mrz_roi_lines", return_value={})
+    @patch("system.services.passport_ocr._collect_lines_multisource")
+    @patch("system.services.passport_ocr._render_pdf_pages", return_value=[object()])
+    def test_pdf_sem_mrz_no_texto_segue_para_ocr(self, mock_render, mock_collect_lines, mock_roi):
+        mock_collect_lines.return_value = {"rapidocr": self.MRZ}
+        document = SimpleUploadedFile(
+            "passport.pdf",
+            build_text_layer_pdf(["REPUBLICA FEDERATIVA DO BRASIL"]),
+            content_type="application/pdf",
+        )
+
+        result = extract_passport_data_from_document(document)
+
+        mock_render.assert_called_once()
+        self.assertEqual(mock_collect_lines.call_args.kwargs["pdf_lines"], ["REPUBLICA FEDERATIVA DO BRASIL"])
+        self.assertEqual(result["fields"]["passport_number"], "AB1234567")
+
+    def test_pdfminer_cobre_pdf_que_o_pdfium_nao_le(self):
+        passport_ocr._ensure_ocr_stack()
+        with patch("system.services.passport_ocr._extract_pdfium_text", return_value=""):
+            lines = passport_ocr._extract_pdf_text_lines(build_text_layer_pdf(self.MRZ))
+
+        self.assertEqual(lines, self.MRZ)
+
+
+class PassportOcrDaemonTests(TestCase):
+    def setUp(self):
+        passport_ocr_cache.clear_passport_ocr_cache()
+        socket_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(socket_dir.cleanup)
+        self.socket_path = os.path.join(socket_dir.name, "ocr.sock")
+
+    def _start_daemon(self, extract):
+        server = PassportOcrDaemonServer(self.socket_path, extract, extraction_error=PassportExtractionError)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.addCleanup(stop)
+
+    def _extract(self):
+        document = SimpleUploadedFile("passport.png", b"daemon-bytes", content_type="image/png")
+        with self.settings(PASSPORT_OCR_DAEMON_SOCKET=self.socket_path):
+            return extract_passport_data_from_document(document)
+
+    @patch("system.services.passport_ocr.extract_passport_data_from_bytes")
+    def test_extracao_e_feita_pelo_daemon(self, mock_local_extract):
+        received = []
+
+        def daemon_extract(filename, file_bytes):
+            received.append((filename, file_bytes))
+            return {"fields": {"passport_number": "AB1234567"}, "warnings": [], "raw_lines": [], "pipeline": {}}
+
+        self._start_daemon(daemon_extract)
+
+        result = self._extract()
+
+        mock_local_extract.assert_not_called()
+        self.assertEqual(received, [("passport.png", b"daemon-bytes")])
+        self.assertEqual(result["fields"]["passport_number"], "AB1234567")
+
+    @patch("system.services.passport_ocr.extract_passport_data_from_bytes")
+    def test_daemon_parado_usa_ocr_no_processo(self, mock_local_extract):
+        mock_local_extract.return_value = {"fields": {"passport_number": "AB1234567"}, "warnings": []}
+
+        with self.assertLogs("system.services.passport_ocr", level="WARNING"):
+            result = self._extract()
+
+        mock_local_extract.assert_called_once_with("passport.png", b"daemon-bytes")
+        self.assertEqual(result["fields"]["passport_number"], "AB1234567")
+
+    @patch("system.services.passport_ocr.extract_passport_data_from_bytes")
+    def test_erro_de_extracao_no_daemon_chega_ao_chamador(self, mock_local_extract):
+        def daemon_extract(filename, file_bytes):
+            raise PassportExtractionError("Não foi possível abrir a imagem enviada.")
+
+        self._start_daemon(daemon_extract)
+
+        with self.assertRaisesMessage(PassportExtractionError, "abrir a imagem"):
+            self._extract()
+        mock_local_extract.assert_not_called()
+
+    @patch("system.services.passport_ocr.extract_passport_data_from_bytes")
+    def test_falha_interna_do_daemon_cai_para_o_processo(self, mock_local_extract):
+        mock_local_extract.return_value = {"fields": {}, "warnings": []}
+
+        def daemon_extract(filename, file_bytes):
+            raise RuntimeError("onnxruntime travou")
+
+        self._start_daemon(daemon_extract)
+
+        with self.assertLogs("system.services", level="WARNING") as logs:
+            self._extract()
+
+        mock_local_extract.assert_called_once()
+        self.assertTrue(any("falha inesperada" in message for message in logs.output))
+
+
+class PassportMrzCheckDigitTests(SimpleTestCase):
+    def test_especime_icao_fecha_todos_os_digitos(self):
+        checks = passport_ocr._mrz_check_digits("L898902C36UTO7408122F1204159ZE184226B<<<<<10")
+
+        self.assertTrue(all(checks.values()))
+
+    def test_digito_divergente_invalida_a_mrz(self):
+        checks = passport_ocr._mrz_check_digits("AB12345679BRA9001011F3201015<<<<<<<<<<<<<<04")
+
+        self.assertFalse(checks["passport_number"])
+        self.assertTrue(checks["birth_date"])
+        self.assertFalse(passport_ocr._is_valid_mrz(["P<BRAFERREIRA<<VITTORIA<<<<<<<<<<<<<<<<<<<<<", "AB12345679BRA9001011F3201015<<<<<<<<<<<<<<04"]))
+
+    def test_corrige_letras_lidas_em_posicoes_numericas(self):
+        mrz = passport_ocr._extract_mrz_lines(
+            [
+                "P<BRAFERREIRA<<VITTORIA<EMIDIA<<<<<<<<<<<<<<",
+                "AB12345671BRA9OO1O11F32O1O15<<<<<<<<<<<<<<04",
+            ]
+        )
+
+        self.assertTrue(passport_ocr._is_valid_mrz(mrz))
+        self.assertEqual(passport_ocr._fields_from_mrz(mrz)["birth_date"], "1990-01-01")
+
+
+class PassportOcrCascadeTests(SimpleTestCase):
+    VALID_MRZ = PassportOcrMrzRegionTests.MRZ
+
+    def setUp(self):
+        passport_ocr_cache.clear_passport_ocr_cache()
+        passport_ocr._ensure_ocr_stack()
+        self.images = [passport_ocr._np.full((200, 400, 3), 255, dtype="uint8")]
+        # Plano fixo: a página em branco não diz nada ao analisador de qualidade.
+        planner = patch("system.services.passport_ocr._plan_ocr_variants", return_value=["original", "otsu"])
+        planner.start()
+        self.addCleanup(planner.stop)
+
+    @patch("system.services.passport_ocr._is_tesseract_available", return_value=True)
+    @patch("system.services.passport_ocr._run_engine")
+    def test_para_no_primeiro_estagio_com_mrz_valida(self, mock_run_engine, mock_tesseract):
+        mock_run_engine.return_value = self.VALID_MRZ
+        trace = {}
+
+        sources = passport_ocr._collect_lines_multisource(self.images, trace=trace)
+
+        self.assertEqual(mock_run_engine.call_count, 1)
+        self.assertEqual(mock_run_engine.call_args.args[0], "rapidocr")
+        self.assertEqual(trace["stage"], "rapidocr:original")
+        self.assertEqual(trace["ocr_calls"], 1)
+        self.assertEqual(list(sources), ["rapidocr"])
+
+    @patch("system.services.passport_ocr._is_tesseract_available", return_value=True)
+    @patch("system.services.passport_ocr._run_engine")
+    def test_sem_mrz_valida_executa_todos_os_motores(self, mock_run_engine, mock_tesseract):
+        mock_run_engine.side_effect = lambda engine, image: [f"{engine} linha {image.shape[0]}"]
+        trace = {}
+
+        sources = passport_ocr._collect_lines_multisource(self.images, trace=trace)
+
+        self.assertEqual(mock_run_engine.call_args_list[0].args[0], "rapidocr")
+        self.assertEqual(
+            sorted(call.args[0] for call in mock_run_engine.call_args_list),
+            ["pytesseract", "pytesseract", "rapidocr", "rapidocr"],
+        )
+        self.assertNotIn("stage", trace)
+        self.assertEqual(trace["ocr_calls"], 4)
+        self.assertEqual(set(trace["timings"]), {"quality", "rapidocr", "pytesseract"})
+        self.assertEqual(sources["rapidocr"], ["rapidocr linha 200", "rapidocr linha 400"])
+        self.assertEqual(sources["pytesseract"], ["pytesseract linha 200", "pytesseract linha 400"])
+
+    @patch("system.services.passport_ocr._is_tesseract_available", return_value=True)
+    @patch("system.services.passport_ocr._run_engine")
+    def test_resultado_nao_depende_da_ordem_de_conclusao(self, mock_run_engine, mock_tesseract):
+        delays = {"rapidocr": 0.05, "pytesseract": 0.0}
+
+        def slow_engine(engine, image):
+            time.sleep(delays[engine] if image.shape[0] == 400 else 0)
+            return [f"{engine} {image.shape[0]}"]
+
+        mock_run_engine.side_effect = slow_engine
+        images = self.images * 2
+
+        sources = passport_ocr._collect_lines_multisource(images)
+
+        self.assertEqual(sources["rapidocr"], ["rapidocr 200", "rapidocr 400"])
+        self.assertEqual(sources["pytesseract"], ["pytesseract 200", "pytesseract 400"])
+
+
 class PassportOcrApiTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -90,3 +575,123 @@ class PassportOcrApiTests(TestCase):
         self.assertTrue(payload["success"])
         self.assertEqual(payload["fields"]["passport_number"], "AB1234567")
         self.assertIn("passport_ocr_cliente", self.client.session)
+
+
+@patch("system.services.passport_ocr_jobs._enqueue", side_effect=run_passport_ocr_job)
+class PassportOcrJobApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ocr.jobs@test.com",
+            email="ocr.jobs@test.com",
+            password="senha-segura-123",
+        )
+        self.client.force_login(self.user)
+
+    def _create_job(self, **data):
+        document = SimpleUploadedFile("passport.pdf", b"fake-bytes", content_type="application/pdf")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("system:api_create_passport_job"), data={"documento": document, **data})
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    @patch("system.services.passport_ocr_jobs.extract_passport_data_from_document")
+    def test_job_conclui_e_status_retorna_campos(self, mock_extract, mock_enqueue):
+        mock_extract.return_value = {"fields": {"passport_number": "AB1234567"}, "warnings": ["Extração parcial."]}
+
+        created = self._create_job(target="cliente", persist_in_session="true")
+        response = self.client.get(created["status_url"])
+
+        payload = response.json()
+        self.assertTrue(payload["done"])
+        self.assertEqual(payload["status"], PassportOcrJobStatus.DONE)
+        self.assertEqual(payload["fields"]["passport_number"], "AB1234567")
+        self.assertIn("passport_ocr_cliente", self.client.session)
+        job = PassportOcrJob.objects.get(job_id=created["job_id"])
+        self.assertIsNone(job.document)
+        self.assertEqual(mock_extract.call_args.args[0].read(), b"fake-bytes")
+
+    @patch(
+        "system.services.passport_ocr_jobs.extract_passport_data_from_document",
+        side_effect=PassportExtractionError("Não foi possível renderizar as páginas do PDF."),
+    )
+    def test_job_com_falha_retorna_erro(self, mock_extract, mock_enqueue):
+        created = self._create_job()
+
+        payload = self.client.get(created["status_url"]).json()
+
+        self.assertFalse(payload["success"])
+        self.assertEqual(payload["status"], PassportOcrJobStatus.FAILED)
+        self.assertIn("renderizar", payload["error"])
+
+    def test_status_de_job_de_outro_usuario_retorna_404(self, mock_enqueue):
+        other = User.objects.create_user(username="outro@test.com", password="senha-segura-123")
+        job = PassportOcrJob.objects.create(created_by=other, filename="p.png", document=b"x")
+
+        response = self.client.get(reverse("system:api_passport_job_status", args=[job.job_id]))
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch("system.services.passport_ocr_jobs.extract_passport_data_from_document")
+    def test_job_travado_volta_para_fila_ao_consultar_status(self, mock_extract, mock_enqueue):
+        mock_extract.return_value = {"fields": {"passport_number": "AB1234567"}, "warnings": []}
+        job = PassportOcrJob.objects.create(
+            created_by=self.user,
+            filename="p.png",
+            document=b"x",
+            status=PassportOcrJobStatus.RUNNING,
+            started_at=timezone.now() - timedelta(hours=1),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("system:api_passport_job_status", args=[job.job_id]))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, PassportOcrJobStatus.DONE)
+        self.assertEqual(job.attempts, 1)
+
+    @patch("system.services.passport_ocr_jobs.extract_passport_data_from_document")
+    def test_job_que_derruba_o_worker_falha_apos_esgotar_tentativas(self, mock_extract, mock_enqueue):
+        job = PassportOcrJob.objects.create(
+            created_by=self.user,
+            filename="p.png",
+            document=b"x",
+            status=PassportOcrJobStatus.RUNNING,
+            started_at=timezone.now() - timedelta(hours=1),
+            attempts=3,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            payload = self.client.get(reverse("system:api_passport_job_status", args=[job.job_id])).json()
+
+        self.assertEqual(payload["status"], PassportOcrJobStatus.FAILED)
+        mock_extract.assert_not_called()
+        job.refresh_from_db()
+        self.assertIsNone(job.document)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_job_pendente_so_e_reenviado_uma_vez_por_intervalo(self, mock_enqueue):
+        job = PassportOcrJob.objects.create(
+            created_by=self.user,
+            filename="p.png",
+            document=b"x",
+            queued_at=timezone.now() - timedelta(hours=1),
+        )
+
+        self.assertEqual(_requeue_stale_jobs(), [job.pk])
+        self.assertEqual(_requeue_stale_jobs(), [])
+
+    def test_limpeza_remove_apenas_jobs_finalizados_antigos(self, mock_enqueue):
+        old = timezone.now() - timedelta(days=30)
+        expired = PassportOcrJob.objects.create(
+            created_by=self.user, filename="a.png", status=PassportOcrJobStatus.DONE, finished_at=old
+        )
+        recent = PassportOcrJob.objects.create(
+            created_by=self.user, filename="b.png", status=PassportOcrJobStatus.FAILED, finished_at=timezone.now()
+        )
+        pending = PassportOcrJob.objects.create(created_by=self.user, filename="c.png", document=b"x")
+
+        self.assertEqual(purge_finished_passport_ocr_jobs(), 1)
+
+        remaining = set(PassportOcrJob.objects.values_list("pk", flat=True))
+        self.assertEqual(remaining, {recent.pk, pending.pk})
+        self.assertNotIn(expired.pk, remaining)
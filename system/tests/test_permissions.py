@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from system.models import ConsultancyUser, Module, Profile
+from system.services.permissions import get_profile_permissions, user_has_module_access
+from system.tests import TEST_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ProfilePermissionMatrixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.partners = Module.objects.create(name="Parceiros", slug="parceiros")
+        self.financial = Module.objects.create(name="Financeiros", slug="financeiros")
+        self.profile = Profile.objects.create(name="Atendente", can_view=True)
+        self.profile.modules.add(self.partners)
+
+    def _profile(self):
+        # Instância nova a cada leitura, como a que chega pelo select_related do consultor.
+        return Profile.objects.get(pk=self.profile.pk)
+
+    def test_matriz_fica_em_cache(self):
+        profile = self._profile()
+        with self.assertNumQueries(1):
+            matrix = get_profile_permissions(profile)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_profile_permissions(profile), matrix)
+
+        self.assertEqual(matrix["modules"], {"Parceiros"})
+        self.assertEqual(matrix["module_slugs"], {"parceiros"})
+        self.assertFalse(matrix["is_admin"])
+        self.assertTrue(matrix["can_view"])
+
+    def test_alteracao_dos_modulos_invalida(self):
+        get_profile_permissions(self._profile())
+        self.profile.modules.add(self.financial)
+        self.assertIn("Financeiros", get_profile_permissions(self._profile())["modules"])
+
+        self.financial.profiles.remove(self.profile)
+        self.assertNotIn("Financeiros", get_profile_permissions(self._profile())["modules"])
+
+        self.partners.profiles.clear()
+        self.assertEqual(get_profile_permissions(self._profile())["modules"], frozenset())
+
+    def test_alteracao_vale_para_outros_workers_sem_apagar_o_cache(self):
+        # O perfil lido antes da alteração faz o papel de outro worker: a chave antiga segue no
+        # cache, mas o perfil relido do banco tem outro updated_at e recompila a matriz.
+        stale = self._profile()
+        get_profile_permissions(stale)
+        self.profile.modules.add(self.financial)
+
+        self.assertNotIn("Financeiros", get_profile_permissions(stale)["modules"])
+        self.assertIn("Financeiros", get_profile_permissions(self._profile())["modules"])
+
+    def test_salvar_perfil_ou_modulo_invalida(self):
+        get_profile_permissions(self._profile())
+        self.profile.can_create = self.profile.can_update = self.profile.can_delete = True
+        self.profile.save()
+        self.assertTrue(get_profile_permissions(self._profile())["is_admin"])
+
+        self.partners.slug = "parceiros-comerciais"
+        self.partners.save()
+        self.assertEqual(get_profile_permissions(self._profile())["module_slugs"], {"parceiros-comerciais"})
+
+        self.partners.delete()
+        self.assertEqual(get_profile_permissions(self._profile())["modules"], frozenset())
+
+    def test_acesso_a_modulo_usa_a_matriz(self):
+        user = User.objects.create_user(username="atendente@test.com", password="senha-segura-123")
+        consultant = ConsultancyUser.objects.create(
+            name="Atendente", email="atendente@test.com", profile=self._profile(), password="!"
+        )
+        get_profile_permissions(consultant.profile)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(user_has_module_access(user, consultant, "Parceiros"))
+            self.assertFalse(user_has_module_access(user, consultant, "Financeiros"))
+
+    def test_menu_lateral_segue_os_modulos_do_perfil(self):
+        user = User.objects.create_user(username="atendente@test.com", password="senha-segura-123")
+        ConsultancyUser.objects.create(name="Atendente", email="atendente@test.com", profile=self.profile, password="!")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("system:home"))
+
+        self.assertContains(response, f'href="{reverse("system:home_partners")}"')
+        self.assertNotContains(response, f'href="{reverse("system:home_financial")}"')
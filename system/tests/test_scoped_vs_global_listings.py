@@ -1,7 +1,7 @@
 from datetime import date
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from system.models import (
@@ -15,10 +15,12 @@ from system.models import (
     VisaForm,
     VisaType,
 )
+from system.tests import TEST_CACHES
 
 User = get_user_model()
 
 
+@override_settings(CACHES=TEST_CACHES)
 class ScopedVsGlobalListingsTests(TestCase):
     def setUp(self):
         self.perfil_atendente = Profile.objects.create(
@@ -1,9 +1,66 @@
+import json
+import tempfile
+from io import StringIO
+from datetime import datetime
 from decimal import Decimal
+from pathlib import Path
 from types import SimpleNamespace
+from unittest import mock
 
-from django.test import SimpleTestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 
-from system.management.commands.seed_legacy import Command, parse_decimal, parse_decimal_strict
+from system.management.commands.seed_legacy import (
+    LEGACY_DELTA_TABLES,
+    LEGACY_QUERIES,
+    Command,
+    parse_decimal,
+    parse_decimal_strict,
+)
+from system.models import (
+    ConsultancyClient,
+    ConsultancyUser,
+    LegacyImportCheckpoint,
+    LegacyRecordLink,
+    LegacySyncState,
+    Process,
+    ProcessStage,
+    ProcessStatus,
+    Profile,
+)
+
+
+def build_legacy_fixture(total_clients=3):
+    legacy = {key: [] for key in LEGACY_QUERIES}
+    legacy["pais"] = [{"id": 1, "nome": "Canada", "sigla": "CA"}]
+    legacy["tipo_vistos"] = [{"id": 1, "nome": "Turismo", "observacao": ""}]
+    legacy["pais_tipo_visto"] = [{"pais_id": 1, "tipo_visto_id": 1}]
+    for index in range(1, total_clients + 1):
+        legacy["clientes"].append(
+            {
+                "id": index,
+                "nome": f"Cliente {index}",
+                "sobrenome": "Legado",
+                "cpf": f"{index:011d}",
+                "nascimento": "1990-01-01",
+                "updated_at": "2026-03-01 10:00:00",
+            }
+        )
+        legacy["processos"].append(
+            {
+                "id": 100 + index,
+                "cliente_id": index,
+                "pais_id": 1,
+                "tipo_visto_id": 1,
+                "data_prevista_viagem": "2030-01-01",
+                "data_prevista_retorno": "2030-01-10",
+                "updated_at": "2026-03-01 10:00:00",
+            }
+        )
+    return legacy
 
 
 class SeedLegacyHelpersTests(SimpleTestCase):
@@ -125,3 +182,270 @@ class SeedLegacyHelpersTests(SimpleTestCase):
 
         self.assertEqual(situacao_by_id[1], "preencher ficha cadastral")
         self.assertEqual([int(item["id"]) for item in cronograma_by_process[7]], [10, 20])
+
+    def test_expand_process_group_ids_inclui_grupo_inteiro(self):
+        processo_clientes = [
+            {"id_processo_cliente": 2, "id_processo_principal": 1},
+            {"id_processo_cliente": 3, "id_processo_principal": 1},
+            {"id_processo_cliente": 5, "id_processo_principal": 4},
+        ]
+
+        expanded = Command()._expand_process_group_ids(processo_clientes, {3})
+
+        self.assertEqual(expanded, {1, 2, 3})
+
+    def test_resolve_client_cpfs_mantem_primeiro_cpf_duplicado(self):
+        rows = [
+            {"id": 1, "cpf": "123.456.789-01"},
+            {"id": 2, "cpf": "12345678901"},
+            {"id": 3, "cpf": ""},
+        ]
+
+        resolved = Command()._resolve_client_cpfs(rows)
+
+        self.assertEqual(resolved[1][0], "123.456.789-01")
+        self.assertNotEqual(resolved[2][0], resolved[1][0])
+        self.assertIn("CPF sintetico gerado", resolved[2][1][0])
+        self.assertIn("CPF ausente", resolved[3][1][0])
+        self.assertIn("manteve o CPF original", resolved[1][1][0])
+
+    def test_compute_watermarks_usa_maior_updated_at_e_id(self):
+        rows = {
+            "processos": [
+                {"id": 7, "updated_at": "2026-03-10 12:00:00"},
+                {"id": 9, "updated_at": "2026-03-09 12:00:00"},
+            ],
+        }
+
+        marks = Command()._compute_watermarks(rows)
+
+        self.assertEqual(marks["processos"], (datetime(2026, 3, 10, 12, 0), 9))
+        self.assertEqual(marks["entradas"], (None, 0))
+        self.assertEqual(set(marks), set(LEGACY_DELTA_TABLES))
+
+
+class SeedLegacyWatermarkTests(TestCase):
+    def test_save_sync_watermarks_nunca_retrocede(self):
+        command = Command()
+        command._save_sync_watermarks({"processos": (datetime(2026, 3, 10, 12, 0), 9)})
+        command._save_sync_watermarks({"processos": (datetime(2026, 3, 1, 12, 0), 4)})
+
+        state = LegacySyncState.objects.get(table_name="processos")
+        self.assertEqual(state.last_id, 9)
+        self.assertEqual(state.last_updated_at.day, 10)
+
+    def test_resolve_delta_watermarks_exige_importacao_completa(self):
+        from django.core.management.base import CommandError
+
+        with self.assertRaises(CommandError):
+            Command()._resolve_delta_watermarks({"incremental": True})
+
+
+class SeedLegacyCheckpointTests(TestCase):
+    def setUp(self):
+        profile = Profile.objects.create(name="Assessor Legado")
+        ConsultancyUser.objects.create(
+            name="Assessor Legado",
+            email="assessor.legado@test.com",
+            profile=profile,
+            password="!",
+        )
+        self.legacy = build_legacy_fixture()
+
+    def test_resume_continua_do_ultimo_lote_concluido(self):
+        original_import_processes = Command._import_processes
+        calls = []
+
+        def failing_import_processes(command, *args, **kwargs):
+            calls.append(kwargs["rows"])
+            if len(calls) == 2:
+                raise RuntimeError("falha simulada")
+            return original_import_processes(command, *args, **kwargs)
+
+        with mock.patch.object(Command, "_load_legacy_data", return_value=self.legacy):
+            with mock.patch.object(Command, "_import_processes", failing_import_processes):
+                with self.assertRaises(RuntimeError):
+                    call_command("seed_legacy", batch_size=2, stdout=mock.MagicMock())
+
+            checkpoint = LegacyImportCheckpoint.objects.get(phase="processes")
+            self.assertFalse(checkpoint.is_complete)
+            self.assertEqual(checkpoint.last_key, 102)
+            self.assertEqual(Process.objects.count(), 2)
+            self.assertTrue(LegacyImportCheckpoint.objects.get(phase="clients").is_complete)
+
+            with mock.patch.object(Command, "_import_clients", side_effect=AssertionError("fase repetida")):
+                call_command("seed_legacy", batch_size=2, resume=True, stdout=mock.MagicMock())
+
+        self.assertEqual(ConsultancyClient.objects.count(), 3)
+        self.assertEqual(Process.objects.count(), 3)
+        self.assertTrue(LegacyImportCheckpoint.objects.get(phase="processes").is_complete)
+        self.assertEqual(LegacyImportCheckpoint.objects.get(phase="processes").rows_written, 3)
+
+    def test_resume_de_dependentes_continua_do_ultimo_lote(self):
+        legacy = build_legacy_fixture(5)
+        legacy["familiares_clientes"] = [
+            {"id": 10 + index, "id_cliente_principal": 1, "id_cliente_familiar": index} for index in range(2, 6)
+        ]
+        original_import_dependents = Command._import_dependents
+        calls = []
+
+        def failing_import_dependents(command, *args, **kwargs):
+            calls.append([row["id"] for row in kwargs["rows"]])
+            if len(calls) == 2:
+                raise RuntimeError("falha simulada")
+            return original_import_dependents(command, *args, **kwargs)
+
+        with mock.patch.object(Command, "_load_legacy_data", return_value=legacy):
+            with mock.patch.object(Command, "_import_dependents", failing_import_dependents):
+                with self.assertRaises(RuntimeError):
+                    call_command("seed_legacy", batch_size=2, stdout=mock.MagicMock())
+
+            checkpoint = LegacyImportCheckpoint.objects.get(phase="dependents")
+            self.assertEqual(checkpoint.last_key, 13)
+            self.assertEqual(ConsultancyClient.objects.exclude(primary_client=None).count(), 2)
+
+            with mock.patch.object(Command, "_import_dependents", failing_import_dependents):
+                call_command("seed_legacy", batch_size=2, resume=True, stdout=mock.MagicMock())
+
+        self.assertEqual(calls, [[12, 13], [14, 15], [14, 15]])
+        self.assertEqual(ConsultancyClient.objects.exclude(primary_client=None).count(), 4)
+        self.assertEqual(LegacyImportCheckpoint.objects.get(phase="dependents").rows_written, 4)
+
+    def test_importacao_sem_resume_reinicia_checkpoints(self):
+        LegacyImportCheckpoint.objects.create(phase="clients", is_complete=True, last_key=3)
+
+        with mock.patch.object(Command, "_load_legacy_data", return_value=self.legacy):
+            call_command("seed_legacy", stdout=mock.MagicMock())
+
+        self.assertEqual(ConsultancyClient.objects.count(), 3)
+        self.assertEqual(LegacyImportCheckpoint.objects.get(phase="clients").rows_written, 3)
+
+    def test_reimportacao_reaproveita_registros_pelos_vinculos_legados(self):
+        with mock.patch.object(Command, "_load_legacy_data", return_value=self.legacy):
+            call_command("seed_legacy", stdout=mock.MagicMock())
+            client = ConsultancyClient.objects.get(cpf__contains="000.000.000-01")
+            client.first_name = "Renomeado"
+            client.cpf = "999.999.999-99"
+            client.save()
+            call_command("seed_legacy", stdout=mock.MagicMock())
+
+        client.refresh_from_db()
+        self.assertEqual(client.first_name, "Cliente 1")
+        self.assertEqual(ConsultancyClient.objects.count(), 3)
+        self.assertEqual(Process.objects.count(), 3)
+        self.assertFalse(ConsultancyClient.objects.exclude(notes="").exists())
+        self.assertFalse(Process.objects.exclude(notes="").exists())
+        self.assertEqual(
+            LegacyRecordLink.objects.filter(model="system.process", legacy_table="processos").count(),
+            3,
+        )
+        self.assertEqual(
+            LegacyRecordLink.objects.get(model="system.consultancyclient", object_id=client.pk).legacy_id,
+            1,
+        )
+
+    def test_dry_run_reverte_gravacoes(self):
+        with mock.patch.object(Command, "_load_legacy_data", return_value=self.legacy):
+            call_command("seed_legacy", dry_run=True, stdout=mock.MagicMock())
+
+        self.assertEqual(ConsultancyClient.objects.count(), 0)
+        self.assertEqual(Process.objects.count(), 0)
+        self.assertFalse(LegacyImportCheckpoint.objects.exists())
+        self.assertFalse(LegacySyncState.objects.exists())
+
+    def test_validacao_com_divergencias_nao_avanca_marca_dagua(self):
+        divergent = {
+            "stage_mismatches": ["Processo 101: etapa divergente"],
+            "partner_mismatches": [],
+            "form_mismatches": [],
+        }
+
+        with mock.patch.object(Command, "_load_legacy_data", return_value=self.legacy):
+            with mock.patch.object(Command, "_strict_sql_orm_validation", return_value=divergent):
+                with self.assertRaises(CommandError):
+                    call_command("seed_legacy", stdout=mock.MagicMock())
+
+        self.assertEqual(ConsultancyClient.objects.count(), 3)
+        self.assertFalse(LegacySyncState.objects.exists())
+
+    def test_delta_lista_linhas_excluidas_no_legado(self):
+        stdout = StringIO()
+        command = Command(stdout=stdout)
+
+        command._warn_deleted_rows({"clientes": [7, 3], "processos": []})
+
+        self.assertIn("2 linha(s) de clientes excluida(s) no legado", stdout.getvalue())
+        self.assertIn("IDs: 3, 7", stdout.getvalue())
+        self.assertNotIn("processos", stdout.getvalue())
+
+    def test_profile_json_registra_metricas_por_fase(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report_path = Path(tmp_dir) / "perfil.json"
+            with mock.patch.object(Command, "_load_legacy_data", return_value=self.legacy):
+                call_command(
+                    "seed_legacy",
+                    dry_run=True,
+                    profile_json=str(report_path),
+                    stdout=mock.MagicMock(),
+                )
+            report = json.loads(report_path.read_text(encoding="utf-8"))
+
+        phases = {record["phase"]: record for record in report["phases"]}
+        self.assertTrue(report["dry_run"])
+        self.assertIn("countries", phases)
+        self.assertIn("form_answers", phases)
+        self.assertEqual(phases["clients"]["rows_in"], 3)
+        self.assertEqual(phases["clients"]["rows_written"], 3)
+        self.assertGreater(phases["clients"]["sql_statements"], 0)
+        self.assertGreater(phases["validation"]["sql_statements"], 0)
+        self.assertIn("wall_seconds", phases["processes"])
+
+
+class SeedLegacyStrictValidationTests(TestCase):
+    def setUp(self):
+        profile = Profile.objects.create(name="Assessor Legado")
+        ConsultancyUser.objects.create(
+            name="Assessor Legado",
+            email="assessor.legado@test.com",
+            profile=profile,
+            password="!",
+        )
+        ProcessStatus.objects.create(name="Preencher ficha cadastral", order=1)
+        ProcessStatus.objects.create(name="Agendar entrevista", order=2)
+
+    def _import(self, legacy):
+        command = Command()
+        with mock.patch.object(Command, "_load_legacy_data", return_value=legacy):
+            with mock.patch.object(Command, "_print_validation_report") as report:
+                call_command("seed_legacy", stdout=mock.MagicMock())
+        kwargs = report.call_args.kwargs
+        return command, kwargs["client_map"], kwargs["process_map"]
+
+    def _count_validation_queries(self, total_clients):
+        legacy = build_legacy_fixture(total_clients)
+        for row in legacy["processos"]:
+            row["percet_conclusao"] = "50"
+        command, client_map, process_map = self._import(legacy)
+        with CaptureQueriesContext(connection) as queries:
+            report = command._strict_sql_orm_validation(legacy, client_map, process_map)
+        self.assertEqual(report["stage_mismatches"], [])
+        return len(queries)
+
+    def test_validacao_usa_numero_fixo_de_consultas(self):
+        small = self._count_validation_queries(2)
+        ProcessStage.objects.all().delete()
+        Process.objects.all().delete()
+        ConsultancyClient.objects.all().delete()
+        large = self._count_validation_queries(6)
+
+        self.assertEqual(small, large)
+
+    def test_validacao_detecta_etapa_divergente(self):
+        legacy = build_legacy_fixture(2)
+        command, client_map, process_map = self._import(legacy)
+        ProcessStage.objects.filter(process=process_map[101], order=1).update(completed=True)
+
+        report = command._strict_sql_orm_validation(legacy, client_map, process_map)
+
+        self.assertEqual(len(report["stage_mismatches"]), 1)
+        self.assertIn("Processo 101", report["stage_mismatches"][0])
@@ -31,6 +31,8 @@ urlpatterns = [
     path("clientes/<int:pk>/dependentes/<int:dependent_id>/remover/",views.remove_dependent,name="remove_dependent",),
     path("api/buscar-cep/",views.api_search_zip,name="api_search_zip",),
     path("api/extrair-passaporte/",views.api_extract_passport,name="api_extract_passport",),
+    path("api/extrair-passaporte/jobs/",views.api_create_passport_job,name="api_create_passport_job",),
+    path("api/extrair-passaporte/jobs/<uuid:job_id>/",views.api_passport_job_status,name="api_passport_job_status",),
     path("partners/",views.home_partners,name="home_partners",),
     path("partners/criar/",views.create_partner,name="create_partner",),
     path("partners/listar/",views.list_partners,name="list_partners",),
@@ -112,6 +114,8 @@ urlpatterns = [
     path("administracao/modulos/criar/",views.create_module,name="create_module",),
     path("administracao/modulos/<int:pk>/editar/",views.edit_module,name="edit_module",),
     path("administracao/modulos/<int:pk>/excluir/",views.delete_module,name="delete_module",),
+    path("administracao/cep/fontes/",views.api_cep_provider_stats,name="api_cep_provider_stats",),
+    path("administracao/ocr-passaporte/cache/",views.api_passport_ocr_cache_stats,name="api_passport_ocr_cache_stats",),
                      
     path("api/cliente-info/", views.api_client_info, name="api_client_info"),
     path("perguntas/<int:pk>/editar/",views.edit_question,name="edit_question",),
@@ -1,4 +1,6 @@
 from .admin_views import (
+    api_cep_provider_stats,
+    api_passport_ocr_cache_stats,
     create_module,
     create_profile,
     create_user,
@@ -26,6 +28,8 @@ from .client_views import (
     add_dependent,
     api_search_zip,
     api_extract_passport,
+    api_create_passport_job,
+    api_passport_job_status,
     api_client_data,
     register_client_view,
     register_dependent,
@@ -135,6 +139,8 @@ from .travel_views import (
 __all__ = (
     "api_search_zip",
     "api_extract_passport",
+    "api_create_passport_job",
+    "api_passport_job_status",
     "api_client_data",
     "api_client_info",
     "create_reminder",
@@ -191,6 +197,8 @@ __all__ = (
     "delete_trip",
     "home",
     "home_admin",
+    "api_cep_provider_stats",
+    "api_passport_ocr_cache_stats",
     "home_clients",
     "home_financial",
     "home_destination_countries",
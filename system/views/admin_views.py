@@ -1,18 +1,20 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_http_methods
 
 from system.forms import ConsultancyUserForm, ModuleForm, ProfileForm
 from system.models import ConsultancyUser, Module, Profile
-from system.views.client_views import get_user_consultant, user_can_manage_all
+from system.services.cep import cep_provider_stats
+from system.services.passport_ocr_cache import passport_ocr_cache_stats
 
 
 @login_required
 def home_admin(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     context = {
@@ -27,8 +29,8 @@ def home_admin(request):
 
 @login_required
 def list_users(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     users = ConsultancyUser.objects.select_related("profile").order_by("name")
@@ -58,8 +60,8 @@ def list_users(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def create_user(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     if request.method == "POST":
@@ -79,8 +81,8 @@ def create_user(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def edit_user(request, pk):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     user_obj = get_object_or_404(ConsultancyUser.objects.select_related("profile"), pk=pk)
@@ -102,8 +104,7 @@ def edit_user(request, pk):
 @login_required
 @require_http_methods(["POST"])
 def delete_user(request, pk):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     user_obj = get_object_or_404(ConsultancyUser, pk=pk)
@@ -115,8 +116,8 @@ def delete_user(request, pk):
 
 @login_required
 def list_profiles(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     profiles = Profile.objects.prefetch_related("modules", "users").order_by("name")
@@ -139,8 +140,8 @@ def list_profiles(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def create_profile(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     if request.method == "POST":
@@ -160,8 +161,8 @@ def create_profile(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def edit_profile(request, pk):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     profile = get_object_or_404(Profile.objects.prefetch_related("modules", "users"), pk=pk)
@@ -183,8 +184,7 @@ def edit_profile(request, pk):
 @login_required
 @require_http_methods(["POST"])
 def delete_profile(request, pk):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     profile = get_object_or_404(Profile, pk=pk)
@@ -204,8 +204,8 @@ def delete_profile(request, pk):
 
 @login_required
 def list_modules(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     modules = Module.objects.prefetch_related("profiles").order_by("order", "name")
@@ -228,8 +228,8 @@ def list_modules(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def create_module(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     if request.method == "POST":
@@ -249,8 +249,8 @@ def create_module(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def edit_module(request, pk):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     module = get_object_or_404(Module.objects.prefetch_related("profiles"), pk=pk)
@@ -272,8 +272,7 @@ def edit_module(request, pk):
 @login_required
 @require_http_methods(["POST"])
 def delete_module(request, pk):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     module = get_object_or_404(Module, pk=pk)
@@ -289,3 +288,19 @@ def delete_module(request, pk):
     module.delete()
     messages.success(request, f"Módulo {module_name} excluído com sucesso.")
     return redirect("system:list_modules")
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_cep_provider_stats(request):
+    if not request.permissions.can_manage_all:
+        raise PermissionDenied
+    return JsonResponse({"providers": cep_provider_stats()})
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_passport_ocr_cache_stats(request):
+    if not request.permissions.can_manage_all:
+        raise PermissionDenied
+    return JsonResponse({"cache": passport_ocr_cache_stats()})
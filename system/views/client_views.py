@@ -21,6 +21,7 @@ from system.models import (
     ClientStepField,
     ConsultancyClient,
     FormAnswer,
+    PassportOcrJobStatus,
     Process,
     Reminder,
     Trip,
@@ -28,9 +29,11 @@ from system.models import (
     VisaForm,
 )
 from system.models.financial_models import FinancialRecord, FinancialStatus
-from system.services.legacy_markers import extract_legacy_meta, strip_legacy_meta, upsert_legacy_meta
 from system.services.cep import fetch_address_by_zip
+from system.services.legacy_links import LEGACY_CLIENT_TABLE, annotate_legacy_status, get_legacy_link
 from system.services.passport_ocr import PassportExtractionError, extract_passport_data_from_document
+from system.services.passport_ocr_jobs import create_passport_ocr_job, get_passport_ocr_job
+from system.services.permissions import get_user_consultant, user_can_manage_all, user_has_module_access
 from system.models import ConsultancyUser
 
 User = get_user_model()
@@ -185,14 +188,14 @@ def _get_client_form_status(client: ConsultancyClient) -> dict:
 
 
 def _legacy_meta_from_client(client: ConsultancyClient) -> dict:
-    meta = extract_legacy_meta(client.notes)
-    if not meta.get("imported"):
+    if hasattr(client, "legacy_status"):
+        status, issues = client.legacy_status, []
+    else:
+        link = get_legacy_link(client, LEGACY_CLIENT_TABLE)
+        status, issues = (link.status, link.issues) if link else (None, [])
+    if not status:
         return {"imported": False, "status": "", "issues": []}
-    return {
-        "imported": True,
-        "status": meta.get("status", "ok"),
-        "issues": meta.get("issues", []),
-    }
+    return {"imported": True, "status": status, "issues": issues}
 
 
 def list_clients(user: User) -> QuerySet[ConsultancyClient]:
@@ -227,35 +230,6 @@ def _list_clients_full_scope(user: User) -> QuerySet[ConsultancyClient]:
     return queryset
 
 
-def user_can_manage_all(user: User, consultant: ConsultancyUser | None) -> bool:
-    if not consultant:
-        return bool(user.is_superuser or user.is_staff)
-
-    profile = consultant.profile
-    is_admin_profile = (profile.name or "").strip().lower() == "administrador"
-    has_full_crud = (
-        profile.can_create
-        and profile.can_view
-        and profile.can_update
-        and profile.can_delete
-    )
-
-    return (
-        user.is_superuser
-        or user.is_staff
-        or is_admin_profile
-        or has_full_crud
-    )
-
-
-def user_has_module_access(user: User, consultant: ConsultancyUser | None, module_name: str) -> bool:
-    if user_can_manage_all(user, consultant):
-        return True
-    if not consultant:
-        return False
-    return consultant.profile.modules.filter(name=module_name).exists()
-
-
 def user_can_edit_client(user: User, consultant: ConsultancyUser | None, client) -> bool:
     if user_can_manage_all(user, consultant):
         return True
@@ -265,26 +239,6 @@ def user_can_edit_client(user: User, consultant: ConsultancyUser | None, client)
     return created_by_id is not None and created_by_id == getattr(user, "id", None)
 
 
-def get_user_consultant(user: User) -> ConsultancyUser | None:
-    if not user or not user.username:
-        return None
-
-    consultant = (
-        ConsultancyUser.objects.select_related("profile")
-        .filter(email__iexact=user.username.strip(), is_active=True)
-        .first()
-    )
-
-    if not consultant and user.email:
-        consultant = (
-            ConsultancyUser.objects.select_related("profile")
-            .filter(email__iexact=user.email.strip(), is_active=True)
-            .first()
-        )
-
-    return consultant
-
-
 @login_required
 def delete_client(request, pk: int):
     if request.method != "POST":
@@ -295,9 +249,7 @@ def delete_client(request, pk: int):
         pk=pk,
     )
 
-    consultant = get_user_consultant(request.user)
-
-    if not user_can_manage_all(request.user, consultant):
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     client.delete()
@@ -307,8 +259,8 @@ def delete_client(request, pk: int):
 
 @login_required
 def home_clients(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     user_profile = consultant.profile.name if consultant and consultant.profile else ("Administrador" if request.user.is_superuser else None)
 
@@ -329,6 +281,7 @@ def home_clients(request):
         my_clients = base_qs.none()
 
     my_clients, filters = _apply_client_filters(my_clients, request, include_advisor=False)
+    my_clients = annotate_legacy_status(my_clients, LEGACY_CLIENT_TABLE)
 
     def _build_item(client):
         financial_status = _get_client_financial_status(client)
@@ -395,12 +348,13 @@ def home_clients(request):
 
 @login_required
 def list_clients_view(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     clients = _list_clients_full_scope(request.user).prefetch_related("dependents", "trips")
 
     clients, filters = _apply_client_filters(clients, request, include_advisor=True)
+    clients = annotate_legacy_status(clients, LEGACY_CLIENT_TABLE)
 
     def _build_item(client):
         financial_status = _get_client_financial_status(client)
@@ -1176,7 +1130,7 @@ def _get_dependent_advisor_id(request, client, temp_data):
             advisor_id = None
 
     if not advisor_id:
-        if consultant := get_user_consultant(request.user):
+        if consultant := request.permissions.consultant:
             advisor_id = consultant.pk
 
     return advisor_id
@@ -1506,7 +1460,7 @@ def _prepare_dependents_context(request, current_step, temp_client, steps, conte
             except (ValueError, TypeError):
                 advisor_id = None
         if not advisor_id:
-            if consultant := get_user_consultant(request.user):
+            if consultant := request.permissions.consultant:
                 advisor_id = consultant.pk
 
     context['first_stage'] = first_step
@@ -1699,7 +1653,7 @@ def _create_and_validate_client_from_db(request) -> ConsultancyClient:
 
     if not client.assigned_advisor_id:
         logger.warning("assigned_advisor não definido, tentando definir...")
-        if consultant := get_user_consultant(request.user):
+        if consultant := request.permissions.consultant:
             client.assigned_advisor = consultant
             client.save(update_fields=['assigned_advisor'])
             logger.info(f"assigned_advisor definido: {consultant.name}")
@@ -1881,7 +1835,7 @@ def _process_post_client_registration(request, current_step, steps, step_field_n
 def register_client_view(request):
     logger.info(f"View register_client_view chamada - Método: {request.method}, URL: {request.path}")
 
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
     _clear_finalization_flags(request)
 
     steps = ClientRegistrationStep.objects.filter(is_active=True).order_by("order", "name")
@@ -1927,7 +1881,7 @@ def register_client_view(request):
 
 @login_required
 def view_client(request, pk: int):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
     client = get_object_or_404(
         ConsultancyClient.objects.select_related(
             "assigned_advisor",
@@ -1936,7 +1890,7 @@ def view_client(request, pk: int):
         pk=pk,
     )
 
-    can_view = user_can_manage_all(request.user, consultant) or (
+    can_view = request.permissions.can_manage_all or (
         consultant and client.assigned_advisor_id == consultant.pk
         or client.created_by == request.user
     )
@@ -1988,10 +1942,10 @@ def view_client(request, pk: int):
         "processes": processes,
         "financial_records": financial_records,
         "financial_status": financial_status,
-        "clean_notes": strip_legacy_meta(client.notes),
+        "clean_notes": client.notes,
         "legacy_meta": _legacy_meta_from_client(client),
         "user_profile": consultant.profile.name if consultant else None,
-        "can_manage_all": user_can_manage_all(request.user, consultant),
+        "can_manage_all": request.permissions.can_manage_all,
         "can_edit": can_view,
         "reminders": reminders,
         "linked_clients": linked_clients,
@@ -2002,7 +1956,7 @@ def view_client(request, pk: int):
 
 @login_required
 def edit_client_view(request, pk: int):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
     client = get_object_or_404(
         ConsultancyClient.objects.select_related(
             "assigned_advisor",
@@ -2010,7 +1964,7 @@ def edit_client_view(request, pk: int):
         pk=pk,
     )
 
-    can_edit = user_can_manage_all(request.user, consultant) or (
+    can_edit = request.permissions.can_manage_all or (
         consultant and client.assigned_advisor_id == consultant.pk
         or client.created_by == request.user
     )
@@ -2019,19 +1973,12 @@ def edit_client_view(request, pk: int):
         raise PermissionDenied
 
     if request.method == "POST":
-        legacy_meta = extract_legacy_meta(client.notes)
         form = ConsultancyClientForm(data=request.POST, user=request.user, instance=client)
         form.fields["password"].required = False
         form.fields["confirm_password"].required = False
 
         if form.is_valid():
             updated_client = form.save()
-            if legacy_meta.get("imported"):
-                updated_client.notes = upsert_legacy_meta(
-                    updated_client.notes,
-                    legacy_meta,
-                )
-                updated_client.save(update_fields=["notes", "updated_at"])
             messages.success(request, f"{updated_client.first_name} atualizado com sucesso.")
             return redirect("system:list_clients_view")
         messages.error(request, "Não foi possível atualizar o cliente. Verifique os campos.")
@@ -2043,8 +1990,6 @@ def edit_client_view(request, pk: int):
         form.fields["confirm_password"].widget.attrs["placeholder"] = "Deixe em branco para manter a senha atual"
         if client.referring_partner:
             form.fields["referring_partner"].initial = client.referring_partner.pk
-        if "notes" in form.fields:
-            form.fields["notes"].initial = strip_legacy_meta(client.notes)
 
     context = {
         "form": form,
@@ -2102,18 +2047,50 @@ def _mask_passport_for_log(passport_number: str | None) -> str:
     return f"***{cleaned[-3:]}"
 
 
-@login_required
-@require_http_methods(["POST"])
-def api_extract_passport(request):
+def _validate_passport_upload(request):
     document = request.FILES.get("documento")
     if not document:
-        return JsonResponse({"success": False, "error": "Envie um documento para extração."}, status=400)
+        return None, JsonResponse({"success": False, "error": "Envie um documento para extração."}, status=400)
 
     if document.size > 10 * 1024 * 1024:
-        return JsonResponse({"success": False, "error": "Arquivo muito grande. Limite de 10MB."}, status=400)
+        return None, JsonResponse({"success": False, "error": "Arquivo muito grande. Limite de 10MB."}, status=400)
+    return document, None
 
+
+def _passport_upload_options(request):
     target = request.POST.get("target", "client").strip().lower() or "client"
     persist_in_session = request.POST.get("persist_in_session", "false").lower() == "true"
+    return target, persist_in_session
+
+
+def _persist_passport_fields_in_session(request, target, fields):
+    request.session[f"passport_ocr_{target}"] = fields
+    if target == "client":
+        temp_data = request.session.get("client_temp_data", {})
+        temp_data.update({k: v for k, v in fields.items() if v})
+        request.session["client_temp_data"] = temp_data
+    request.session.modified = True
+
+
+def _log_passport_extraction(target, fields, pipeline=None):
+    logger.info(
+        "OCR passaporte concluído target=%s numero=%s campos=%s estagio=%s cache=%s",
+        target,
+        _mask_passport_for_log(fields.get("passport_number")),
+        ",".join(sorted(fields.keys())),
+        (pipeline or {}).get("stage") or "-",
+        (pipeline or {}).get("cache") or "-",
+    )
+
+
+@login_required
+@require_http_methods(["POST"])
+def api_extract_passport(request):
+    document, error_response = _validate_passport_upload(request)
+    if error_response:
+        return error_response
+
+    target, persist_in_session = _passport_upload_options(request)
 
     try:
         extraction = extract_passport_data_from_document(document)
@@ -2126,26 +2103,61 @@ def api_extract_passport(request):
     fields = extraction.get("fields", {})
     warnings = extraction.get("warnings", [])
     if persist_in_session:
-        request.session[f"passport_ocr_{target}"] = fields
-        if target == "client":
-            temp_data = request.session.get("client_temp_data", {})
-            temp_data.update({k: v for k, v in fields.items() if v})
-            request.session["client_temp_data"] = temp_data
-        request.session.modified = True
+        _persist_passport_fields_in_session(request, target, fields)
 
-    logger.info(
-        "OCR passaporte concluído target=%s numero=%s campos=%s",
-        target,
-        _mask_passport_for_log(fields.get("passport_number")),
-        ",".join(sorted(fields.keys())),
+    pipeline = extraction.get("pipeline", {})
+    _log_passport_extraction(target, fields, pipeline)
+    return JsonResponse({"success": True, "fields": fields, "warnings": warnings, "pipeline": pipeline})
+
+
+@login_required
+@require_http_methods(["POST"])
+def api_create_passport_job(request):
+    document, error_response = _validate_passport_upload(request)
+    if error_response:
+        return error_response
+
+    target, persist_in_session = _passport_upload_options(request)
+    job = create_passport_ocr_job(
+        document,
+        request.user,
+        target=target,
+        persist_in_session=persist_in_session,
     )
-    return JsonResponse({"success": True, "fields": fields, "warnings": warnings})
+    return JsonResponse(
+        {
+            "success": True,
+            "job_id": str(job.job_id),
+            "status": job.status,
+            "status_url": reverse("system:api_passport_job_status", args=[job.job_id]),
+        },
+        status=202,
+    )
+
+
+@login_required
+@require_GET
+def api_passport_job_status(request, job_id):
+    job = get_passport_ocr_job(job_id, request.user)
+    if not job:
+        return JsonResponse({"success": False, "error": "Extração não encontrada."}, status=404)
+
+    if job.status == PassportOcrJobStatus.FAILED:
+        return JsonResponse({"success": False, "status": job.status, "error": job.error})
+
+    payload = {"success": True, "status": job.status, "done": job.is_finished}
+    if job.status == PassportOcrJobStatus.DONE:
+        if job.persist_in_session:
+            _persist_passport_fields_in_session(request, job.target, job.fields)
+        _log_passport_extraction(job.target, job.fields)
+        payload.update({"fields": job.fields, "warnings": job.warnings})
+    return JsonResponse(payload)
 
 
 @login_required
 def register_dependent(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     primary_client = get_object_or_404(ConsultancyClient, pk=pk)
 
@@ -2207,8 +2219,8 @@ def register_dependent(request, pk: int):
 
 @login_required
 def add_dependent(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     primary_client = get_object_or_404(ConsultancyClient, pk=pk)
 
@@ -2247,8 +2259,8 @@ def add_dependent(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def remove_dependent(request, pk: int, dependent_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     primary_client = get_object_or_404(ConsultancyClient, pk=pk)
     dependent = get_object_or_404(ConsultancyClient, pk=dependent_id)
@@ -2271,10 +2283,10 @@ def remove_dependent(request, pk: int, dependent_id: int):
 @login_required
 @require_http_methods(["POST"])
 def create_reminder(request, client_id: int):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
     client = get_object_or_404(ConsultancyClient, pk=client_id)
 
-    allowed = user_can_manage_all(request.user, consultant) or (
+    allowed = request.permissions.can_manage_all or (
         consultant and client.assigned_advisor_id == consultant.pk
     )
     if not allowed:
@@ -2300,11 +2312,11 @@ def create_reminder(request, client_id: int):
 @login_required
 @require_http_methods(["POST"])
 def toggle_reminder(request, pk: int):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
     reminder = get_object_or_404(Reminder.objects.select_related("client"), pk=pk)
     client = reminder.client
 
-    allowed = user_can_manage_all(request.user, consultant) or (
+    allowed = request.permissions.can_manage_all or (
         consultant and client.assigned_advisor_id == consultant.pk
     )
     if not allowed:
@@ -2318,11 +2330,11 @@ def toggle_reminder(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_reminder(request, pk: int):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
     reminder = get_object_or_404(Reminder.objects.select_related("client"), pk=pk)
     client = reminder.client
 
-    allowed = user_can_manage_all(request.user, consultant) or (
+    allowed = request.permissions.can_manage_all or (
         consultant and client.assigned_advisor_id == consultant.pk
     )
     if not allowed:
@@ -14,13 +14,12 @@ from system.forms import (
     ClientRegistrationStepForm,
 )
 from system.models import ClientStepField, ClientRegistrationStep
-from system.views.client_views import get_user_consultant, user_can_manage_all
 
 
 @login_required
 def list_registration_steps(request):
-    consultant = get_user_consultant(request.user)
-    can_manage = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage = request.permissions.can_manage_all
 
     if not can_manage:
         raise PermissionDenied("Você não tem permissão para gerenciar etapas.")
@@ -45,8 +44,8 @@ def list_registration_steps(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def create_registration_step(request):
-    consultant = get_user_consultant(request.user)
-    can_manage = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage = request.permissions.can_manage_all
 
     if not can_manage:
         raise PermissionDenied("Você não tem permissão para criar etapas.")
@@ -147,8 +146,8 @@ def _process_step_update(request, form, step) -> Optional[HttpResponseRedirect]:
 
 @require_http_methods(["GET", "POST"])
 def edit_registration_step(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage = request.permissions.can_manage_all
 
     if not can_manage:
         raise PermissionDenied("Você não tem permissão para editar etapas.")
@@ -185,8 +184,7 @@ def edit_registration_step(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_registration_step(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage = user_can_manage_all(request.user, consultant)
+    can_manage = request.permissions.can_manage_all
 
     if not can_manage:
         raise PermissionDenied("Você não tem permissão para excluir etapas.")
@@ -201,8 +199,8 @@ def delete_registration_step(request, pk: int):
 @login_required
 @require_http_methods(["GET", "POST"])
 def create_step_field(request, step_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage = request.permissions.can_manage_all
 
     if not can_manage:
         raise PermissionDenied("Você não tem permissão para criar campos.")
@@ -237,8 +235,8 @@ def create_step_field(request, step_id: int):
 @login_required
 @require_http_methods(["GET", "POST"])
 def edit_step_field(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage = request.permissions.can_manage_all
 
     if not can_manage:
         raise PermissionDenied("Você não tem permissão para editar campos.")
@@ -272,8 +270,7 @@ def edit_step_field(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_step_field(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage = user_can_manage_all(request.user, consultant)
+    can_manage = request.permissions.can_manage_all
 
     if not can_manage:
         raise PermissionDenied("Você não tem permissão para excluir campos.")
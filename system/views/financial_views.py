@@ -7,7 +7,6 @@ from django.views.decorators.http import require_http_methods
 
 from system.forms import FinancialSettlementForm
 from system.models import ConsultancyClient, FinancialRecord, FinancialStatus
-from system.views.client_views import get_user_consultant, user_can_manage_all
 
 
 def _apply_financial_filters(records, request):
@@ -41,8 +40,8 @@ def _apply_financial_filters(records, request):
 
 @login_required
 def home_financial(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -86,8 +85,8 @@ def home_financial(request):
 
 @login_required
 def list_financial(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -116,8 +115,8 @@ def list_financial(request):
 @login_required
 @require_http_methods(["GET", "POST"])
 def settle_financial(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
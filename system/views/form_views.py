@@ -13,7 +13,7 @@ from system.forms import (
     FormQuestionForm,
 )
 from system.models import VisaFormStage, VisaForm, SelectOption, DestinationCountry, FormQuestion, Trip
-from system.views.client_views import list_clients, get_user_consultant, user_can_manage_all
+from system.views.client_views import list_clients
 
 
 def _read_form_filters(request):
@@ -178,8 +178,8 @@ def _build_clients_by_form_data(trip, clients_ordered, form_responses, counter=N
 
 @login_required
 def home_forms(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     user_clients = list_clients(request.user)
     client_ids = list(user_clients.values_list("pk", flat=True))
@@ -258,8 +258,8 @@ def home_forms(request):
 
 @login_required
 def list_forms(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trips = Trip.objects.select_related(
         "destination_country",
@@ -304,8 +304,8 @@ def list_forms(request):
 
 @login_required
 def home_form_types(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
     can_manage_all = True
 
@@ -329,7 +329,7 @@ def home_form_types(request):
 
 @login_required
 def create_form(request):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
 
     if request.method == "POST":
         form = VisaFormForm(data=request.POST)
@@ -354,8 +354,8 @@ def create_form(request):
 
 @login_required
 def list_form_types(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     visa_forms = (
         VisaForm.objects.select_related("visa_type", "visa_type__destination_country")
@@ -377,8 +377,8 @@ def list_form_types(request):
 
 @login_required
 def edit_form(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -424,8 +424,8 @@ def edit_form(request, pk: int):
 
 @login_required
 def create_form_stage(request, form_id: int):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     visa_form = get_object_or_404(VisaForm, pk=form_id)
@@ -450,8 +450,8 @@ def create_form_stage(request, form_id: int):
 
 @login_required
 def edit_form_stage(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     stage = get_object_or_404(VisaFormStage.objects.select_related("form"), pk=pk)
@@ -484,8 +484,7 @@ def edit_form_stage(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_form_stage(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
 
     stage = get_object_or_404(VisaFormStage.objects.select_related("form"), pk=pk)
@@ -498,8 +497,7 @@ def delete_form_stage(request, pk: int):
 
 @login_required
 def delete_form(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -514,8 +512,8 @@ def delete_form(request, pk: int):
 
 @login_required
 def create_question(request, form_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -543,8 +541,8 @@ def create_question(request, form_id: int):
 
 @login_required
 def edit_question(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -579,8 +577,7 @@ def edit_question(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_question(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -596,8 +593,8 @@ def delete_question(request, pk: int):
 
 @login_required
 def create_select_option(request, question_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -634,8 +631,8 @@ def create_select_option(request, question_id: int):
 def select_trip_client_form(request):
     from system.models import ConsultancyClient
 
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if can_manage_all:
         client_ids = list(ConsultancyClient.objects.values_list("pk", flat=True))
@@ -697,8 +694,8 @@ def select_trip_client_form(request):
 
 @login_required
 def edit_select_option(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -732,8 +729,7 @@ def edit_select_option(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_select_option(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -18,9 +18,7 @@ from system.views.client_views import (
     _get_client_financial_status,
     _get_client_form_status,
     list_clients,
-    get_user_consultant,
     user_can_edit_client,
-    user_can_manage_all,
 )
 
 
@@ -384,8 +382,8 @@ def _compute_financial_kpis(panel_filters, selected_client_id, selected_visa_id,
 
 @login_required
 def home(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
     is_admin = can_manage_all
     dashboard_limit = 10
     trip_proximity_days = 30
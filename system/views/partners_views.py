@@ -7,7 +7,6 @@ from django.views.decorators.http import require_http_methods
 
 from system.forms import PartnerForm
 from system.models import Partner
-from system.views.client_views import get_user_consultant, user_can_manage_all, user_has_module_access
 
 
 def _apply_partner_filters(partners, request):
@@ -42,10 +41,10 @@ def _apply_partner_filters(partners, request):
 
 @login_required
 def home_partners(request):
-    consultant = get_user_consultant(request.user)
-    if not user_has_module_access(request.user, consultant, "Parceiros"):
+    consultant = request.permissions.consultant
+    if not request.permissions.has_module("Parceiros"):
         raise PermissionDenied
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     partners = Partner.objects.all().order_by("company_name", "contact_name")
     partners, applied_filters = _apply_partner_filters(partners, request)
@@ -65,8 +64,8 @@ def home_partners(request):
 
 @login_required
 def create_partner(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -93,8 +92,8 @@ def create_partner(request):
 
 @login_required
 def list_partners(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     partners = Partner.objects.all().order_by("company_name", "contact_name")
     partners, applied_filters = _apply_partner_filters(partners, request)
@@ -112,8 +111,8 @@ def list_partners(request):
 
 @login_required
 def edit_partner(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -150,8 +149,8 @@ def edit_partner(request, pk: int):
 
 @login_required
 def view_partner(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     partner = get_object_or_404(Partner, pk=pk)
 
@@ -197,8 +196,7 @@ def _clear_duplicate_session_messages(request):
 @login_required
 @require_http_methods(["POST"])
 def delete_partner(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
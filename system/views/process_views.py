@@ -23,7 +23,7 @@ from system.models import (
     TripProcessStatus,
 )
 from system.models import ConsultancyUser
-from system.views.client_views import list_clients, get_user_consultant, user_can_manage_all
+from system.views.client_views import list_clients
 
 
 logger = logging.getLogger(__name__)
@@ -66,8 +66,8 @@ def _sort_processes_by_family_group(processes, trip=None):
 
 @login_required
 def home_processes(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     from system.views.client_views import list_clients
     user_clients = list_clients(request.user)
@@ -454,8 +454,8 @@ def _prepare_create_process_context(consultant, form, client_id, trip_id) -> dic
 
 @login_required
 def create_process(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if request.method == "GET":
         _clear_trip_session_messages(request)
@@ -476,8 +476,8 @@ def create_process(request):
 
 @login_required
 def view_process(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     process = get_object_or_404(
         Process.objects.select_related(
@@ -511,8 +511,8 @@ def view_process(request, pk: int):
 
 @login_required
 def edit_process(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     process = get_object_or_404(
         Process.objects.select_related(
@@ -607,8 +607,7 @@ def edit_process(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_process(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied("Você não tem permissão para excluir processos.")
@@ -624,8 +623,8 @@ def delete_process(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def remove_process_stage(request, process_pk: int, stage_pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     process = get_object_or_404(
         Process.objects.select_related("assigned_advisor"),
@@ -667,8 +666,8 @@ def _get_available_stages_to_add(process: Process):
 @login_required
 @require_http_methods(["POST"])
 def add_process_stage(request, process_pk: int, status_pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     process = get_object_or_404(
         Process.objects.select_related("assigned_advisor", "trip"),
@@ -707,8 +706,8 @@ def add_process_stage(request, process_pk: int, status_pk: int):
 
 @login_required
 def list_processes(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     processes = Process.objects.select_related(
         "trip",
@@ -6,13 +6,12 @@ from django.views.decorators.http import require_http_methods
 
 from system.forms import ProcessStatusForm
 from system.models import ProcessStatus
-from system.views.client_views import get_user_consultant, user_can_manage_all
 
 
 @login_required
 def list_process_status(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied("Você não tem permissão para gerenciar status de processos.")
@@ -32,8 +31,8 @@ def list_process_status(request):
 
 @login_required
 def create_process_status(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied("Você não tem permissão para criar status de processos.")
@@ -58,8 +57,8 @@ def create_process_status(request):
 
 @login_required
 def edit_process_status(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied("Você não tem permissão para editar status de processos.")
@@ -88,8 +87,7 @@ def edit_process_status(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_process_status(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied("Você não tem permissão para excluir status de processos.")
@@ -42,11 +42,7 @@ from system.services.form_stages import (
     filter_questions_by_stage,
     resolve_stage_token,
 )
-from system.views.client_views import (
-    list_clients,
-    get_user_consultant,
-    user_can_manage_all,
-)
+from system.views.client_views import list_clients
 
 logger = logging.getLogger("visary.travel")
 
@@ -110,8 +106,8 @@ def _filter_messages_for_template(request):
 def home_trips(request):
     _clear_registered_trip_flags(request)
 
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     user_clients = list_clients(request.user)
     client_ids = list(user_clients.values_list("pk", flat=True))
@@ -163,8 +159,8 @@ def home_trips(request):
 
 @login_required
 def home_destination_countries(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
     can_manage_all = True
 
@@ -185,8 +181,8 @@ def home_destination_countries(request):
 
 @login_required
 def home_visa_types(request):
-    consultant = get_user_consultant(request.user)
-    if not user_can_manage_all(request.user, consultant):
+    consultant = request.permissions.consultant
+    if not request.permissions.can_manage_all:
         raise PermissionDenied
     can_manage_all = True
 
@@ -249,7 +245,7 @@ def _apply_visa_type_filters(visa_types, request):
 
 @login_required
 def create_destination_country(request):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
 
     if request.method == "POST":
         form = DestinationCountryForm(data=request.POST, user=request.user)
@@ -273,7 +269,7 @@ def create_destination_country(request):
 
 @login_required
 def create_visa_type(request):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
 
     if request.method == "POST":
         form = VisaTypeForm(data=request.POST, user=request.user)
@@ -646,7 +642,7 @@ def _prepare_create_trip_context(form, consultant, preselected_clients, trip_mem
 
 @login_required
 def create_trip(request):
-    consultant = get_user_consultant(request.user)
+    consultant = request.permissions.consultant
 
     if request.method == "GET" and request.GET.get("clients"):
         _clear_client_registration_flags(request)
@@ -699,8 +695,8 @@ def create_trip(request):
 
 @login_required
 def list_destination_countries(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     countries = DestinationCountry.objects.all().order_by("name")
     countries, applied_filters = _apply_country_filters(countries, request)
@@ -739,8 +735,8 @@ def _clear_duplicate_session_messages(request):
 
 @login_required
 def edit_destination_country(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -773,8 +769,8 @@ def edit_destination_country(request, pk: int):
 
 @login_required
 def view_destination_country(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     country = get_object_or_404(
         DestinationCountry.objects.select_related("created_by"),
@@ -809,8 +805,8 @@ def view_destination_country(request, pk: int):
 
 @login_required
 def verify_destination_country_deletion(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -851,8 +847,7 @@ def verify_destination_country_deletion(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_destination_country(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -879,8 +874,8 @@ def delete_destination_country(request, pk: int):
 
 @login_required
 def list_visa_types(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     visa_types = VisaType.objects.select_related(
         "destination_country"
@@ -900,8 +895,8 @@ def list_visa_types(request):
 
 @login_required
 def view_visa_type(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     visa_type = get_object_or_404(
         VisaType.objects.select_related("destination_country", "created_by"),
@@ -939,8 +934,8 @@ def view_visa_type(request, pk: int):
 
 @login_required
 def edit_visa_type(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -976,8 +971,7 @@ def edit_visa_type(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_visa_type(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     if not can_manage_all:
         raise PermissionDenied
@@ -1217,8 +1211,8 @@ def _update_form_answer(answer, question, value):
 
 @login_required
 def list_trips(request):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trips = Trip.objects.select_related(
         "destination_country",
@@ -1261,8 +1255,8 @@ def list_trips(request):
 
 @login_required
 def view_trip(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(
         Trip.objects.select_related(
@@ -1358,8 +1352,8 @@ def view_trip(request, pk: int):
 
 @login_required
 def edit_trip(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(
         Trip.objects.select_related(
@@ -1395,8 +1389,8 @@ def edit_trip(request, pk: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_trip(request, pk: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(
         Trip.objects.select_related("assigned_advisor"),
@@ -1483,8 +1477,8 @@ def api_client_trips(request):
 
 @login_required
 def list_trip_forms(request, trip_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(
         Trip.objects.select_related(
@@ -1535,8 +1529,8 @@ def list_trip_forms(request, trip_id: int):
 
 @login_required
 def edit_client_form(request, trip_id: int, client_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(
         Trip.objects.select_related("visa_type__form"),
@@ -1644,8 +1638,8 @@ def _find_next_stage(stage_items, current_stage):
 
 @login_required
 def view_client_form(request, trip_id: int, client_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(
         Trip.objects.select_related(
@@ -1702,8 +1696,7 @@ def view_client_form(request, trip_id: int, client_id: int):
 @login_required
 @require_http_methods(["POST"])
 def delete_form_answers(request, trip_id: int, client_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(
         Trip.objects.select_related("assigned_advisor"),
@@ -1734,8 +1727,8 @@ def delete_form_answers(request, trip_id: int, client_id: int):
 @login_required
 @require_http_methods(["POST"])
 def switch_trip_principal(request, pk: int, client_id: int):
-    consultant = get_user_consultant(request.user)
-    can_manage_all = user_can_manage_all(request.user, consultant)
+    consultant = request.permissions.consultant
+    can_manage_all = request.permissions.can_manage_all
 
     trip = get_object_or_404(Trip, pk=pk)
 
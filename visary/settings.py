@@ -91,6 +91,16 @@ DATABASES = {
     }
 }
 
+# Cache em arquivos por padrão: compartilhado por todos os workers da máquina, o que a saúde das
+# fontes de CEP exige. Com vários servidores, aponte CACHE_BACKEND para Redis ou Memcached.
+# LocMemCache é por processo: cada worker teria as próprias médias e circuitos.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": config("CACHE_LOCATION", default=str(BASE_DIR / ".cache" / "django")),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -167,4 +177,35 @@ LEGACY_DB_NAME = config("LEGACY_DB_NAME", default="").strip()
 LEGACY_DB_USER = config("LEGACY_DB_USER", default="").strip()
 LEGACY_DB_PASSWORD = config("LEGACY_DB_PASSWORD", default="").strip()
 
+PASSPORT_OCR_MAX_WORKERS = config("PASSPORT_OCR_MAX_WORKERS", default=3, cast=int)
+PASSPORT_OCR_JOB_WORKERS = config("PASSPORT_OCR_JOB_WORKERS", default=2, cast=int)
+PASSPORT_OCR_JOB_STALE_SECONDS = config("PASSPORT_OCR_JOB_STALE_SECONDS", default=600, cast=int)
+PASSPORT_OCR_JOB_MAX_ATTEMPTS = config("PASSPORT_OCR_JOB_MAX_ATTEMPTS", default=3, cast=int)
+PASSPORT_OCR_JOB_RETENTION_SECONDS = config("PASSPORT_OCR_JOB_RETENTION_SECONDS", default=7 * 24 * 3600, cast=int)
+PASSPORT_OCR_DAEMON_SOCKET = config("PASSPORT_OCR_DAEMON_SOCKET", default="").strip()
+PASSPORT_OCR_DAEMON_TIMEOUT_SECONDS = config("PASSPORT_OCR_DAEMON_TIMEOUT_SECONDS", default=60, cast=float)
+PASSPORT_OCR_CACHE_ENABLED = config("PASSPORT_OCR_CACHE_ENABLED", default=True, cast=bool)
+PASSPORT_OCR_CACHE_TTL_SECONDS = config("PASSPORT_OCR_CACHE_TTL_SECONDS", default=7 * 24 * 3600, cast=int)
+PASSPORT_OCR_CACHE_MAX_ENTRIES = config("PASSPORT_OCR_CACHE_MAX_ENTRIES", default=2000, cast=int)
+PASSPORT_OCR_CACHE_MEMORY_ENTRIES = config("PASSPORT_OCR_CACHE_MEMORY_ENTRIES", default=128, cast=int)
+
+HTTP_CONNECT_TIMEOUT_SECONDS = config("HTTP_CONNECT_TIMEOUT_SECONDS", default=2, cast=float)
+HTTP_POOL_MAXSIZE = config("HTTP_POOL_MAXSIZE", default=10, cast=int)
+
+CEP_LOOKUP_TIMEOUT_SECONDS = config("CEP_LOOKUP_TIMEOUT_SECONDS", default=8, cast=float)
+CEP_PROVIDER_TIMEOUT_SECONDS = config("CEP_PROVIDER_TIMEOUT_SECONDS", default=5, cast=float)
+CEP_LOOKUP_HEDGE_DELAY_SECONDS = config("CEP_LOOKUP_HEDGE_DELAY_SECONDS", default=0.4, cast=float)
+CEP_LOOKUP_MAX_WORKERS = config("CEP_LOOKUP_MAX_WORKERS", default=8, cast=int)
+CEP_CIRCUIT_FAILURE_THRESHOLD = config("CEP_CIRCUIT_FAILURE_THRESHOLD", default=3, cast=int)
+CEP_CIRCUIT_COOLDOWN_SECONDS = config("CEP_CIRCUIT_COOLDOWN_SECONDS", default=60, cast=int)
+CEP_HEALTH_TTL_SECONDS = config("CEP_HEALTH_TTL_SECONDS", default=24 * 3600, cast=int)
+CEP_CACHE_ENABLED = config("CEP_CACHE_ENABLED", default=True, cast=bool)
+CEP_CACHE_TTL_SECONDS = config("CEP_CACHE_TTL_SECONDS", default=180 * 24 * 3600, cast=int)
+CEP_CACHE_NEGATIVE_TTL_SECONDS = config("CEP_CACHE_NEGATIVE_TTL_SECONDS", default=24 * 3600, cast=int)
+CEP_CACHE_PURGE_INTERVAL_SECONDS = config("CEP_CACHE_PURGE_INTERVAL_SECONDS", default=3600, cast=int)
+
+# A chave da matriz de permissões muda com o updated_at do perfil; o TTL só limpa versões antigas
+# e limita alterações feitas fora do ORM sem tocar o updated_at.
+PERMISSION_MATRIX_TTL_SECONDS = config("PERMISSION_MATRIX_TTL_SECONDS", default=3600, cast=int)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"